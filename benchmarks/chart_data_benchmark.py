@@ -0,0 +1,78 @@
+"""
+Chart Data Benchmark
+Compares the columnar chart_data builders against the previous iterrows loops.
+
+Usage: python benchmarks/chart_data_benchmark.py [--rows N] [--repeat R]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'eda'))
+
+from chart_data import records, floats, ints, dates
+
+def make_daily_frame(rows, seed=42):
+    """Synthetic daily sales table shaped like TimeSeriesAnalyzer's daily_sales."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2000-01-01', periods=rows, freq='D', name='Date')
+    return pd.DataFrame({
+        'total_revenue': rng.gamma(2.0, 500.0, rows).round(2),
+        'transaction_count': rng.integers(1, 50, rows),
+        'unique_customers': rng.integers(1, 40, rows)
+    }, index=index)
+
+def iterrows_chart_data(daily_sales):
+    """The loop previously used in daily_sales_analysis."""
+    chart_data = []
+    for date, row in daily_sales.iterrows():
+        chart_data.append({
+            'date': date.strftime('%Y-%m-%d'),
+            'revenue': float(row['total_revenue']),
+            'transactions': int(row['transaction_count']),
+            'customers': int(row['unique_customers'])
+        })
+    return chart_data
+
+def columnar_chart_data(daily_sales):
+    """The columnar path now used in daily_sales_analysis."""
+    return records(
+        date=dates(daily_sales.index),
+        revenue=floats(daily_sales['total_revenue']),
+        transactions=ints(daily_sales['transaction_count']),
+        customers=ints(daily_sales['unique_customers'])
+    )
+
+def best_time(func, arg, repeat):
+    """Best wall time over repeat runs, plus the last result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark chart_data serialization')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'iterrows (s)':>14} {'columnar (s)':>14} {'speedup':>9}")
+    for rows in args.rows:
+        daily_sales = make_daily_frame(rows)
+        loop_time, loop_result = best_time(iterrows_chart_data, daily_sales, args.repeat)
+        columnar_time, columnar_result = best_time(columnar_chart_data, daily_sales, args.repeat)
+
+        if loop_result != columnar_result:
+            raise SystemExit(f"Outputs differ at {rows} rows")
+
+        print(f"{rows:>10} {loop_time:>14.4f} {columnar_time:>14.4f} {loop_time / columnar_time:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
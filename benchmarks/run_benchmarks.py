@@ -0,0 +1,261 @@
+"""
+EDA Benchmark Harness
+Times data loading, each analyzer and the full EDARunner pipeline on
+synthetic data at several scales, saves the results and compares them with
+a previous run to catch regressions.
+
+Usage:
+    python benchmarks/run_benchmarks.py --rows 10000 100000 1000000 --label baseline
+    python benchmarks/run_benchmarks.py --rows 10000 100000 1000000 --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+EDA_DIR = os.path.join(REPO_DIR, 'eda')
+sys.path.insert(0, EDA_DIR)
+
+import numpy as np
+import pandas as pd
+
+from load_clean import DataLoader
+from customer_facts import CustomerFactTable
+from stats import StatisticalAnalyzer
+from time_series import TimeSeriesAnalyzer
+from customer_product import CustomerProductAnalyzer
+from profiling import Profiler
+from synthetic_data import SyntheticRetailData
+
+ANALYZERS = {
+    'statistical_analysis': StatisticalAnalyzer,
+    'time_series_analysis': TimeSeriesAnalyzer,
+    'customer_product_analysis': CustomerProductAnalyzer
+}
+
+def dataset_path(rows, seed, data_dir):
+    """Generate the synthetic dataset for a scale once and reuse it afterwards."""
+    path = os.path.join(data_dir, f'synthetic_{rows}_seed{seed}.csv')
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        SyntheticRetailData(rows, seed=seed).write(path + '.tmp')
+        os.replace(path + '.tmp', path)
+        print(f"✓ Generated {rows:,} rows in {time.perf_counter() - start:.1f}s: {path}")
+    return path
+
+def summarize_phase(entry):
+    """Compact phase record: totals plus wall seconds per top-level method."""
+    return {
+        'wall_seconds': entry.get('wall_seconds'),
+        'cpu_seconds': entry.get('cpu_seconds'),
+        'peak_rss_mb': entry.get('peak_rss_mb'),
+        'rows': entry.get('rows'),
+        'methods': {call['method']: call['wall_seconds']
+                    for call in entry.get('methods', []) if call['parent'] is None}
+    }
+
+def benchmark_analyzers(path):
+    """
+    Time loading, cleaning, the customer fact table and every analyzer in-process.
+
+    Runs in a fresh worker process per scale so peak RSS is not carried
+    over between scales. Results are not written to visuals/, and the
+    analyzers' progress output is discarded.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _profile_analyzers(path)
+
+def _profile_analyzers(path):
+    profiler = Profiler()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        loader = profiler.instrument(DataLoader(path, cache_dir=cache_dir), 'data_loading')
+        with profiler.phase('data_loading'):
+            loader.load_data()
+            loader.validate_data()
+            df = loader.clean_data()
+
+    with profiler.phase('customer_facts', rows=len(df)):
+        customer_facts = CustomerFactTable(df).build()
+
+    for phase, analyzer_class in ANALYZERS.items():
+        if analyzer_class is TimeSeriesAnalyzer:
+            analyzer = analyzer_class(df)
+        else:
+            analyzer = analyzer_class(df, customer_facts=customer_facts)
+        profiler.instrument(analyzer, phase)
+        with profiler.phase(phase):
+            analyzer.run_complete_analysis()
+
+    return {phase: summarize_phase(entry) for phase, entry in profiler.phases.items()}
+
+def benchmark_pipeline(path, extra_args=()):
+    """Run eda/run.py end to end in a scratch directory and collect its profile."""
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, 'data'))
+        command = [sys.executable, os.path.join(EDA_DIR, 'run.py'), '--data', os.path.abspath(path),
+                   '--no-cache', '--profile', *extra_args]
+
+        start = time.perf_counter()
+        completed = subprocess.run(command, cwd=workdir, capture_output=True, text=True)
+        wall = time.perf_counter() - start
+
+        if completed.returncode != 0 or 'EDA pipeline failed' in completed.stdout:
+            print(completed.stdout[-2000:], completed.stderr[-2000:])
+            raise RuntimeError(f"Pipeline failed for {path}")
+
+        with open(os.path.join(workdir, 'visuals', 'profile.json'), 'r') as f:
+            profile = json.load(f)
+
+    return {
+        'wall_seconds': round(wall, 6),
+        'phases': {phase: summarize_phase(entry) for phase, entry in profile['phases'].items()}
+    }
+
+def git_commit():
+    """Current commit of the repository, if available."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def best_of(runs):
+    """Merge repeated runs of one scale, keeping the fastest run of each phase."""
+    best = runs[0]
+    for run in runs[1:]:
+        for phase, entry in run.items():
+            current = best.setdefault(phase, entry)
+            if entry['wall_seconds'] < current['wall_seconds']:
+                best[phase] = entry
+    return best
+
+def run_benchmarks(rows_list, seed=42, repeat=1, pipeline=True, pipeline_args=(), data_dir=None):
+    """Benchmark every scale and return the results document."""
+    data_dir = data_dir or os.path.join(BENCHMARK_DIR, 'data')
+    results = {
+        'created': datetime.now().isoformat(),
+        'git_commit': git_commit(),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'settings': {'seed': seed, 'repeat': repeat, 'pipeline_args': list(pipeline_args)},
+        'scales': {}
+    }
+
+    context = multiprocessing.get_context('spawn')
+    for rows in rows_list:
+        path = dataset_path(rows, seed, data_dir)
+        print(f"\n⏱️  Benchmarking {rows:,} rows")
+
+        runs = []
+        for _ in range(repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                runs.append(executor.submit(benchmark_analyzers, path).result())
+        scale = {'analyzers': best_of(runs)}
+
+        if pipeline:
+            pipeline_runs = [benchmark_pipeline(path, pipeline_args) for _ in range(repeat)]
+            scale['pipeline'] = min(pipeline_runs, key=lambda run: run['wall_seconds'])
+
+        for phase, entry in scale['analyzers'].items():
+            print(f"   {phase:<28} {entry['wall_seconds']:>9.3f}s  peak RSS {entry['peak_rss_mb'] or 0:>8.1f} MB")
+        if pipeline:
+            print(f"   {'pipeline (run.py)':<28} {scale['pipeline']['wall_seconds']:>9.3f}s")
+
+        results['scales'][str(rows)] = scale
+
+    return results
+
+def timing_rows(results):
+    """Flatten a results document into {(scale, section, phase, method): seconds}."""
+    timings = {}
+    for scale, sections in results['scales'].items():
+        for phase, entry in sections.get('analyzers', {}).items():
+            timings[(scale, 'analyzers', phase, None)] = entry['wall_seconds']
+            for method, seconds in entry['methods'].items():
+                timings[(scale, 'analyzers', phase, method)] = seconds
+        if 'pipeline' in sections:
+            timings[(scale, 'pipeline', 'total', None)] = sections['pipeline']['wall_seconds']
+            for phase, entry in sections['pipeline']['phases'].items():
+                timings[(scale, 'pipeline', phase, None)] = entry['wall_seconds']
+    return timings
+
+def compare(baseline, current, threshold=0.15, min_seconds=0.05):
+    """
+    Print timing ratios against a baseline and return the regressions.
+
+    A timing regresses when it is more than threshold slower than the
+    baseline; timings under min_seconds in both runs are ignored as noise.
+    """
+    old, new = timing_rows(baseline), timing_rows(current)
+    regressions = []
+
+    print(f"\n{'scale':>10} {'timing':<58} {'baseline':>9} {'current':>9} {'ratio':>7}")
+    for key in sorted(set(old) & set(new), key=lambda k: (int(k[0]), k[1], k[2], k[3] or '')):
+        before, after = old[key], new[key]
+        if before is None or after is None or max(before, after) < min_seconds:
+            continue
+        ratio = after / before if before else float('inf')
+        scale, section, phase, method = key
+        name = f"{section}.{phase}" + (f".{method}" if method else '')
+        flag = ' ⚠️' if ratio > 1 + threshold else ''
+        print(f"{scale:>10} {name:<58} {before:>9.3f} {after:>9.3f} {ratio:>6.2f}x{flag}")
+        if flag:
+            regressions.append({'timing': name, 'scale': int(scale), 'baseline': before,
+                                'current': after, 'ratio': ratio})
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the EDA pipeline on synthetic data')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='dataset sizes to benchmark')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=1, help='runs per scale; the fastest is kept')
+    parser.add_argument('--skip-pipeline', action='store_true', help='only benchmark the analyzers in-process')
+    parser.add_argument('--pipeline-args', default='',
+                        help='extra arguments for eda/run.py, e.g. "--parallel --compact"')
+    parser.add_argument('--data-dir', default=None, help='where generated datasets are kept')
+    parser.add_argument('--label', default=None, help='results are saved to benchmarks/results/<label>.json')
+    parser.add_argument('--compare', default=None, help='baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='relative slowdown that counts as a regression')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.rows, seed=args.seed, repeat=args.repeat, pipeline=not args.skip_pipeline,
+                             pipeline_args=args.pipeline_args.split(), data_dir=args.data_dir)
+
+    label = args.label or datetime.now().strftime('%Y%m%d-%H%M%S')
+    output_path = os.path.join(BENCHMARK_DIR, 'results', f'{label}.json')
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Benchmark results saved to {output_path}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, threshold=args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} timing(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
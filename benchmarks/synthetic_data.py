@@ -0,0 +1,216 @@
+"""
+Synthetic Data Generator
+Deterministic retail transactions with the schema of retail_sales_dataset.csv,
+at any scale, for benchmarking the EDA pipeline.
+
+Usage:
+    python benchmarks/synthetic_data.py --rows 1000000 --output benchmarks/data/synthetic_1m.csv
+    python benchmarks/synthetic_data.py --rows 10000000 --output benchmarks/data/daily --partition-by-day
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for Parquet output
+    pa = pq = None
+
+# Category mix, price points and basket sizes follow the shipped 100-row sample
+CATEGORY_WEIGHTS = {
+    'Electronics': 0.22,
+    'Clothing': 0.20,
+    'Beauty': 0.20,
+    'Sports': 0.19,
+    'Home & Garden': 0.19
+}
+
+PRICE_POINTS = {
+    'Beauty': [19.99, 24.99, 29.99, 34.99, 39.99, 44.99, 49.99, 54.99, 59.99, 64.99],
+    'Clothing': [45.99, 59.99, 69.99, 79.99, 89.99, 99.99, 119.99, 129.99, 149.99, 159.99],
+    'Electronics': [299.99, 399.99, 449.99, 499.99, 599.99, 699.99, 799.99, 899.99, 1099.99, 1299.99],
+    'Home & Garden': [69.99, 79.99, 89.99, 99.99, 119.99, 149.99, 159.99, 179.99, 199.99, 249.99, 299.99],
+    'Sports': [99.99, 149.99, 179.99, 199.99, 229.99, 249.99, 279.99, 299.99, 329.99]
+}
+
+QUANTITY_WEIGHTS = [0.53, 0.32, 0.14, 0.01]
+
+# Rows generated from one derived seed; chunk sizes are rounded to whole blocks
+BLOCK_ROWS = 1 << 16
+
+COLUMNS = ['Transaction_ID', 'Date', 'Customer_ID', 'Gender', 'Age', 'Product_Category',
+           'Quantity', 'Price_per_Unit', 'Total_Amount']
+
+class SyntheticRetailData:
+    """
+    Generates transactions in date order, chunk by chunk.
+
+    Skew comes from a heavy-tailed (Pareto) customer activity weight, a
+    preferred category per customer, cheaper price points being more
+    likely, and daily volume that follows a weekly cycle, yearly
+    seasonality with a holiday peak and a slow upward trend. Customer
+    gender and age are fixed per customer.
+
+    Output depends only on (rows, seed, customers, start_date, days): the
+    number of rows per day is drawn once up front, and each block of
+    BLOCK_ROWS rows is generated from its own seed derived from (seed,
+    block). The chunk size used for writing therefore never changes the
+    data; it only bounds memory.
+    """
+
+    def __init__(self, rows, seed=42, customers=None, start_date='2023-01-01', days=365,
+                 missing_rate=0.0):
+        self.rows = rows
+        self.seed = seed
+        self.customers = customers or max(50, rows // 8)
+        self.start_date = pd.Timestamp(start_date)
+        self.days = days
+        self.missing_rate = missing_rate
+
+        rng = np.random.default_rng(np.random.SeedSequence([seed, 0]))
+        self._build_customers(rng)
+        self.day_offsets = np.cumsum(rng.multinomial(rows, self._day_weights()))
+
+    def _build_customers(self, rng):
+        """Per-customer activity weight, gender, age and preferred category."""
+        activity = rng.pareto(1.5, self.customers) + 1
+        self.customer_weights = activity / activity.sum()
+        self.customer_gender = rng.integers(0, 2, self.customers)
+        self.customer_age = np.clip(rng.normal(38, 11, self.customers), 18, 70).astype('int64')
+
+        self.categories = np.array(list(CATEGORY_WEIGHTS))
+        category_weights = np.array(list(CATEGORY_WEIGHTS.values()))
+        self.category_weights = category_weights / category_weights.sum()
+        self.customer_category = rng.choice(len(self.categories), self.customers, p=self.category_weights)
+
+        width = max(3, len(str(self.customers)))
+        self.customer_ids = np.array([f'CUST{i:0{width}d}' for i in range(1, self.customers + 1)])
+
+    def _day_weights(self):
+        """Relative transaction volume for each day in the date range."""
+        dates = pd.date_range(self.start_date, periods=self.days, freq='D')
+        weekly = np.where(dates.dayofweek >= 5, 1.25, 1.0)
+        seasonal = 1 + 0.2 * np.sin(2 * np.pi * (dates.dayofyear.to_numpy() - 80) / 365.25)
+        holiday = np.where(dates.month.isin([11, 12]), 1.3, 1.0)
+        trend = 1 + 0.3 * np.arange(self.days) / max(self.days - 1, 1)
+        weights = weekly * seasonal * holiday * trend
+        return weights / weights.sum()
+
+    def block(self, index):
+        """Rows [index * BLOCK_ROWS, (index + 1) * BLOCK_ROWS) as a DataFrame."""
+        start = index * BLOCK_ROWS
+        stop = min(start + BLOCK_ROWS, self.rows)
+        size = stop - start
+        rng = np.random.default_rng(np.random.SeedSequence([self.seed, index + 1]))
+
+        positions = np.arange(start, stop)
+        day = np.searchsorted(self.day_offsets, positions, side='right')
+        dates = self.start_date + pd.to_timedelta(day, unit='D')
+
+        customer = rng.choice(self.customers, size, p=self.customer_weights)
+        category = np.where(rng.random(size) < 0.6, self.customer_category[customer],
+                            rng.choice(len(self.categories), size, p=self.category_weights))
+
+        price = np.empty(size)
+        for code, name in enumerate(self.categories):
+            mask = category == code
+            points = np.array(PRICE_POINTS[name])
+            weights = 1 / np.arange(1, len(points) + 1)
+            price[mask] = rng.choice(points, mask.sum(), p=weights / weights.sum())
+
+        quantity = rng.choice(np.arange(1, len(QUANTITY_WEIGHTS) + 1), size, p=QUANTITY_WEIGHTS)
+
+        df = pd.DataFrame({
+            'Transaction_ID': positions + 1,
+            'Date': dates.strftime('%Y-%m-%d'),
+            'Customer_ID': self.customer_ids[customer],
+            'Gender': np.where(self.customer_gender[customer] == 1, 'Female', 'Male'),
+            'Age': self.customer_age[customer],
+            'Product_Category': self.categories[category],
+            'Quantity': quantity,
+            'Price_per_Unit': price,
+            'Total_Amount': np.round(quantity * price, 2)
+        }, columns=COLUMNS)
+
+        if self.missing_rate:
+            # Keep one dtype in every block so blocks can be appended to the same file
+            df['Age'] = df['Age'].astype('float64')
+            for col in ['Age', 'Gender']:
+                df.loc[rng.random(size) < self.missing_rate, col] = np.nan
+
+        return df
+
+    def iter_chunks(self, chunk_size=1_000_000):
+        """Yield the dataset in date order, about chunk_size rows (whole blocks) at a time."""
+        blocks_per_chunk = max(1, chunk_size // BLOCK_ROWS)
+        total_blocks = -(-self.rows // BLOCK_ROWS)
+        for first in range(0, total_blocks, blocks_per_chunk):
+            blocks = [self.block(index) for index in range(first, min(first + blocks_per_chunk, total_blocks))]
+            yield blocks[0] if len(blocks) == 1 else pd.concat(blocks, ignore_index=True)
+
+    def to_frame(self, chunk_size=1_000_000):
+        """The whole dataset in memory."""
+        return pd.concat(self.iter_chunks(chunk_size), ignore_index=True)
+
+    def write(self, output_path, chunk_size=1_000_000, partition_by_day=False):
+        """
+        Write the dataset as one CSV/Parquet file, or as daily partitions.
+
+        With partition_by_day, output_path is a directory and each chunk
+        writes date=YYYY-MM-DD/part-NNNNN.csv files that DataLoader can
+        prune by date.
+        """
+        parquet = output_path.endswith('.parquet')
+        if parquet and not partition_by_day and pq is None:
+            raise ImportError("pyarrow is required for Parquet output")
+        if partition_by_day:
+            os.makedirs(output_path, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+        parquet_writer = None
+        for index, chunk in enumerate(self.iter_chunks(chunk_size)):
+            if partition_by_day:
+                for date, day_rows in chunk.groupby('Date', sort=True):
+                    day_dir = os.path.join(output_path, f'date={date}')
+                    os.makedirs(day_dir, exist_ok=True)
+                    day_rows.to_csv(os.path.join(day_dir, f'part-{index:05d}.csv'), index=False)
+            elif parquet:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(output_path, table.schema)
+                parquet_writer.write_table(table)
+            else:
+                chunk.to_csv(output_path, mode='a' if index else 'w', header=index == 0, index=False)
+
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+        return output_path
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic retail transactions')
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--output', required=True, help='CSV or Parquet file, or directory with --partition-by-day')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--customers', type=int, default=None, help='number of customers (default rows / 8)')
+    parser.add_argument('--start-date', default='2023-01-01')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--missing-rate', type=float, default=0.0,
+                        help='fraction of Age/Gender values blanked to exercise cleaning')
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    parser.add_argument('--partition-by-day', action='store_true')
+    args = parser.parse_args()
+
+    generator = SyntheticRetailData(args.rows, seed=args.seed, customers=args.customers,
+                                    start_date=args.start_date, days=args.days,
+                                    missing_rate=args.missing_rate)
+    generator.write(args.output, chunk_size=args.chunk_size, partition_by_day=args.partition_by_day)
+    print(f"✓ Generated {args.rows:,} transactions for {generator.customers:,} customers: {args.output}")
+
+if __name__ == "__main__":
+    main()
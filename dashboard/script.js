@@ -6,9 +6,13 @@
 class RetailDashboard {
     constructor() {
         this.data = null;
+        this.manifest = null;
+        this.loadedSections = new Set();
         this.charts = {};
         this.currentTheme = 'light';
         this.currentSection = 'overview';
+        this.dailyRevenueRange = null;
+        this.api = null;
         
         this.init();
     }
@@ -19,6 +23,7 @@ class RetailDashboard {
         
         try {
             await this.loadData();
+            await this.connectApi();
             this.hideLoading();
             this.renderDashboard();
         } catch (error) {
@@ -59,6 +64,19 @@ class RetailDashboard {
             this.init();
         });
         
+        // Daily revenue date range; narrower ranges switch to a finer resolution level
+        document.getElementById('dailyRevenueRange')?.addEventListener('change', (e) => {
+            this.dailyRevenueRange = Number(e.target.value) || null;
+            this.renderDailyRevenueChart();
+        });
+        
+        // Revenue timeline filters, answered by the analytics API when it is running
+        ['revenueTimeframe', 'revenueCategory'].forEach(id => {
+            document.getElementById(id)?.addEventListener('change', () => {
+                this.renderRevenueTimeline();
+            });
+        });
+        
         // Insight category filters
         document.querySelectorAll('.insight-category').forEach(btn => {
             btn.addEventListener('click', (e) => {
@@ -69,6 +87,90 @@ class RetailDashboard {
     }
     
     async loadData() {
+        this.loadedSections.clear();
+        
+        // Per-section payloads: only the small manifest and the open section are fetched
+        const manifestResponse = await fetch('../visuals/sections/manifest.json', { cache: 'no-cache' });
+        if (manifestResponse.ok) {
+            this.manifest = await manifestResponse.json();
+            this.data = {};
+            await this.loadSection(this.currentSection);
+            return;
+        }
+        
+        // Older analysis runs without section payloads: load everything up front
+        this.manifest = null;
+        await this.loadFullData();
+    }
+    
+    async connectApi() {
+        // eda/api_server.py aggregates at query time; a static file server has no /api/
+        try {
+            const response = await fetch('/api/health');
+            this.api = response.ok ? await response.json() : null;
+        } catch (error) {
+            this.api = null;
+        }
+        
+        const categorySelect = document.getElementById('revenueCategory');
+        if (this.api && categorySelect) {
+            categorySelect.innerHTML = '<option value="">All categories</option>' +
+                this.api.categories.map(category => `<option value="${category}">${category}</option>`).join('');
+            categorySelect.hidden = false;
+        }
+    }
+    
+    async loadSection(sectionName) {
+        const entry = this.manifest?.sections?.[sectionName];
+        if (!entry || this.loadedSections.has(sectionName)) return false;
+        
+        const payload = await this.fetchSectionPayload(entry);
+        this.mergeData(this.data, payload);
+        this.loadedSections.add(sectionName);
+        return true;
+    }
+    
+    async fetchSectionPayload(entry) {
+        const base = '../visuals/sections/';
+        const version = `?v=${entry.version}`;
+        
+        if (entry.gzip && typeof DecompressionStream !== 'undefined') {
+            try {
+                const response = await fetch(base + entry.gzip + version);
+                if (response.ok) {
+                    const bytes = new Uint8Array(await response.arrayBuffer());
+                    // Servers that send Content-Encoding: gzip have already inflated the body
+                    if (bytes[0] !== 0x1f || bytes[1] !== 0x8b) {
+                        return JSON.parse(new TextDecoder().decode(bytes));
+                    }
+                    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+                    return await new Response(stream).json();
+                }
+            } catch (error) {
+                console.warn('Compressed payload unavailable, falling back to plain JSON:', error);
+            }
+        }
+        
+        const response = await fetch(base + entry.json + version);
+        if (!response.ok) {
+            throw new Error(`Dashboard section ${entry.json} not found. Please run the EDA analysis first.`);
+        }
+        return response.json();
+    }
+    
+    mergeData(target, source) {
+        Object.entries(source).forEach(([key, value]) => {
+            const isObject = value && typeof value === 'object' && !Array.isArray(value);
+            if (isObject && target[key] && typeof target[key] === 'object' && !Array.isArray(target[key])) {
+                this.mergeData(target[key], value);
+            } else {
+                target[key] = value;
+            }
+        });
+        return target;
+    }
+    
+    async loadFullData() {
         try {
             // Load dashboard configuration
             const response = await fetch('../visuals/dashboard_config.json');
@@ -119,6 +221,11 @@ class RetailDashboard {
     }
     
     renderDashboard() {
+        if (this.manifest) {
+            this.renderSection(this.currentSection);
+            return;
+        }
+        
         this.renderKPIs();
         this.renderCharts();
         this.renderInsights();
@@ -126,6 +233,29 @@ class RetailDashboard {
         this.renderTopCustomers();
     }
     
+    renderSection(sectionName) {
+        switch (sectionName) {
+            case 'overview':
+                this.renderKPIs();
+                this.renderOverviewCharts();
+                break;
+            case 'revenue':
+                this.renderRevenueCharts();
+                break;
+            case 'customers':
+                this.renderCustomerCharts();
+                this.renderTopCustomers();
+                break;
+            case 'products':
+                this.renderProductCharts();
+                break;
+            case 'insights':
+                this.renderInsights();
+                this.renderActionPlan();
+                break;
+        }
+    }
+    
     renderKPIs() {
         const kpiGrid = document.getElementById('kpiGrid');
         if (!kpiGrid || !this.data.kpis) return;
@@ -165,9 +295,7 @@ class RetailDashboard {
     
     renderOverviewCharts() {
         // Daily Revenue Chart
-        if (this.data.charts?.daily_revenue) {
-            this.createChart('overviewRevenueChart', this.data.charts.daily_revenue);
-        }
+        this.renderDailyRevenueChart();
         
         // Customer Segments Chart
         if (this.data.charts?.customer_segments) {
@@ -185,12 +313,78 @@ class RetailDashboard {
         }
     }
     
+    async renderDailyRevenueChart() {
+        const chart = this.data.charts?.daily_revenue;
+        if (!chart) return;
+        
+        const { resolutions, downsampling, ...config } = chart;
+        if (resolutions?.length) {
+            const range = this.dailyRevenueRange;
+            let level;
+            try {
+                level = await this.selectResolution('daily_revenue', chart, range, downsampling?.target_points);
+            } catch (error) {
+                console.warn('Finer resolution unavailable, drawing the coarsest level:', error);
+                level = await this.selectResolution('daily_revenue', chart, null);
+            }
+            // A newer range was picked while this level was being fetched
+            if (range !== this.dailyRevenueRange) return;
+            config.data = {
+                ...config.data,
+                labels: level.labels,
+                datasets: [{ ...config.data.datasets[0], data: level.data }]
+            };
+        }
+        
+        this.createChart('overviewRevenueChart', config);
+    }
+    
+    async loadResolutionLevel(chartName, chart, index) {
+        // Section payloads carry only the point count of each level; the series is fetched once
+        const level = chart.resolutions[index];
+        if (level.labels) return level;
+        if (index === 0) {
+            return Object.assign(level, { labels: chart.data.labels, data: chart.data.datasets[0].data });
+        }
+        
+        const entry = this.manifest?.resolutions?.[chartName]?.[index - 1];
+        if (!entry) throw new Error(`Resolution level ${index} of ${chartName} not found`);
+        return Object.assign(level, await this.fetchSectionPayload(entry));
+    }
+    
+    async selectResolution(chartName, chart, rangeDays, targetPoints) {
+        // Coarsest level expected to have targetPoints within the range, else the finest level
+        const resolutions = chart.resolutions;
+        const coarsest = await this.loadResolutionLevel(chartName, chart, 0);
+        if (!rangeDays) return coarsest;
+        
+        const labels = coarsest.labels;
+        const end = new Date(labels[labels.length - 1]);
+        const start = new Date(end);
+        start.setDate(start.getDate() - rangeDays + 1);
+        const startLabel = start.toISOString().slice(0, 10);
+        // Levels are spread evenly over the dates, so the range holds its share of each level's points
+        const share = Math.min(1, (end - start) / Math.max(end - new Date(labels[0]), 1));
+        const target = targetPoints || resolutions[0].points;
+        
+        let index = resolutions.findIndex(level => level.points * share >= target);
+        if (index < 0) index = resolutions.length - 1;
+        const level = await this.loadResolutionLevel(chartName, chart, index);
+        
+        let first = level.labels.findIndex(label => label >= startLabel);
+        if (first < 0) first = level.labels.length;
+        return { labels: level.labels.slice(first), data: level.data.slice(first) };
+    }
+    
     renderRevenueCharts() {
         // Revenue Timeline
         if (this.data.charts?.monthly_revenue) {
             this.createChart('revenueTimelineChart', this.data.charts.monthly_revenue);
         }
         
+        // Filtered timeline from the analytics API, when available
+        this.renderRevenueTimeline();
+        
         // Seasonal Revenue
         if (this.data.charts?.seasonal_analysis) {
             this.createChart('seasonalRevenueChart', this.data.charts.seasonal_analysis);
@@ -200,6 +394,55 @@ class RetailDashboard {
         this.createRevenueDistributionChart();
     }
     
+    async renderRevenueTimeline() {
+        if (!this.api) return;
+        
+        const frequencies = { daily: 'day', weekly: 'week', monthly: 'month' };
+        const params = new URLSearchParams({
+            freq: frequencies[document.getElementById('revenueTimeframe')?.value] || 'month'
+        });
+        const category = document.getElementById('revenueCategory')?.value;
+        if (category) params.set('category', category);
+        
+        try {
+            const response = await fetch(`/api/revenue?${params}`);
+            if (!response.ok) throw new Error((await response.json()).error);
+            const series = await response.json();
+            
+            this.createChart('revenueTimelineChart', {
+                type: series.freq === 'month' ? 'bar' : 'line',
+                data: {
+                    labels: series.labels,
+                    datasets: [{
+                        label: `Revenue${category ? ' - ' + category : ''}`,
+                        data: series.revenue,
+                        backgroundColor: 'rgba(37, 99, 235, 0.8)',
+                        borderColor: '#2563eb',
+                        borderWidth: 1,
+                        tension: 0.3,
+                        pointRadius: series.labels.length > 120 ? 0 : 2
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    scales: {
+                        y: {
+                            beginAtZero: true,
+                            ticks: {
+                                callback: function(value) {
+                                    return '$' + value.toLocaleString();
+                                }
+                            }
+                        }
+                    }
+                }
+            });
+        } catch (error) {
+            this.showNotification('Revenue query failed: ' + error.message, 'error');
+        }
+    }
+    
     renderCustomerCharts() {
         // Customer Segments
         if (this.data.charts?.customer_segments) {
@@ -216,6 +459,9 @@ class RetailDashboard {
         
         // CLV Chart (create from customer data)
         this.createCLVChart();
+        
+        // RFM Segments (create from customer data)
+        this.createRFMSegmentsChart();
     }
     
     renderProductCharts() {
@@ -393,6 +639,58 @@ class RetailDashboard {
         this.createChart('clvChart', config);
     }
     
+    createRFMSegmentsChart() {
+        if (!this.data.customer_product_analysis?.rfm?.segments) return;
+        
+        const segments = this.data.customer_product_analysis.rfm.segments;
+        
+        const config = {
+            type: 'bar',
+            data: {
+                labels: Object.keys(segments),
+                datasets: [{
+                    label: 'Customers (%)',
+                    data: Object.values(segments).map(seg => seg.percentage),
+                    backgroundColor: 'rgba(37, 99, 235, 0.7)',
+                    borderWidth: 1
+                }, {
+                    label: 'Revenue (%)',
+                    data: Object.values(segments).map(seg => seg.revenue_share),
+                    backgroundColor: 'rgba(16, 185, 129, 0.7)',
+                    borderWidth: 1
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: 'bottom'
+                    },
+                    tooltip: {
+                        callbacks: {
+                            label: function(context) {
+                                return context.dataset.label + ': ' + context.parsed.y.toFixed(1) + '%';
+                            }
+                        }
+                    }
+                },
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        ticks: {
+                            callback: function(value) {
+                                return value + '%';
+                            }
+                        }
+                    }
+                }
+            }
+        };
+        
+        this.createChart('rfmSegmentsChart', config);
+    }
+    
     createPriceAnalysisChart() {
         if (!this.data.customer_product_analysis?.purchase_patterns?.price_preferences) return;
         
@@ -568,7 +866,7 @@ class RetailDashboard {
         });
     }
     
-    switchSection(sectionName) {
+    async switchSection(sectionName) {
         // Update navigation
         document.querySelectorAll('.nav-item').forEach(item => {
             item.classList.remove('active');
@@ -583,6 +881,17 @@ class RetailDashboard {
         
         this.currentSection = sectionName;
         
+        // Fetch and draw the section the first time it is opened
+        if (this.manifest) {
+            try {
+                if (await this.loadSection(sectionName)) {
+                    this.renderSection(sectionName);
+                }
+            } catch (error) {
+                this.showError(error.message);
+            }
+        }
+        
         // Trigger chart resize for proper rendering
         setTimeout(() => {
             Object.values(this.charts).forEach(chart => {
@@ -0,0 +1,421 @@
+"""
+Analytics API Server
+Serves the dashboard together with a small JSON API that aggregates the
+cached cleaned dataset at query time, so the dashboard can filter by date
+range, category and demographic without re-running the pipeline.
+
+Usage:
+    python eda/api_server.py --port 8000
+    python eda/api_server.py --data data/partitions --start-date 2023-01-01
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from load_clean import DataLoader
+from artifacts import ArtifactWriter
+from rfm import read_scores, scores_path
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# pd.Grouper arguments per freq; weeks run Monday to Sunday and are labelled with their Monday
+FREQUENCIES = {
+    'day': {'freq': 'D'},
+    'week': {'freq': 'W-MON', 'closed': 'left', 'label': 'left'},
+    'month': {'freq': 'MS'}
+}
+
+DEMOGRAPHICS = {'gender': 'Gender', 'age_group': 'Age_Group'}
+
+RFM_LIMIT = 10000  # most customers one /api/rfm response lists
+
+# One loaded dataset; replaced as a whole on reload so a query never mixes two versions
+DatasetSnapshot = namedtuple('DatasetSnapshot', ['df', 'dates', 'fingerprint'])
+
+class QueryError(ValueError):
+    """Invalid query parameters; reported to the client as 400 Bad Request."""
+
+class ResponseCache:
+    """Thread-safe LRU cache of encoded responses."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        return {'entries': len(self.entries), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+class AnalyticsStore:
+    """
+    The cleaned dataset held in memory, plus query-time aggregations over it.
+
+    The frame is read from DataLoader's columnar cache (and cleaned and
+    cached first when that is missing or stale) and kept sorted by date,
+    so a date range is two binary searches instead of a full scan. The
+    dataset fingerprint combines the size and mtime of every source file
+    and of the cache file; it is re-checked at most every
+    refresh_seconds, and when it changes the frame is reloaded and the
+    response cache cleared. /api/rfm reads the RFM scores file the
+    pipeline writes instead, reloading it when the file changes.
+    """
+
+    def __init__(self, data_path='data/retail_sales_dataset.csv', cache_dir='data/.cache',
+                 start_date=None, end_date=None, cache_size=256, refresh_seconds=2.0,
+                 rfm_path=scores_path('visuals')):
+        self.loader_args = {'data_path': data_path, 'cache_dir': cache_dir,
+                            'start_date': start_date, 'end_date': end_date}
+        self.rfm_path = rfm_path
+        self.rfm_scores = None
+        self.rfm_version = None
+        self.cache = ResponseCache(cache_size)
+        self.refresh_seconds = refresh_seconds
+        self.snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_fingerprint(self, loader):
+        source = loader.source_fingerprint(with_hash=False)
+        cache_file = loader.cache_file
+        if os.path.exists(cache_file):
+            stat = os.stat(cache_file)
+            source['cache'] = [cache_file, stat.st_size, stat.st_mtime_ns]
+        payload = json.dumps(source, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def _load(self, loader):
+        """Cleaned frame from the cache, re-cleaning the source when the cache is stale."""
+        df = loader.load_cached_data()
+        if df is None:
+            if loader.load_data() is None:
+                raise RuntimeError(f"Could not load data from {loader.data_path}")
+            df = loader.clean_data()
+            loader.save_cache()
+        return df.sort_values('Date', kind='stable').reset_index(drop=True)
+
+    def refresh(self, force=False):
+        """Reload the dataset if its fingerprint changed; returns the current DatasetSnapshot."""
+        with self._lock:
+            snapshot = self.snapshot
+            if not force and snapshot is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+                return snapshot
+
+            loader = DataLoader(**self.loader_args)
+            fingerprint = self._current_fingerprint(loader)
+            if force or snapshot is None or fingerprint != snapshot.fingerprint:
+                df = self._load(loader)
+                # Saving a fresh cache changes the fingerprint; record the final state
+                snapshot = DatasetSnapshot(df, df['Date'].to_numpy(), self._current_fingerprint(loader))
+                self.snapshot = snapshot
+                self.cache.clear()
+                print(f"✓ Dataset loaded: {len(df):,} records (fingerprint {snapshot.fingerprint})")
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def _date_bound(self, value, name):
+        try:
+            return pd.Timestamp(value).normalize()
+        except (TypeError, ValueError) as e:
+            raise QueryError(f"Invalid {name} date: {value}") from e
+
+    def select(self, snapshot, params):
+        """Rows of the snapshot matching the start, end, category, gender, age_min and age_max filters."""
+        start, stop = 0, len(snapshot.df)
+        if params.get('start'):
+            start = np.searchsorted(snapshot.dates, self._date_bound(params['start'], 'start').to_datetime64(),
+                                    side='left')
+        if params.get('end'):
+            end = self._date_bound(params['end'], 'end') + pd.Timedelta(days=1)
+            stop = np.searchsorted(snapshot.dates, end.to_datetime64(), side='left')
+        df = snapshot.df.iloc[start:max(start, stop)]
+
+        mask = np.ones(len(df), dtype=bool)
+        for param, col in (('category', 'Product_Category'), ('gender', 'Gender')):
+            if params.get(param):
+                mask &= df[col].isin(params[param].split(',')).to_numpy()
+        for param, compare in (('age_min', np.greater_equal), ('age_max', np.less_equal)):
+            if params.get(param):
+                try:
+                    bound = float(params[param])
+                except ValueError as e:
+                    raise QueryError(f"Invalid {param}: {params[param]}") from e
+                mask &= compare(df['Age'].to_numpy(), bound)
+
+        return df if mask.all() else df[mask]
+
+    @staticmethod
+    def _totals(df):
+        revenue = float(df['Total_Amount'].sum())
+        return {
+            'revenue': revenue,
+            'transactions': int(len(df)),
+            'customers': int(df['Customer_ID'].nunique()),
+            'units': int(df['Quantity'].sum()),
+            'avg_transaction': revenue / len(df) if len(df) else 0.0
+        }
+
+    def summary(self, snapshot, params):
+        """Totals for the filtered rows, plus the date range they span."""
+        df = self.select(snapshot, params)
+        result = self._totals(df)
+        result['first_date'] = df['Date'].min().strftime('%Y-%m-%d') if len(df) else None
+        result['last_date'] = df['Date'].max().strftime('%Y-%m-%d') if len(df) else None
+        return result
+
+    def revenue(self, snapshot, params):
+        """Revenue, transactions and customers per day, week or month."""
+        freq = params.get('freq', 'day')
+        if freq not in FREQUENCIES:
+            raise QueryError(f"freq must be one of {', '.join(FREQUENCIES)}")
+        df = self.select(snapshot, params)
+
+        grouped = df.groupby(pd.Grouper(key='Date', **FREQUENCIES[freq]))
+        series = grouped.agg(revenue=('Total_Amount', 'sum'),
+                             transactions=('Total_Amount', 'size'),
+                             customers=('Customer_ID', 'nunique'))
+        return {
+            'freq': freq,
+            'labels': series.index.strftime('%Y-%m-%d').tolist(),
+            'revenue': series['revenue'].round(2).tolist(),
+            'transactions': series['transactions'].astype('int64').tolist(),
+            'customers': series['customers'].astype('int64').tolist()
+        }
+
+    def _breakdown(self, df, col):
+        grouped = df.groupby(col, observed=True)
+        table = grouped.agg(revenue=('Total_Amount', 'sum'),
+                            transactions=('Total_Amount', 'size'),
+                            customers=('Customer_ID', 'nunique'))
+        total = table['revenue'].sum()
+        table['share'] = table['revenue'] / total * 100 if total else 0.0
+        table = table.sort_values('revenue', ascending=False)
+        return [{'group': str(group), 'revenue': float(row.revenue), 'transactions': int(row.transactions),
+                 'customers': int(row.customers), 'share': float(row.share)}
+                for group, row in zip(table.index, table.itertuples(index=False))]
+
+    def by_category(self, snapshot, params):
+        """Revenue per product category for the filtered rows."""
+        return {'groups': self._breakdown(self.select(snapshot, params), 'Product_Category')}
+
+    def by_demographic(self, snapshot, params):
+        """Revenue per gender or age group for the filtered rows."""
+        by = params.get('by', 'gender')
+        if by not in DEMOGRAPHICS:
+            raise QueryError(f"by must be one of {', '.join(DEMOGRAPHICS)}")
+        return {'by': by, 'groups': self._breakdown(self.select(snapshot, params), DEMOGRAPHICS[by])}
+
+    def _rfm_file_version(self):
+        """Size and mtime of the RFM scores file, or None when the pipeline has not written it."""
+        if not os.path.exists(self.rfm_path):
+            return None
+        stat = os.stat(self.rfm_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_rfm(self):
+        """RFM scores written by the pipeline, reloaded when the file changes."""
+        version = self._rfm_file_version()
+        if version is None:
+            raise QueryError(f"No RFM scores at {self.rfm_path}; run the EDA pipeline first")
+        with self._lock:
+            if version != self.rfm_version:
+                self.rfm_scores = read_scores(self.rfm_path)
+                self.rfm_version = version
+            return self.rfm_scores
+
+    def rfm(self, snapshot, params):
+        """
+        Customers' RFM scores, filtered by segment and customer ids.
+
+        Customers are listed best first (highest RFM cell, then spend), up
+        to limit; segment counts cover every matching customer.
+        """
+        scores = self._load_rfm()
+        mask = np.ones(len(scores), dtype=bool)
+        if params.get('segment'):
+            mask &= scores['segment'].isin(params['segment'].split(',')).to_numpy()
+        if params.get('customer'):
+            mask &= scores['Customer_ID'].astype(str).isin(params['customer'].split(',')).to_numpy()
+        try:
+            limit = int(params.get('limit', 100))
+        except ValueError as e:
+            raise QueryError(f"Invalid limit: {params['limit']}") from e
+        if not 0 <= limit <= RFM_LIMIT:
+            raise QueryError(f"limit must be between 0 and {RFM_LIMIT}")
+
+        selected = scores[mask] if not mask.all() else scores
+        top = selected.sort_values(['rfm_cell', 'monetary'], ascending=False, kind='stable').head(limit)
+        segment_counts = selected['segment'].value_counts(sort=False)
+        return {
+            'customers_matched': int(len(selected)),
+            'segments': {str(name): int(count) for name, count in segment_counts.items() if count},
+            'customers': [{
+                'customer_id': str(row.Customer_ID),
+                'recency_days': int(row.recency_days),
+                'frequency': int(row.frequency),
+                'monetary': float(row.monetary),
+                'rfm_cell': int(row.rfm_cell),
+                'segment': str(row.segment)
+            } for row in top.itertuples(index=False)]
+        }
+
+    def health(self, snapshot, params):
+        """Dataset fingerprint, size, filter values and response cache statistics."""
+        df = snapshot.df
+        return {
+            'fingerprint': snapshot.fingerprint,
+            'records': int(len(df)),
+            'first_date': df['Date'].min().strftime('%Y-%m-%d') if len(df) else None,
+            'last_date': df['Date'].max().strftime('%Y-%m-%d') if len(df) else None,
+            'categories': sorted(str(value) for value in df['Product_Category'].unique()),
+            'genders': sorted(str(value) for value in df['Gender'].unique()),
+            'cache': self.cache.stats()
+        }
+
+    ENDPOINTS = {
+        '/api/health': 'health',
+        '/api/summary': 'summary',
+        '/api/revenue': 'revenue',
+        '/api/revenue/by-category': 'by_category',
+        '/api/revenue/by-demographic': 'by_demographic',
+        '/api/rfm': 'rfm'
+    }
+
+    def query(self, path, params):
+        """
+        Encoded JSON response for an endpoint, whether it came from the
+        cache, and the fingerprint of the dataset it was computed from.
+
+        The response is computed from a single DatasetSnapshot, and cache
+        keys include its fingerprint, so a stale entry can never be
+        returned even before the cache is cleared.
+        """
+        snapshot = self.refresh()
+        fingerprint = snapshot.fingerprint
+        method = getattr(self, self.ENDPOINTS[path])
+        if path == '/api/health':
+            return b''.join(ArtifactWriter(mode='compact').iter_chunks(method(snapshot, params))), False, fingerprint
+
+        # RFM responses also depend on the scores file the pipeline rewrites
+        version = self._rfm_file_version() if path == '/api/rfm' else None
+        key = (fingerprint, version, path, tuple(sorted(params.items())))
+        body = self.cache.get(key)
+        if body is not None:
+            return body, True, fingerprint
+        body = b''.join(ArtifactWriter(mode='compact').iter_chunks(method(snapshot, params)))
+        self.cache.put(key, body)
+        return body, False, fingerprint
+
+class AnalyticsRequestHandler(SimpleHTTPRequestHandler):
+    """Answers /api/ requests from the store and serves every other path as a static file."""
+
+    def __init__(self, *args, store=None, **kwargs):
+        self.store = store
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if not url.path.startswith('/api/'):
+            return super().do_GET()
+
+        path = url.path.rstrip('/')
+        if path not in AnalyticsStore.ENDPOINTS:
+            return self._send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown endpoint: {url.path}"})
+
+        # Repeated parameters are joined, so ?category=A&category=B equals ?category=A,B
+        params = {key: ','.join(values) for key, values in parse_qs(url.query).items()}
+        try:
+            body, cached, fingerprint = self.store.query(path, params)
+        except QueryError as e:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+        except Exception as e:
+            return self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)})
+
+        self._send_body(HTTPStatus.OK, body, {'X-Cache': 'HIT' if cached else 'MISS',
+                                              'X-Dataset-Fingerprint': fingerprint})
+
+    def _send_json(self, status, data):
+        self._send_body(status, json.dumps(data).encode('utf-8'))
+
+    def _send_body(self, status, body, headers=None):
+        if len(body) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers = {**(headers or {}), 'Content-Encoding': 'gzip'}
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+def create_server(store, host='127.0.0.1', port=8000, directory=REPO_DIR):
+    """ThreadingHTTPServer answering API queries from store and serving directory."""
+    handler = partial(AnalyticsRequestHandler, store=store, directory=directory)
+    return ThreadingHTTPServer((host, port), handler)
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the dashboard with a query-time analytics API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--data', default='data/retail_sales_dataset.csv',
+                        help='CSV/Parquet file, directory of partitions or glob pattern to serve')
+    parser.add_argument('--start-date', default=None)
+    parser.add_argument('--end-date', default=None)
+    parser.add_argument('--cache-size', type=int, default=256, help='responses kept in the LRU cache')
+    args = parser.parse_args()
+
+    store = AnalyticsStore(args.data, start_date=args.start_date, end_date=args.end_date,
+                           cache_size=args.cache_size)
+    store.refresh(force=True)
+
+    server = create_server(store, args.host, args.port)
+    print(f"✓ Analytics API listening on http://{args.host}:{args.port}/api/health")
+    print(f"Open your dashboard at: http://localhost:{args.port}/dashboard/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Artifact Writer Module
+Writes analysis results to JSON files in a pretty (indented) or compact mode.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library encoder is used instead
+    orjson = None
+
+# Environment variable selecting the default mode, so worker processes inherit it
+ARTIFACT_MODE_ENV = 'EDA_ARTIFACT_MODE'
+
+def _json_dumps(obj):
+    """Compact encoding with the standard library."""
+    return json.dumps(obj, separators=(',', ':'), default=str).encode('utf-8')
+
+def _orjson_dumps(obj):
+    """Compact encoding with orjson (numpy values supported, NaN written as null)."""
+    return orjson.dumps(obj, default=str,
+                        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+ENCODERS = {'json': _json_dumps}
+if orjson is not None:
+    ENCODERS['orjson'] = _orjson_dumps
+
+class ArtifactWriter:
+    """
+    Streams JSON artifacts to disk.
+
+    pretty mode writes the same indented output as json.dump(indent=2),
+    streamed through JSONEncoder.iterencode. compact mode drops whitespace
+    and uses the fastest available encoder (orjson when installed); dicts
+    are written key by key and long lists in batches of batch_size items,
+    so large chart arrays never have to be encoded as one string.
+    """
+
+    MODES = ('pretty', 'compact')
+
+    def __init__(self, mode=None, encoder=None, batch_size=1000):
+        self.mode = mode or os.environ.get(ARTIFACT_MODE_ENV, 'pretty')
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown artifact mode: {self.mode}")
+        self.encoder = encoder or ('orjson' if 'orjson' in ENCODERS else 'json')
+        if self.encoder not in ENCODERS:
+            raise ValueError(f"Unknown or unavailable JSON encoder: {self.encoder}")
+        self.batch_size = batch_size
+
+    def iter_chunks(self, data):
+        """Yield the encoded artifact as a sequence of byte chunks."""
+        if self.mode == 'pretty':
+            encoder = json.JSONEncoder(indent=2, default=str)
+            for chunk in encoder.iterencode(data):
+                yield chunk.encode('utf-8')
+        else:
+            yield from self._iter_compact(data, ENCODERS[self.encoder])
+
+    def _iter_compact(self, data, dumps):
+        """Encode containers piecewise and everything else in one call."""
+        if isinstance(data, dict) and all(isinstance(key, str) for key in data):
+            yield b'{'
+            for position, (key, value) in enumerate(data.items()):
+                yield (b',' if position else b'') + dumps(key) + b':'
+                yield from self._iter_compact(value, dumps)
+            yield b'}'
+        elif isinstance(data, list) and len(data) > self.batch_size:
+            yield b'['
+            for start in range(0, len(data), self.batch_size):
+                batch = dumps(data[start:start + self.batch_size])
+                yield (b',' if start else b'') + batch[1:-1]
+            yield b']'
+        else:
+            yield dumps(data)
+
+    def write(self, data, output_path):
+        """Write data to output_path, creating the parent directory if needed."""
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        with open(output_path, 'wb') as f:
+            for chunk in self.iter_chunks(data):
+                f.write(chunk)
+        return output_path
@@ -0,0 +1,34 @@
+"""
+Chart Data Module
+Builds JSON-ready chart_data lists straight from column arrays.
+"""
+
+import numpy as np
+import pandas as pd
+
+def floats(values):
+    """Column as a list of Python floats."""
+    return np.asarray(values, dtype='float64').tolist()
+
+def ints(values):
+    """Column as a list of Python ints."""
+    return np.asarray(values, dtype='int64').tolist()
+
+def strings(values):
+    """Column as a list of Python strings."""
+    return [str(value) for value in np.asarray(values, dtype=object).tolist()]
+
+def dates(values, fmt='%Y-%m-%d'):
+    """Datetime column formatted in one vectorized strftime call."""
+    return pd.DatetimeIndex(values).strftime(fmt).tolist()
+
+def records(**columns):
+    """
+    Zip equal-length columns into a list of row dicts.
+
+    Columns should already be Python lists (see floats/ints/strings/dates),
+    so no per-row pandas access or scalar conversion is needed. Keys keep
+    the order they are passed in.
+    """
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
@@ -0,0 +1,113 @@
+"""
+Co-occurrence Module
+Sparse customer x item incidence matrix with pairwise co-occurrence counts
+and association metrics for cross-sell analysis.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+class CooccurrenceMatrix:
+    """
+    Pairwise item co-occurrence from a single sparse matrix product.
+
+    The incidence matrix X has one row per customer and one column per
+    item, with X[c, i] = 1 when the customer's total spend on the item is
+    positive. X.T @ X then holds, in one product, the number of customers
+    who bought each pair of items (the diagonal is each item's customer
+    count). Only non-zero pairs are stored, so memory grows with the
+    number of observed pairs rather than with items squared or customers
+    times items.
+    """
+
+    def __init__(self, df, customer_col='Customer_ID', item_col='Product_Category', value_col='Total_Amount'):
+        self.df = df
+        self.customer_col = customer_col
+        self.item_col = item_col
+        self.value_col = value_col
+        self.items = None
+        self.incidence = None
+        self.counts = None
+
+    def build(self):
+        """Build the incidence matrix and the item x item co-occurrence counts."""
+        customer_codes, customers = pd.factorize(self.df[self.customer_col], sort=True)
+        item_codes, self.items = pd.factorize(self.df[self.item_col], sort=True)
+        valid = (customer_codes >= 0) & (item_codes >= 0)
+
+        # Duplicate (customer, item) entries are summed, giving spend per pair
+        spend = sparse.csr_matrix(
+            (self.df[self.value_col].to_numpy(dtype='float64')[valid],
+             (customer_codes[valid], item_codes[valid])),
+            shape=(len(customers), len(self.items))
+        )
+        spend.eliminate_zeros()
+        self.incidence = (spend > 0).astype(np.int32)
+        self.counts = (self.incidence.T @ self.incidence).tocsr()
+        return self
+
+    @property
+    def n_customers(self):
+        return self.incidence.shape[0]
+
+    def items_per_customer(self):
+        """Number of distinct items bought by each customer."""
+        return np.asarray(self.incidence.sum(axis=1)).ravel()
+
+    def pair_metrics(self, include_zero=False):
+        """
+        Association metrics for every item pair (i, j) with i before j.
+
+        Columns: antecedent, consequent, customers_bought_both,
+        base_category_customers, support, confidence, lift and
+        cross_sell_rate (confidence as a percentage). Pairs no customer
+        bought together are left out unless include_zero is True.
+        """
+        item_counts = self.counts.diagonal().astype('int64')
+
+        if include_zero:
+            i, j = np.triu_indices(len(self.items), k=1)
+            both = np.asarray(self.counts[i, j]).ravel().astype('int64')
+        else:
+            upper = sparse.triu(self.counts, k=1).tocoo()
+            i, j, both = upper.row, upper.col, upper.data.astype('int64')
+            order = np.lexsort((j, i))
+            i, j, both = i[order], j[order], both[order]
+
+        # Antecedents nobody bought have no defined confidence
+        has_base = item_counts[i] > 0
+        i, j, both = i[has_base], j[has_base], both[has_base]
+
+        n = self.n_customers
+        base = item_counts[i]
+        confidence = both / base
+        consequent_support = item_counts[j] / n
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lift = np.where(consequent_support > 0, confidence / consequent_support, np.nan)
+
+        return pd.DataFrame({
+            'antecedent': self.items[i],
+            'consequent': self.items[j],
+            'customers_bought_both': both,
+            'base_category_customers': base,
+            'support': both / n,
+            'confidence': confidence,
+            'lift': lift,
+            'cross_sell_rate': both / base * 100
+        })
+
+    def top_pairs(self, k=5):
+        """
+        The k pairs with the highest cross_sell_rate, ties in item order.
+
+        Zero-count pairs are only filled in when there are fewer than k
+        co-purchased pairs.
+        """
+        pairs = self.pair_metrics()
+        if len(pairs) < k:
+            pairs = self.pair_metrics(include_zero=True)
+
+        # Stable descending sort keeps item-pair order among equal rates
+        return pairs.sort_values('cross_sell_rate', ascending=False, kind='stable').head(k)
@@ -0,0 +1,303 @@
+"""
+Correlation Module
+Pearson, Spearman and Kendall correlation matrices with p-values over the
+numeric, derived and one-hot encoded categorical columns, accumulated
+chunk by chunk from mergeable summaries.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from sketches import CoMomentAccumulator, FrequencySketch, QuantileSketch
+
+NUMERIC_COLUMNS = ['Age', 'Quantity', 'Price_per_Unit', 'Total_Amount']
+DERIVED_COLUMNS = ['Month', 'Day_of_Week']
+CATEGORICAL_COLUMNS = ['Gender', 'Product_Category', 'Age_Group']
+
+def _t_test_p_values(r, n):
+    """Two-sided p-values of correlation coefficients under H0: rho = 0 (t with n - 2 df)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = r * np.sqrt((n - 2) / (1 - r ** 2))
+        p_values = 2 * stats.t.sf(np.abs(t), n - 2)
+    return np.where(np.abs(r) >= 1, 0.0, p_values)
+
+def kendall_from_table(table):
+    """
+    Kendall's tau-b and its asymptotic p-value from a contingency table.
+
+    table[i, j] counts the rows whose first column falls in (ordered) bin i
+    and second column in bin j. Concordant and discordant pairs come from
+    2-D cumulative sums and the tie corrections from the margins, giving
+    the same tau-b and p-value as scipy.stats.kendalltau(method='asymptotic')
+    on the binned data.
+    """
+    table = np.asarray(table, dtype='float64')
+    n = table.sum()
+    if n < 3:
+        return np.nan, np.nan
+
+    # Rows in strictly higher bins of both columns (concordant) or higher/lower (discordant)
+    higher_both = np.zeros_like(table)
+    higher_both[:-1, :-1] = table[::-1, ::-1].cumsum(axis=0).cumsum(axis=1)[::-1, ::-1][1:, 1:]
+    higher_lower = np.zeros_like(table)
+    higher_lower[:-1, 1:] = table[::-1, :].cumsum(axis=0)[::-1, :].cumsum(axis=1)[1:, :-1]
+    concordant_minus_discordant = (table * higher_both).sum() - (table * higher_lower).sum()
+
+    def tie_terms(margin):
+        margin = margin[margin > 1]
+        return ((margin * (margin - 1) / 2).sum(), (margin * (margin - 1) * (margin - 2)).sum(),
+                (margin * (margin - 1) * (2 * margin + 5)).sum())
+
+    x_ties, x0, x1 = tie_terms(table.sum(axis=1))
+    y_ties, y0, y1 = tie_terms(table.sum(axis=0))
+    total = n * (n - 1) / 2
+    if x_ties == total or y_ties == total:
+        return np.nan, np.nan
+
+    tau = concordant_minus_discordant / np.sqrt(total - x_ties) / np.sqrt(total - y_ties)
+    m = n * (n - 1)
+    variance = (m * (2 * n + 5) - x1 - y1) / 18 + 2 * x_ties * y_ties / m + x0 * y0 / (9 * m * (n - 2))
+    p_value = 2 * stats.norm.sf(abs(concordant_minus_discordant) / np.sqrt(variance))
+    return float(np.clip(tau, -1.0, 1.0)), float(p_value)
+
+class CorrelationEngine:
+    """
+    Pearson, Spearman and Kendall matrices over every analysis column.
+
+    Works in two passes over the same chunks (or one in-memory frame):
+    1. profile() counts each column's distinct values (FrequencySketch),
+       feeds a QuantileSketch, and collects the categories to one-hot encode.
+    2. accumulate() builds the column matrix and folds it, its mid-rank
+       transform and its bin codes into mergeable summaries: co-moments
+       for Pearson, co-moments of the ranks for Spearman and pairwise
+       contingency tables for Kendall.
+
+    Columns with at most max_bins distinct values (all of them in this
+    data, including Total_Amount) are ranked and binned from their exact
+    value counts, so all three matrices are exact. Columns with more
+    values are ranked from the quantile sketch and binned into max_bins
+    quantile bins, which makes their Spearman and Kendall coefficients
+    approximate; 'exact_ranks' marks which columns those are. Rows with a
+    missing value in any column are skipped.
+    """
+
+    def __init__(self, numeric_columns=None, categorical_columns=None, max_bins=256, capacity=2048):
+        self.numeric_columns = numeric_columns or NUMERIC_COLUMNS + DERIVED_COLUMNS
+        self.categorical_columns = CATEGORICAL_COLUMNS if categorical_columns is None else categorical_columns
+        self.max_bins = max_bins
+        self.capacity = capacity
+        self.frequencies = {}
+        self.sketches = {}
+        self.category_order = {}
+        self.category_counts = {}
+        self.rows = 0
+        self.bases = self.outputs = None
+        self.pearson = self.spearman = None
+        self.tables = {}
+
+    def _columns(self, chunk):
+        numeric = [col for col in self.numeric_columns if col in chunk.columns]
+        categorical = [col for col in self.categorical_columns if col in chunk.columns]
+        return numeric, categorical
+
+    def _complete(self, chunk):
+        numeric, categorical = self._columns(chunk)
+        return chunk[numeric + categorical].dropna()
+
+    def profile(self, chunk):
+        """First pass: value counts and quantile sketches of the numeric columns, category counts."""
+        chunk = self._complete(chunk)
+        numeric, categorical = self._columns(chunk)
+        self.rows += len(chunk)
+        for col in numeric:
+            values = chunk[col].to_numpy(dtype='float64')
+            self.frequencies.setdefault(col, FrequencySketch(capacity=self.max_bins)).update(values)
+            self.sketches.setdefault(col, QuantileSketch(capacity=self.capacity)).update(values)
+        for col in categorical:
+            if isinstance(chunk[col].dtype, pd.CategoricalDtype):
+                self.category_order[col] = list(chunk[col].cat.categories)
+            counts = chunk[col].value_counts(sort=False)
+            for category, count in counts[counts > 0].items():
+                self.category_counts[(col, category)] = self.category_counts.get((col, category), 0) + int(count)
+        self.outputs = None
+        return self
+
+    def _prepare(self):
+        """
+        Rank and bin transforms, fixed after the first pass.
+
+        Each base column (a numeric column or a whole categorical) is
+        (name, levels, ranks, exact): levels are the distinct values,
+        quantile bin edges or categories, and ranks the mid-rank of each
+        distinct value, the quantile sketch, or each category's share of
+        the rows. Output columns are (name, base, category index or None).
+        """
+        bases, outputs = [], []
+        for col, frequencies in self.frequencies.items():
+            if not frequencies.reduced and len(frequencies.counts) <= self.max_bins:
+                counts = frequencies.counts.sort_index()
+                cumulative = counts.to_numpy(dtype='float64').cumsum()
+                mid_ranks = (cumulative - counts.to_numpy() / 2) / cumulative[-1]
+                bases.append((col, counts.index.to_numpy(dtype='float64'), mid_ranks, True))
+            else:
+                sketch = self.sketches[col]
+                edges = np.unique([sketch.quantile(q) for q in np.linspace(0, 1, self.max_bins + 1)[1:-1]])
+                bases.append((col, edges, sketch, False))
+            outputs.append((col, len(bases) - 1, None))
+
+        for col in self.categorical_columns:
+            observed = [category for (column, category) in self.category_counts if column == col]
+            if not observed:
+                continue
+            order = self.category_order.get(col)
+            # Categories in their dtype order (sorted for plain columns), whichever chunk saw them first
+            categories = sorted(observed, key=order.index if order else None)
+            shares = np.array([self.category_counts[(col, category)] for category in categories]) / self.rows
+            bases.append((col, categories, shares, True))
+            outputs.extend((f'{col}={category}', len(bases) - 1, index) for index, category in enumerate(categories))
+
+        self.bases, self.outputs = bases, outputs
+        self.bins = [len(levels) + (0 if exact else 1) for _, levels, _, exact in bases]
+        columns = [name for name, *_ in outputs]
+        self.pearson = CoMomentAccumulator(columns)
+        self.spearman = CoMomentAccumulator(columns)
+        self.tables = {}
+        self.base_counts = [np.zeros(bins, dtype='int64') for bins in self.bins]
+        return outputs
+
+    def _encode(self, chunk):
+        """Bin codes per base column and (values, mid-ranks) per output column, column-major."""
+        rows = len(chunk)
+        codes = np.empty((len(self.bases), rows), dtype='int64')
+        values = np.empty((len(self.outputs), rows))
+        ranks = np.empty((len(self.outputs), rows))
+
+        for base, (col, levels, ranker, exact) in enumerate(self.bases):
+            if isinstance(levels, list):
+                codes[base] = pd.Categorical(chunk[col], categories=levels).codes
+            elif exact:
+                codes[base] = np.searchsorted(levels, chunk[col].to_numpy(dtype='float64'))
+            else:
+                codes[base] = np.searchsorted(levels, chunk[col].to_numpy(dtype='float64'), side='right')
+
+        for position, (name, base, category) in enumerate(self.outputs):
+            col, levels, ranker, exact = self.bases[base]
+            if category is not None:
+                # One-hot: the zeros rank below the ones, from the category's share of the rows
+                indicator = codes[base] == category
+                share = ranker[category]
+                values[position] = indicator
+                ranks[position] = np.where(indicator, 1 - share / 2, (1 - share) / 2)
+            else:
+                values[position] = chunk[col].to_numpy(dtype='float64')
+                if exact:
+                    ranks[position] = ranker[codes[base]]
+                else:
+                    ranks[position] = (ranker.cdf(values[position]) + ranker.cdf(values[position], strict=True)) / 2
+
+        return values, ranks, codes
+
+    def accumulate(self, chunk):
+        """
+        Second pass: fold a chunk into the Pearson, Spearman and Kendall summaries.
+
+        Kendall contingency tables are kept per pair of base columns;
+        one-hot tables are collapsed from them in matrices().
+        """
+        if self.outputs is None:
+            self._prepare()
+        chunk = self._complete(chunk)
+        values, ranks, codes = self._encode(chunk)
+
+        self.pearson.update(values.T)
+        self.spearman.update(ranks.T)
+
+        for i, bins in enumerate(self.bins):
+            self.base_counts[i] += np.bincount(codes[i], minlength=bins)
+            for j in range(i + 1, len(self.bins)):
+                table = np.bincount(codes[i] * self.bins[j] + codes[j], minlength=bins * self.bins[j])
+                table = table.reshape(bins, self.bins[j])
+                self.tables[(i, j)] = self.tables[(i, j)] + table if (i, j) in self.tables else table
+        return self
+
+    def _pair_table(self, i, j):
+        """Contingency table of output columns i and j, collapsed from their base columns' table."""
+        (_, base_i, category_i), (_, base_j, category_j) = self.outputs[i], self.outputs[j]
+        if base_i == base_j:
+            table = np.diag(self.base_counts[base_i])
+        elif base_i < base_j:
+            table = self.tables[(base_i, base_j)]
+        else:
+            table = self.tables[(base_j, base_i)].T
+
+        def collapse(matrix, category):
+            if category is None:
+                return matrix
+            return np.vstack([matrix.sum(axis=0) - matrix[category], matrix[category]])
+
+        return collapse(collapse(table, category_i).T, category_j).T
+
+    def merge(self, other):
+        """Combine an engine that accumulated other chunks after the same profile."""
+        self.pearson.merge(other.pearson)
+        self.spearman.merge(other.spearman)
+        for key, table in other.tables.items():
+            self.tables[key] = self.tables[key] + table if key in self.tables else table
+        for counts, other_counts in zip(self.base_counts, other.base_counts):
+            counts += other_counts
+        return self
+
+    def run(self, df):
+        """Profile and accumulate an in-memory frame."""
+        return self.run_chunks(lambda: [df])
+
+    def run_chunks(self, make_chunks):
+        """
+        Both passes over chunked input.
+
+        make_chunks is called once per pass and must return a fresh
+        iterator over the same chunks.
+        """
+        for chunk in make_chunks():
+            self.profile(chunk)
+        self._prepare()
+        for chunk in make_chunks():
+            self.accumulate(chunk)
+        return self
+
+    def matrices(self):
+        """Coefficient and p-value matrices as arrays, keyed by method."""
+        n = self.pearson.n
+        pearson = self.pearson.correlation()
+        spearman = self.spearman.correlation()
+
+        width = len(self.outputs)
+        kendall = np.eye(width)
+        kendall_p = np.zeros((width, width))
+        for i in range(width):
+            for j in range(i + 1, width):
+                tau, p_value = kendall_from_table(self._pair_table(i, j))
+                kendall[i, j] = kendall[j, i] = tau
+                kendall_p[i, j] = kendall_p[j, i] = p_value
+
+        return {
+            'pearson': (pearson, _t_test_p_values(pearson, n)),
+            'spearman': (spearman, _t_test_p_values(spearman, n)),
+            'kendall': (kendall, kendall_p)
+        }
+
+    def to_dict(self):
+        """Matrices as nested lists (row-major, in 'columns' order) with None for undefined entries."""
+        def as_lists(matrix):
+            return [[None if np.isnan(value) else float(value) for value in row] for row in matrix]
+
+        coefficient_names = {'pearson': 'r', 'spearman': 'rho', 'kendall': 'tau_b'}
+        output = {
+            'columns': [name for name, *_ in self.outputs],
+            'rows': int(self.pearson.n),
+            'exact_ranks': {name: bool(self.bases[base][3]) for name, base, _ in self.outputs}
+        }
+        for method, (coefficients, p_values) in self.matrices().items():
+            output[method] = {coefficient_names[method]: as_lists(coefficients), 'p_value': as_lists(p_values)}
+        return output
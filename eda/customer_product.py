@@ -5,32 +5,40 @@ Analyzes customer behavior and product performance patterns.
 
 import pandas as pd
 import numpy as np
-import json
 import os
 from collections import defaultdict
 
+from customer_facts import CustomerFactTable
+from rfm import RFMEngine, scores_path
+from cooccurrence import CooccurrenceMatrix
+from market_basket import MarketBasketMiner
+from chart_data import records, floats, ints, strings
+from artifacts import ArtifactWriter
+
 class CustomerProductAnalyzer:
     """
     Performs customer behavior and product performance analysis.
+    
+    With a backend (sql_backend.SQLBackend), the demographic aggregations
+    are computed by the SQL engine instead of grouping df in pandas.
     """
     
-    def __init__(self, df):
+    def __init__(self, df, customer_facts=None, backend=None):
         self.df = df
+        self.customer_facts = customer_facts
+        self.backend = backend
+        self.customer_intervals = None
+        self._purchase_gaps = None
+        self.rfm_engine = None
         self.cp_results = {}
     
     def customer_behavior_analysis(self):
         """Analyze customer purchasing behavior patterns."""
-        # Customer-level aggregations
-        customer_metrics = self.df.groupby('Customer_ID').agg({
-            'Total_Amount': ['sum', 'mean', 'count'],
-            'Quantity': 'sum',
-            'Date': ['min', 'max'],
-            'Product_Category': lambda x: x.nunique()
-        }).round(2)
+        # Customer-level aggregations (shared fact table)
+        if self.customer_facts is None:
+            self.customer_facts = CustomerFactTable(self.df).build()
         
-        customer_metrics.columns = ['total_spent', 'avg_transaction', 'transaction_count', 
-                                   'total_quantity', 'first_purchase', 'last_purchase', 
-                                   'categories_purchased']
+        customer_metrics = self.customer_facts[CustomerFactTable.COLUMNS].copy()
         
         # Calculate customer lifetime (days)
         customer_metrics['customer_lifetime_days'] = (
@@ -90,14 +98,12 @@ class CustomerProductAnalyzer:
             ['total_spent', 'transaction_count', 'avg_transaction']
         ].round(2)
         
-        top_customers_list = []
-        for customer_id, row in top_customers.iterrows():
-            top_customers_list.append({
-                'customer_id': str(customer_id),
-                'total_spent': float(row['total_spent']),
-                'transaction_count': int(row['transaction_count']),
-                'avg_transaction': float(row['avg_transaction'])
-            })
+        top_customers_list = records(
+            customer_id=strings(top_customers.index),
+            total_spent=floats(top_customers['total_spent']),
+            transaction_count=ints(top_customers['transaction_count']),
+            avg_transaction=floats(top_customers['avg_transaction'])
+        )
         
         self.cp_results['customer_behavior'] = {
             'statistics': behavior_stats,
@@ -107,10 +113,26 @@ class CustomerProductAnalyzer:
         
         return self.cp_results['customer_behavior']
     
+    def rfm_analysis(self):
+        """
+        Score customers on recency, frequency and monetary value with
+        sketch-based quantile bins; the per-customer scores are written to
+        a columnar file by save_results().
+        """
+        if self.customer_facts is None:
+            self.customer_facts = CustomerFactTable(self.df).build()
+        
+        self.rfm_engine = RFMEngine()
+        self.rfm_engine.run(self.customer_facts)
+        rfm = self.rfm_engine.to_dict()
+        
+        self.cp_results['rfm'] = rfm
+        return rfm
+    
     def product_performance_analysis(self):
         """Analyze product category performance."""
         # Product category analysis
-        category_metrics = self.df.groupby('Product_Category').agg({
+        category_metrics = self.df.groupby('Product_Category', observed=True).agg({
             'Total_Amount': ['sum', 'mean', 'count'],
             'Quantity': 'sum',
             'Price_per_Unit': 'mean',
@@ -130,17 +152,15 @@ class CustomerProductAnalyzer:
         category_metrics['customer_rank'] = category_metrics['unique_customers'].rank(ascending=False, method='dense')
         
         # Convert to chart data
-        category_chart_data = []
-        for category, row in category_metrics.iterrows():
-            category_chart_data.append({
-                'category': str(category),
-                'revenue': float(row['total_revenue']),
-                'transactions': int(row['transaction_count']),
-                'customers': int(row['unique_customers']),
-                'avg_price': float(row['avg_price']),
-                'market_share': float(row['market_share']),
-                'avg_transaction': float(row['avg_transaction'])
-            })
+        category_chart_data = records(
+            category=strings(category_metrics.index),
+            revenue=floats(category_metrics['total_revenue']),
+            transactions=ints(category_metrics['transaction_count']),
+            customers=ints(category_metrics['unique_customers']),
+            avg_price=floats(category_metrics['avg_price']),
+            market_share=floats(category_metrics['market_share']),
+            avg_transaction=floats(category_metrics['avg_transaction'])
+        )
         
         # Category performance statistics
         performance_stats = {
@@ -161,43 +181,22 @@ class CustomerProductAnalyzer:
     
     def customer_product_matrix(self):
         """Analyze customer-product relationships."""
-        # Create customer-product matrix
-        cp_matrix = self.df.pivot_table(
-            index='Customer_ID', 
-            columns='Product_Category', 
-            values='Total_Amount', 
-            aggfunc='sum', 
-            fill_value=0
-        )
-        
-        # Cross-selling analysis
-        cross_sell_matrix = (cp_matrix > 0).astype(int)  # Binary matrix
-        
-        # Calculate category co-occurrence
-        category_pairs = {}
-        categories = list(cp_matrix.columns)
-        
-        for i, cat1 in enumerate(categories):
-            for j, cat2 in enumerate(categories):
-                if i < j:  # Avoid duplicates
-                    # Count customers who bought both categories
-                    both_count = ((cross_sell_matrix[cat1] == 1) & (cross_sell_matrix[cat2] == 1)).sum()
-                    cat1_count = (cross_sell_matrix[cat1] == 1).sum()
-                    
-                    if cat1_count > 0:
-                        cross_sell_rate = (both_count / cat1_count) * 100
-                        category_pairs[f"{cat1} → {cat2}"] = {
-                            'customers_bought_both': int(both_count),
-                            'cross_sell_rate': float(cross_sell_rate),
-                            'base_category_customers': int(cat1_count)
-                        }
-        
-        # Sort by cross-sell rate
-        sorted_pairs = sorted(category_pairs.items(), key=lambda x: x[1]['cross_sell_rate'], reverse=True)
-        top_cross_sell = dict(sorted_pairs[:5])  # Top 5 cross-selling opportunities
+        # Customer x category incidence and all pairwise co-occurrence counts in one product
+        cooccurrence = CooccurrenceMatrix(self.df).build()
+        
+        top_cross_sell = {}
+        for pair in cooccurrence.top_pairs(5).itertuples(index=False):
+            top_cross_sell[f"{pair.antecedent} → {pair.consequent}"] = {
+                'customers_bought_both': int(pair.customers_bought_both),
+                'cross_sell_rate': float(pair.cross_sell_rate),
+                'base_category_customers': int(pair.base_category_customers),
+                'support': float(pair.support),
+                'confidence': float(pair.confidence),
+                'lift': float(pair.lift)
+            }
         
         # Customer diversity analysis
-        customer_diversity = cross_sell_matrix.sum(axis=1)  # Number of categories per customer
+        customer_diversity = pd.Series(cooccurrence.items_per_customer())  # Number of categories per customer
         diversity_stats = {
             'avg_categories_per_customer': float(customer_diversity.mean()),
             'max_categories_per_customer': int(customer_diversity.max()),
@@ -213,13 +212,25 @@ class CustomerProductAnalyzer:
         
         return self.cp_results['customer_product_matrix']
     
-    def demographic_analysis(self):
-        """Analyze customer demographics and purchasing patterns."""
-        demographic_results = {}
+    def market_basket_analysis(self, basket='customer_day', item_col='Product_Category',
+                               min_support=0.01, min_confidence=0.1):
+        """Mine frequent itemsets and association rules over baskets with FP-Growth."""
+        miner = MarketBasketMiner(self.df, basket=basket, item_col=item_col,
+                                  min_support=min_support, min_confidence=min_confidence)
+        self.cp_results['market_basket'] = miner.run()
+        
+        return self.cp_results['market_basket']
+    
+    def demographic_tables(self):
+        """Gender summary, age group summary and gender x category revenue (None when a column is missing)."""
+        if self.backend is not None:
+            return self.backend.demographic_tables()
+        
+        gender_analysis = age_analysis = gender_product_pref = None
         
         # Gender analysis
         if 'Gender' in self.df.columns:
-            gender_analysis = self.df.groupby('Gender').agg({
+            gender_analysis = self.df.groupby('Gender', observed=True).agg({
                 'Total_Amount': ['sum', 'mean', 'count'],
                 'Customer_ID': 'nunique',
                 'Product_Category': lambda x: x.value_counts().index[0]  # Most popular category
@@ -227,18 +238,6 @@ class CustomerProductAnalyzer:
             
             gender_analysis.columns = ['total_spent', 'avg_transaction', 'transaction_count', 
                                      'unique_customers', 'top_category']
-            
-            gender_chart_data = []
-            for gender, row in gender_analysis.iterrows():
-                gender_chart_data.append({
-                    'gender': str(gender),
-                    'total_spent': float(row['total_spent']),
-                    'avg_transaction': float(row['avg_transaction']),
-                    'customers': int(row['unique_customers']),
-                    'top_category': str(row['top_category'])
-                })
-            
-            demographic_results['gender'] = gender_chart_data
         
         # Age group analysis
         if 'Age_Group' in self.df.columns:
@@ -248,25 +247,46 @@ class CustomerProductAnalyzer:
             }).round(2)
             
             age_analysis.columns = ['total_spent', 'avg_transaction', 'transaction_count', 'unique_customers']
-            
-            age_chart_data = []
-            for age_group, row in age_analysis.iterrows():
-                if pd.notna(age_group):
-                    age_chart_data.append({
-                        'age_group': str(age_group),
-                        'total_spent': float(row['total_spent']),
-                        'avg_transaction': float(row['avg_transaction']),
-                        'customers': int(row['unique_customers'])
-                    })
-            
-            demographic_results['age_groups'] = age_chart_data
         
         # Product preferences by demographics
         if 'Gender' in self.df.columns:
-            gender_product_pref = self.df.groupby(['Gender', 'Product_Category']).agg({
+            gender_product_pref = self.df.groupby(['Gender', 'Product_Category'], observed=True).agg({
                 'Total_Amount': 'sum'
             }).unstack(fill_value=0)
+        
+        return gender_analysis, age_analysis, gender_product_pref
+    
+    def demographic_analysis(self):
+        """Analyze customer demographics and purchasing patterns."""
+        demographic_results = {}
+        gender_analysis, age_analysis, gender_product_pref = self.demographic_tables()
+        
+        # Gender analysis
+        if gender_analysis is not None:
+            gender_chart_data = records(
+                gender=strings(gender_analysis.index),
+                total_spent=floats(gender_analysis['total_spent']),
+                avg_transaction=floats(gender_analysis['avg_transaction']),
+                customers=ints(gender_analysis['unique_customers']),
+                top_category=strings(gender_analysis['top_category'])
+            )
+            
+            demographic_results['gender'] = gender_chart_data
+        
+        # Age group analysis
+        if age_analysis is not None:
+            age_analysis = age_analysis[age_analysis.index.notna()]
+            age_chart_data = records(
+                age_group=strings(age_analysis.index),
+                total_spent=floats(age_analysis['total_spent']),
+                avg_transaction=floats(age_analysis['avg_transaction']),
+                customers=ints(age_analysis['unique_customers'])
+            )
             
+            demographic_results['age_groups'] = age_chart_data
+        
+        # Product preferences by demographics
+        if gender_product_pref is not None:
             # Normalize to percentages
             gender_product_pref_pct = gender_product_pref.div(gender_product_pref.sum(axis=1), axis=0) * 100
             
@@ -282,53 +302,86 @@ class CustomerProductAnalyzer:
         self.cp_results['demographics'] = demographic_results
         return demographic_results
     
+    def customer_interval_distributions(self):
+        """
+        Per-customer distribution of days between consecutive purchases.
+        
+        Transactions are sorted once by (customer, date) and differenced
+        within each customer run, so the cost is a single sort rather than
+        one scan of the table per customer. Returns a frame indexed by
+        Customer_ID with interval count, mean, median and p90, covering
+        customers with at least two purchases.
+        """
+        if self.customer_intervals is not None:
+            return self.customer_intervals
+        
+        customer_ids = self.df['Customer_ID']
+        if isinstance(customer_ids.dtype, pd.CategoricalDtype):
+            codes = customer_ids.cat.codes.to_numpy()
+        else:
+            codes = pd.factorize(customer_ids)[0]
+        dates = self.df['Date'].to_numpy()
+        
+        order = np.lexsort((dates, codes))
+        codes, dates = codes[order], dates[order]
+        same_customer = codes[1:] == codes[:-1]
+        
+        self._purchase_gaps = pd.DataFrame({
+            'Customer_ID': customer_ids.to_numpy()[order][1:][same_customer],
+            'interval_days': ((dates[1:] - dates[:-1]) // np.timedelta64(1, 'D'))[same_customer]
+        })
+        
+        grouped = self._purchase_gaps.groupby('Customer_ID', observed=True)['interval_days']
+        self.customer_intervals = grouped.agg(
+            interval_count='count',
+            mean_interval='mean',
+            median_interval='median'
+        )
+        self.customer_intervals['p90_interval'] = grouped.quantile(0.9)
+        
+        return self.customer_intervals
+    
     def purchase_patterns(self):
         """Analyze purchase patterns and customer journey."""
         patterns = {}
         
         # Transaction timing patterns
         if 'Date' in self.df.columns:
-            # Calculate days between purchases for each customer
-            customer_intervals = []
-            for customer in self.df['Customer_ID'].unique():
-                customer_data = self.df[self.df['Customer_ID'] == customer].sort_values('Date')
-                if len(customer_data) > 1:
-                    dates = customer_data['Date'].tolist()
-                    intervals = [(dates[i] - dates[i-1]).days for i in range(1, len(dates))]
-                    customer_intervals.extend(intervals)
+            intervals = self.customer_interval_distributions()
+            customer_intervals = self._purchase_gaps['interval_days']
             
-            if customer_intervals:
+            if len(customer_intervals):
                 interval_stats = {
-                    'avg_days_between_purchases': float(np.mean(customer_intervals)),
-                    'median_days_between_purchases': float(np.median(customer_intervals)),
-                    'min_days_between_purchases': int(min(customer_intervals)),
-                    'max_days_between_purchases': int(max(customer_intervals))
+                    'avg_days_between_purchases': float(customer_intervals.mean()),
+                    'median_days_between_purchases': float(customer_intervals.median()),
+                    'min_days_between_purchases': int(customer_intervals.min()),
+                    'max_days_between_purchases': int(customer_intervals.max()),
+                    'p90_days_between_purchases': float(customer_intervals.quantile(0.9)),
+                    'customers_with_repeat_purchases': int(len(intervals)),
+                    'avg_customer_median_interval': float(intervals['median_interval'].mean()),
+                    'avg_customer_p90_interval': float(intervals['p90_interval'].mean())
                 }
                 patterns['purchase_intervals'] = interval_stats
         
         # Quantity patterns
         quantity_patterns = self.df['Quantity'].value_counts().sort_index()
-        quantity_distribution = []
-        for qty, count in quantity_patterns.items():
-            quantity_distribution.append({
-                'quantity': int(qty),
-                'transactions': int(count),
-                'percentage': float(count / len(self.df) * 100)
-            })
+        quantity_distribution = records(
+            quantity=ints(quantity_patterns.index),
+            transactions=ints(quantity_patterns),
+            percentage=floats(quantity_patterns / len(self.df) * 100)
+        )
         
         patterns['quantity_distribution'] = quantity_distribution
         
         # Price range preferences
         if 'Price_Category' in self.df.columns:
             price_preferences = self.df['Price_Category'].value_counts()
-            price_distribution = []
-            for price_cat, count in price_preferences.items():
-                if pd.notna(price_cat):
-                    price_distribution.append({
-                        'price_category': str(price_cat),
-                        'transactions': int(count),
-                        'percentage': float(count / len(self.df) * 100)
-                    })
+            price_preferences = price_preferences[price_preferences.index.notna()]
+            price_distribution = records(
+                price_category=strings(price_preferences.index),
+                transactions=ints(price_preferences),
+                percentage=floats(price_preferences / len(self.df) * 100)
+            )
             
             patterns['price_preferences'] = price_distribution
         
@@ -395,12 +448,18 @@ class CustomerProductAnalyzer:
         self.customer_behavior_analysis()
         print("✓ Customer behavior analysis completed")
         
+        self.rfm_analysis()
+        print("✓ RFM scoring completed")
+        
         self.product_performance_analysis()
         print("✓ Product performance analysis completed")
         
         self.customer_product_matrix()
         print("✓ Customer-product matrix analysis completed")
         
+        self.market_basket_analysis()
+        print("✓ Market basket analysis completed")
+        
         self.demographic_analysis()
         print("✓ Demographic analysis completed")
         
@@ -414,10 +473,9 @@ class CustomerProductAnalyzer:
     
     def save_results(self, output_path='visuals/customer_product_analysis.json'):
         """Save all customer and product analysis results."""
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        with open(output_path, 'w') as f:
-            json.dump(self.cp_results, f, indent=2)
+        ArtifactWriter().write(self.cp_results, output_path)
+        if self.rfm_engine is not None:
+            self.rfm_engine.save_scores(scores_path(os.path.dirname(output_path)))
         
         print(f"✓ Customer & product analysis results saved to {output_path}")
 
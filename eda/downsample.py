@@ -0,0 +1,136 @@
+"""
+Downsampling Module
+Reduces long time series to a target number of points for charting, with
+Largest-Triangle-Three-Buckets (LTTB) or min/max bucketing, at several
+resolutions the dashboard can switch between.
+"""
+
+import numpy as np
+import pandas as pd
+
+def _bucket_edges(n, buckets):
+    """Start offsets of `buckets` equal-width buckets over points 1..n-2, plus the end (n-1)."""
+    edges = np.floor(np.arange(buckets + 1) * (n - 2) / buckets).astype('int64') + 1
+    edges[-1] = n - 1
+    return edges
+
+def lttb_indices(x, y, threshold):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are
+    split into threshold - 2 buckets. From each bucket the point kept is
+    the one forming the largest triangle with the previously kept point
+    and the mean of the next bucket. This preserves the visual shape,
+    including peaks, far better than taking every k-th point.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = _bucket_edges(n, threshold - 2)
+    sizes = np.diff(edges)
+    # Mean of each bucket, with the last point standing in for the bucket after the last one
+    mean_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / sizes, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / sizes, y[-1])
+
+    selected = np.empty(threshold, dtype='int64')
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_x, next_y = mean_x[bucket + 1], mean_y[bucket + 1]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+
+    return selected
+
+def minmax_indices(y, threshold):
+    """
+    Indices of the minimum and maximum of each bucket, plus the first and last points.
+
+    Keeps every extreme value visible, which suits spiky series where
+    the exact peaks matter more than the overall shape. Returns at most
+    threshold points, in order.
+    """
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+
+    buckets = (threshold - 2) // 2
+    edges = _bucket_edges(n, buckets)
+    interior = np.arange(1, n - 1)
+    bucket_of = np.searchsorted(edges, interior, side='right') - 1
+
+    # Sorting by (bucket, value) puts each bucket's minimum first and maximum last
+    order = interior[np.lexsort((y[interior], bucket_of))]
+    starts = np.searchsorted(bucket_of[order - 1], np.arange(buckets))
+    ends = np.append(starts[1:], len(order)) - 1
+    kept = np.concatenate(([0], order[starts], order[ends], [n - 1]))
+    return np.unique(kept)
+
+class Downsampler:
+    """
+    Multi-resolution downsampling of a labelled series for Chart.js.
+
+    Levels hold target_points, target_points * factor, ... points (levels
+    in total). When the finest level would reach the full series length,
+    the full series is used as the last level instead, so short histories
+    are never downsampled at all. The dashboard draws the coarsest level
+    first and switches to a finer one when a narrower date range is
+    shown.
+    """
+
+    METHODS = ('lttb', 'minmax')
+
+    def __init__(self, target_points=500, method='lttb', levels=3, factor=4):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown downsampling method: {method}")
+        if target_points < 4:
+            raise ValueError("target_points must be at least 4")
+        self.target_points = target_points
+        self.method = method
+        self.levels = levels
+        self.factor = factor
+
+    def indices(self, x, y, points):
+        """Indices of at most `points` points representing (x, y)."""
+        if self.method == 'lttb':
+            return lttb_indices(x, y, points)
+        return minmax_indices(y, points)
+
+    def resolutions(self, labels, values, x=None):
+        """
+        The series at every resolution level, coarsest first.
+
+        labels are date strings (used as x when x is not given) and values
+        the series to draw. Each level is {'points', 'labels', 'data'}.
+        """
+        labels = list(labels)
+        values = np.asarray(values, dtype='float64')
+        if x is None:
+            x = pd.to_datetime(pd.Series(labels)).to_numpy('datetime64[D]').astype('int64')
+
+        n = len(values)
+        levels = []
+        for level in range(self.levels):
+            points = self.target_points * self.factor ** level
+            if points >= n:
+                kept = np.arange(n)
+            else:
+                kept = self.indices(x, values, points)
+            levels.append({
+                'points': len(kept),
+                'labels': [labels[i] for i in kept],
+                'data': values[kept].tolist()
+            })
+            if len(kept) == n:
+                break
+
+        return levels
@@ -0,0 +1,198 @@
+"""
+Grouped Hypothesis Tests Module
+Repeats the gender, category and age group spending tests within every
+segment (month, region) from per-group sufficient statistics, with
+multiple-comparison correction across the segments.
+"""
+
+import numpy as np
+from scipy import stats
+
+# Segmentation name -> columns identifying a segment; skipped when a column is missing
+SEGMENTATIONS = {
+    'month': ['Year', 'Month'],
+    'region': ['Region'],
+    'region_month': ['Region', 'Year', 'Month']
+}
+
+FACTORS = ['Gender', 'Product_Category', 'Age_Group']
+
+def _json_value(value):
+    """A segment key as a JSON-serializable scalar."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+def bonferroni(p_values):
+    """Bonferroni-adjusted p-values (NaNs are not counted as tests)."""
+    p_values = np.asarray(p_values, dtype='float64')
+    tests = np.count_nonzero(~np.isnan(p_values))
+    return np.minimum(p_values * tests, 1.0)
+
+def benjamini_hochberg(p_values):
+    """Benjamini-Hochberg adjusted p-values (false discovery rate; NaNs are not counted as tests)."""
+    p_values = np.asarray(p_values, dtype='float64')
+    adjusted = np.full_like(p_values, np.nan)
+    tested = np.flatnonzero(~np.isnan(p_values))
+    if tested.size == 0:
+        return adjusted
+
+    order = tested[np.argsort(p_values[tested], kind='stable')]
+    ranked = p_values[order] * tested.size / np.arange(1, tested.size + 1)
+    # Enforce monotonicity from the largest p-value down
+    adjusted[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return adjusted
+
+def anova_from_sums(n, sums, squares):
+    """
+    One-way ANOVA for every row of per-group (n, sum, sum of squares) arrays.
+
+    Arrays are shaped (cells, groups), with zeros for groups absent from a
+    cell. Returns F, its p-value and the between/within degrees of
+    freedom per cell; cells with fewer than two groups or no residual
+    degrees of freedom get NaN.
+    """
+    n = np.asarray(n, dtype='float64')
+    present = n > 0
+    total_n = n.sum(axis=1)
+    groups = present.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between_terms = np.where(present, sums ** 2 / np.where(present, n, 1), 0.0).sum(axis=1)
+        correction = sums.sum(axis=1) ** 2 / total_n
+        ss_between = np.maximum(between_terms - correction, 0.0)
+        ss_within = np.maximum(squares.sum(axis=1) - between_terms, 0.0)
+
+        df_between = groups - 1
+        df_within = total_n - groups
+        valid = (df_between >= 1) & (df_within >= 1)
+        f_stat = np.where(valid, (ss_between / df_between) / (ss_within / df_within), np.nan)
+        p_value = np.where(valid, stats.f.sf(f_stat, np.maximum(df_between, 1), np.maximum(df_within, 1)), np.nan)
+
+    return f_stat, p_value, df_between, df_within
+
+def t_from_sums(n, sums, squares):
+    """
+    Pooled-variance two-sample t-test for every row of (cells, 2) sufficient statistics.
+
+    The statistic is mean of the first group minus mean of the second, as
+    scipy's ttest_ind computes it. Cells missing either group get NaN.
+    """
+    n = np.asarray(n, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / n
+        ss_within = np.maximum(squares - sums * means, 0.0).sum(axis=1)
+        df = n.sum(axis=1) - 2
+        valid = (n > 0).all(axis=1) & (df >= 1)
+        pooled = ss_within / df
+        t_stat = np.where(valid, (means[:, 0] - means[:, 1]) / np.sqrt(pooled * (1 / n[:, 0] + 1 / n[:, 1])), np.nan)
+        p_value = np.where(valid, 2 * stats.t.sf(np.abs(t_stat), np.maximum(df, 1)), np.nan)
+    return t_stat, p_value, df
+
+class GroupedTestRunner:
+    """
+    Spending tests repeated within every segment cell.
+
+    update() folds a chunk into per-(segment, gender, category, age group)
+    counts, sums and sums of squares of the value column, with one groupby
+    per segmentation; chunks can come from DataLoader.iter_clean_chunks()
+    or separate partitions. to_dict() collapses those cells onto each
+    factor and derives every t and ANOVA statistic from them at once, so
+    thousands of segment cells cost a few array operations. Adjusted
+    p-values (Bonferroni and Benjamini-Hochberg) treat the cells of one
+    segmentation and factor as one family of tests.
+    """
+
+    def __init__(self, segmentations=None, factors=None, value_column='Total_Amount', alpha=0.05):
+        self.segmentations = SEGMENTATIONS if segmentations is None else segmentations
+        self.factors = FACTORS if factors is None else factors
+        self.value_column = value_column
+        self.alpha = alpha
+        self.cells = {}
+
+    def update(self, chunk):
+        """Add a chunk's sufficient statistics for every segmentation its columns support."""
+        factors = [factor for factor in self.factors if factor in chunk.columns]
+        if self.value_column not in chunk.columns or not factors:
+            return self
+
+        values = chunk[self.value_column].astype('float64')
+        frame = chunk[list(dict.fromkeys(
+            [col for cols in self.segmentations.values() for col in cols if col in chunk.columns] + factors
+        ))].assign(_value=values, _square=values * values)
+
+        for name, columns in self.segmentations.items():
+            if not all(col in chunk.columns for col in columns):
+                continue
+            cells = frame.groupby(columns + factors, observed=True).agg(
+                n=('_value', 'count'), sum=('_value', 'sum'), sum_squares=('_square', 'sum')
+            )
+            if name in self.cells:
+                cells = self.cells[name].add(cells, fill_value=0)
+            self.cells[name] = cells
+
+        return self
+
+    def _factor_results(self, cells, columns, factor):
+        by_factor = cells.groupby(level=columns + [factor], observed=True).sum()
+        n, sums, squares = (by_factor[col].unstack(factor, fill_value=0) for col in ('n', 'sum', 'sum_squares'))
+        levels = [str(level) for level in n.columns]
+        two_groups = len(levels) == 2
+
+        if two_groups:
+            statistic, p_value, df = t_from_sums(n.to_numpy(), sums.to_numpy(), squares.to_numpy())
+            degrees = np.stack([df], axis=1)
+        else:
+            statistic, p_value, df_between, df_within = anova_from_sums(n.to_numpy(), sums.to_numpy(),
+                                                                         squares.to_numpy())
+            degrees = np.stack([df_between, df_within], axis=1)
+
+        p_bonferroni = bonferroni(p_value)
+        p_bh = benjamini_hochberg(p_value)
+        tested = ~np.isnan(p_value)
+
+        results = []
+        for position, segment in enumerate(n.index):
+            segment = segment if isinstance(segment, tuple) else (segment,)
+            results.append({
+                'segment': {col: _json_value(value) for col, value in zip(columns, segment)},
+                'n': int(n.iloc[position].sum()),
+                'group_means': {level: (float(s / c) if c else None) for level, s, c
+                                in zip(levels, sums.iloc[position], n.iloc[position])},
+                'statistic': float(statistic[position]) if tested[position] else None,
+                'df': [float(d) for d in degrees[position]] if tested[position] else None,
+                'p_value': float(p_value[position]) if tested[position] else None,
+                'p_bonferroni': float(p_bonferroni[position]) if tested[position] else None,
+                'p_benjamini_hochberg': float(p_bh[position]) if tested[position] else None,
+                'significant': bool(tested[position] and p_bh[position] < self.alpha)
+            })
+
+        return {
+            'test': 'Independent t-test' if two_groups else 'One-way ANOVA',
+            'statistic': f'{levels[0]} - {levels[1]} t' if two_groups else 'F',
+            'groups': levels,
+            'cells': len(results),
+            'cells_tested': int(tested.sum()),
+            'significant_cells': {
+                'unadjusted': int((p_value[tested] < self.alpha).sum()),
+                'bonferroni': int((p_bonferroni[tested] < self.alpha).sum()),
+                'benjamini_hochberg': int((p_bh[tested] < self.alpha).sum())
+            },
+            'results': results
+        }
+
+    def to_dict(self):
+        """Test results per segmentation and factor."""
+        output = {}
+        for name, cells in self.cells.items():
+            columns = self.segmentations[name]
+            factors = [level for level in cells.index.names if level not in columns]
+            output[name] = {
+                'segment_columns': columns,
+                'alpha': self.alpha,
+                'correction_family': 'cells of one segmentation and factor',
+                'factors': {factor: self._factor_results(cells, columns, factor) for factor in factors}
+            }
+        return output
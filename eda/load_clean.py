@@ -6,25 +6,207 @@ Handles data import, validation, and preprocessing for retail sales analysis.
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import hashlib
 import json
 import os
+import re
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    pa = pq = None
+    CACHE_FORMAT = 'pickle'
+
+from artifacts import ArtifactWriter
+from sketches import DistinctCountSketch, MomentsAccumulator, QuantileSketch
+
+CACHE_VERSION = 2
+
+PARTITION_EXTENSIONS = ('.csv', '.parquet')
+
+# Dates encoded in partition paths, e.g. sales_2023-01-05.csv, date=20230105/part-0.parquet
+# or month=2023-01/store_3.csv
+PARTITION_DAY_PATTERN = re.compile(r'(?<!\d)(\d{4})-?(\d{2})-?(\d{2})(?!\d)')
+PARTITION_MONTH_PATTERN = re.compile(r'(?<!\d)(\d{4})-(\d{2})(?![\d-])')
+
+def file_sha256(path, block_size=1 << 20):
+    """Hash a file in fixed-size blocks so large files are never fully read into memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def partition_span(path):
+    """
+    Date span (start, end) covered by a partition, read from the date in its path.
+    
+    A full date (YYYY-MM-DD or YYYYMMDD) covers that day and a year-month
+    (YYYY-MM) covers the whole month; the last match in the path wins.
+    Returns None when the path carries no date, so the partition cannot
+    be pruned.
+    """
+    path = path.replace(os.sep, '/')
+    
+    for year, month, day in reversed(PARTITION_DAY_PATTERN.findall(path)):
+        try:
+            date = pd.Timestamp(int(year), int(month), int(day))
+        except ValueError:
+            continue
+        return date, date
+    
+    for year, month in reversed(PARTITION_MONTH_PATTERN.findall(path)):
+        if 1 <= int(month) <= 12:
+            start = pd.Timestamp(int(year), int(month), 1)
+            return start, start + pd.offsets.MonthEnd(0)
+    
+    return None
 
 class DataLoader:
     """
     Handles loading and cleaning of retail sales data.
     """
     
-    def __init__(self, data_path='data/retail_sales_dataset.csv'):
+    NUMERIC_COLUMNS = ['Age', 'Quantity', 'Price_per_Unit', 'Total_Amount']
+    CATEGORICAL_COLUMNS = ['Gender', 'Product_Category']
+    
+    # Everything that changes the cleaned output; part of the cache key
+    CLEANING_CONFIG = {
+        'age_bins': [0, 25, 35, 45, 55, 100],
+        'age_labels': ['18-25', '26-35', '36-45', '46-55', '55+'],
+        'price_bins': [0, 50, 100, 300, 1000, float('inf')],
+        'price_labels': ['Budget', 'Economy', 'Mid-range', 'Premium', 'Luxury']
+    }
+    
+    # Storage plan for the cleaned frame: 'category' for IDs and labels,
+    # 'integer' for the smallest signed width that holds the observed range.
+    # Money columns stay float64 because float32 cannot represent cents exactly.
+    DTYPE_SCHEMA = {
+        'Transaction_ID': 'integer',
+        'Customer_ID': 'category',
+        'Gender': 'category',
+        'Product_Category': 'category',
+        'Age': 'integer',
+        'Quantity': 'integer',
+        'Price_per_Unit': 'float64',
+        'Total_Amount': 'float64',
+        'Year': 'integer',
+        'Month': 'integer',
+        'Day_of_Week': 'integer',
+        'Week_of_Year': 'integer'
+    }
+    
+    def __init__(self, data_path='data/retail_sales_dataset.csv', cache_dir='data/.cache',
+                 start_date=None, end_date=None, max_workers=None, chunksize=None):
+        """
+        data_path is a CSV/Parquet file, a directory of partition files
+        (searched recursively) or a glob pattern. start_date and end_date
+        (inclusive) restrict the analysis window: partitions whose path
+        dates fall outside it are never read, and rows outside it are
+        dropped. max_workers > 1 reads partitions in a thread pool.
+        chunksize is the default chunk size of stream_data(); since
+        streamed cleaning works per chunk, it is part of the cache key.
+        """
         self.data_path = data_path
+        self.cache_dir = cache_dir
+        self.start_date = pd.Timestamp(start_date).normalize() if start_date is not None else None
+        self.end_date = pd.Timestamp(end_date).normalize() if end_date is not None else None
+        self.max_workers = max_workers
+        self.chunksize = chunksize
         self.df = None
         self.cleaned_df = None
         self.data_quality_report = {}
     
+    @property
+    def is_partitioned(self):
+        """True when data_path names a directory or glob of partition files."""
+        return os.path.isdir(self.data_path) or glob.has_magic(self.data_path)
+    
+    def _partition_root(self):
+        """Directory that partition paths are taken relative to when reading their dates."""
+        if os.path.isdir(self.data_path):
+            return self.data_path
+        fixed = re.split(r'[*?\[]', self.data_path, maxsplit=1)[0]
+        return os.path.dirname(fixed) or '.'
+    
+    def partition_files(self, prune=True):
+        """
+        Sorted list of source files to read.
+        
+        For partitioned sources, files whose path date span does not overlap
+        the [start_date, end_date] window are pruned. A single file is always
+        returned as is.
+        """
+        if not self.is_partitioned:
+            return [self.data_path]
+        
+        if os.path.isdir(self.data_path):
+            pattern = os.path.join(self.data_path, '**', '*')
+        else:
+            pattern = self.data_path
+        files = sorted(path for path in glob.glob(pattern, recursive=True)
+                       if os.path.isfile(path) and path.lower().endswith(PARTITION_EXTENSIONS))
+        
+        if not prune or (self.start_date is None and self.end_date is None):
+            return files
+        
+        root = self._partition_root()
+        selected = []
+        for path in files:
+            span = partition_span(os.path.relpath(path, root))
+            if span is not None:
+                start, end = span
+                if self.end_date is not None and start > self.end_date:
+                    continue
+                if self.start_date is not None and end < self.start_date:
+                    continue
+            selected.append(path)
+        return selected
+    
+    def _filter_window(self, df):
+        """Drop rows whose Date falls outside the analysis window."""
+        if self.start_date is None and self.end_date is None:
+            return df
+        
+        dates = pd.to_datetime(df['Date'], errors='coerce')
+        mask = dates.notna()
+        if self.start_date is not None:
+            mask &= dates >= self.start_date
+        if self.end_date is not None:
+            mask &= dates < self.end_date + pd.Timedelta(days=1)
+        return df[mask]
+    
+    def _read_partition(self, path):
+        """Read one CSV or Parquet source file, restricted to the analysis window."""
+        if path.lower().endswith('.parquet'):
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path)
+        return self._filter_window(df)
+    
     def load_data(self):
-        """Load raw data from CSV file."""
+        """Load raw data from the CSV file or from the partitions in the analysis window."""
         try:
-            self.df = pd.read_csv(self.data_path)
-            print(f"✓ Data loaded successfully: {len(self.df)} records")
+            files = self.partition_files()
+            if not files:
+                raise FileNotFoundError(f"No partitions found for {self.data_path} in the requested date range")
+            
+            if self.max_workers and self.max_workers > 1 and len(files) > 1:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    frames = list(executor.map(self._read_partition, files))
+            else:
+                frames = [self._read_partition(path) for path in files]
+            
+            self.df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            
+            if self.is_partitioned:
+                print(f"✓ Data loaded successfully: {len(self.df)} records from {len(files)} partitions")
+            else:
+                print(f"✓ Data loaded successfully: {len(self.df)} records")
             return self.df
         except Exception as e:
             print(f"✗ Error loading data: {str(e)}")
@@ -35,27 +217,8 @@ class DataLoader:
         if self.df is None:
             return False
         
-        # Basic validation checks
-        validations = {
-            'total_records': len(self.df),
-            'missing_values': self.df.isnull().sum().to_dict(),
-            'duplicate_records': self.df.duplicated().sum(),
-            'date_format_errors': 0,
-            'negative_values': 0,
-            'data_types': self.df.dtypes.to_dict()
-        }
-        
-        # Check for negative values in numeric columns
-        numeric_cols = ['Age', 'Quantity', 'Price_per_Unit', 'Total_Amount']
-        for col in numeric_cols:
-            if col in self.df.columns:
-                validations['negative_values'] += (self.df[col] < 0).sum()
-        
-        # Validate date format
-        try:
-            pd.to_datetime(self.df['Date'])
-        except:
-            validations['date_format_errors'] = len(self.df)
+        validations = self._validation_counts(self.df)
+        validations['data_types'] = self.df.dtypes.to_dict()
         
         self.data_quality_report = validations
         return True
@@ -65,57 +228,381 @@ class DataLoader:
         if self.df is None:
             return None
         
+        self.cleaned_df, removed_duplicates = self._clean_frame(self.df)
+        
+        memory_before = int(self.cleaned_df.memory_usage(deep=True).sum())
+        self.cleaned_df = self.apply_dtype_schema(self.cleaned_df)
+        memory_after = int(self.cleaned_df.memory_usage(deep=True).sum())
+        
+        self.data_quality_report['memory_optimization'] = {
+            'bytes_before': memory_before,
+            'bytes_after': memory_after,
+            'bytes_saved': memory_before - memory_after,
+            'reduction_percentage': round((memory_before - memory_after) / memory_before * 100, 2)
+                                    if memory_before else 0.0
+        }
+        
+        print(f"✓ Data cleaned successfully")
+        print(f"  - Removed {removed_duplicates} duplicate records")
+        print(f"  - Final dataset: {len(self.cleaned_df)} records")
+        print(f"  - Memory: {memory_before / 1024:.1f} KB → {memory_after / 1024:.1f} KB")
+        
+        return self.cleaned_df
+    
+    def apply_dtype_schema(self, df):
+        """Convert columns to the compact dtypes declared in DTYPE_SCHEMA."""
+        for col, kind in self.DTYPE_SCHEMA.items():
+            if col not in df.columns:
+                continue
+            
+            if kind == 'category':
+                df[col] = df[col].astype('category')
+            elif kind == 'integer':
+                # Nullable or missing values cannot be narrowed safely
+                if df[col].isnull().any():
+                    continue
+                df[col] = pd.to_numeric(df[col].astype('int64'), downcast='integer')
+            else:
+                df[col] = df[col].astype(kind)
+        
+        return df
+    
+    def _validation_counts(self, df):
+        """Compute additive data quality counts for a frame or chunk."""
+        counts = {
+            'total_records': len(df),
+            'missing_values': df.isnull().sum().to_dict(),
+            'duplicate_records': df.duplicated().sum(),
+            'date_format_errors': 0,
+            'negative_values': 0
+        }
+        
+        for col in self.NUMERIC_COLUMNS:
+            if col in df.columns:
+                counts['negative_values'] += (df[col] < 0).sum()
+        
+        try:
+            pd.to_datetime(df['Date'])
+        except:
+            counts['date_format_errors'] = len(df)
+        
+        return counts
+    
+    def _clean_frame(self, df, fill_values=None):
+        """
+        Clean a raw frame and add derived columns.
+        
+        Returns the cleaned frame and the number of duplicates removed.
+        When fill_values is given it supplies the replacement for missing
+        values per column; otherwise medians/modes of df itself are used.
+        """
+        fill_values = fill_values or {}
+        
         # Create a copy for cleaning
-        self.cleaned_df = self.df.copy()
+        cleaned = df.copy()
         
         # Convert Date column to datetime
-        self.cleaned_df['Date'] = pd.to_datetime(self.cleaned_df['Date'])
+        cleaned['Date'] = pd.to_datetime(cleaned['Date'])
         
         # Remove duplicates
-        initial_count = len(self.cleaned_df)
-        self.cleaned_df = self.cleaned_df.drop_duplicates()
-        removed_duplicates = initial_count - len(self.cleaned_df)
+        initial_count = len(cleaned)
+        cleaned = cleaned.drop_duplicates()
+        removed_duplicates = initial_count - len(cleaned)
         
         # Handle missing values
         # For numeric columns, fill with median
-        numeric_columns = ['Age', 'Quantity', 'Price_per_Unit', 'Total_Amount']
-        for col in numeric_columns:
-            if col in self.cleaned_df.columns:
-                self.cleaned_df[col] = self.cleaned_df[col].fillna(self.cleaned_df[col].median())
+        for col in self.NUMERIC_COLUMNS:
+            if col in cleaned.columns:
+                fill_value = fill_values.get(col, cleaned[col].median())
+                cleaned[col] = cleaned[col].fillna(fill_value)
         
         # For categorical columns, fill with mode
-        categorical_columns = ['Gender', 'Product_Category']
-        for col in categorical_columns:
-            if col in self.cleaned_df.columns:
-                mode_value = self.cleaned_df[col].mode()[0] if not self.cleaned_df[col].mode().empty else 'Unknown'
-                self.cleaned_df[col] = self.cleaned_df[col].fillna(mode_value)
+        for col in self.CATEGORICAL_COLUMNS:
+            if col in cleaned.columns:
+                if col in fill_values:
+                    mode_value = fill_values[col]
+                else:
+                    mode_value = cleaned[col].mode()[0] if not cleaned[col].mode().empty else 'Unknown'
+                cleaned[col] = cleaned[col].fillna(mode_value)
         
         # Add derived columns
-        self.cleaned_df['Year'] = self.cleaned_df['Date'].dt.year
-        self.cleaned_df['Month'] = self.cleaned_df['Date'].dt.month
-        self.cleaned_df['Day_of_Week'] = self.cleaned_df['Date'].dt.dayofweek
-        self.cleaned_df['Week_of_Year'] = self.cleaned_df['Date'].dt.isocalendar().week
+        cleaned['Year'] = cleaned['Date'].dt.year
+        cleaned['Month'] = cleaned['Date'].dt.month
+        cleaned['Day_of_Week'] = cleaned['Date'].dt.dayofweek
+        cleaned['Week_of_Year'] = cleaned['Date'].dt.isocalendar().week
         
         # Create age groups
-        self.cleaned_df['Age_Group'] = pd.cut(
-            self.cleaned_df['Age'], 
-            bins=[0, 25, 35, 45, 55, 100], 
-            labels=['18-25', '26-35', '36-45', '46-55', '55+']
+        cleaned['Age_Group'] = pd.cut(
+            cleaned['Age'], 
+            bins=self.CLEANING_CONFIG['age_bins'], 
+            labels=self.CLEANING_CONFIG['age_labels']
         )
         
         # Create price categories
-        self.cleaned_df['Price_Category'] = pd.cut(
-            self.cleaned_df['Price_per_Unit'],
-            bins=[0, 50, 100, 300, 1000, float('inf')],
-            labels=['Budget', 'Economy', 'Mid-range', 'Premium', 'Luxury']
+        cleaned['Price_Category'] = pd.cut(
+            cleaned['Price_per_Unit'],
+            bins=self.CLEANING_CONFIG['price_bins'],
+            labels=self.CLEANING_CONFIG['price_labels']
         )
         
-        print(f"✓ Data cleaned successfully")
-        print(f"  - Removed {removed_duplicates} duplicate records")
-        print(f"  - Final dataset: {len(self.cleaned_df)} records")
+        return cleaned, removed_duplicates
+    
+    def _iter_raw_chunks(self, chunksize):
+        """Yield raw chunks of at most chunksize rows from every selected partition."""
+        for path in self.partition_files():
+            if path.lower().endswith('.parquet'):
+                df = self._read_partition(path)
+                for start in range(0, len(df), chunksize):
+                    yield df.iloc[start:start + chunksize]
+            else:
+                for chunk in pd.read_csv(path, chunksize=chunksize):
+                    yield self._filter_window(chunk)
+    
+    def iter_clean_chunks(self, chunksize=100000, fill_values=None):
+        """
+        Stream the raw data in bounded chunks, yielding cleaned chunks.
+        
+        Validation counts are accumulated into data_quality_report as the
+        chunks are read, so peak memory is bounded by chunksize rather than
+        by the file size. Duplicates are only detected within a chunk and,
+        unless fill_values is given, missing values are filled from the
+        chunk's own medians/modes.
+        """
+        validations = None
+        
+        for chunk in self._iter_raw_chunks(chunksize):
+            counts = self._validation_counts(chunk)
+            if validations is None:
+                validations = counts
+                validations['data_types'] = chunk.dtypes.to_dict()
+            else:
+                for key in ['total_records', 'duplicate_records', 'date_format_errors', 'negative_values']:
+                    validations[key] += counts[key]
+                for col, missing in counts['missing_values'].items():
+                    validations['missing_values'][col] = validations['missing_values'].get(col, 0) + missing
+            self.data_quality_report = validations
+            
+            cleaned_chunk, _ = self._clean_frame(chunk, fill_values)
+            yield cleaned_chunk
+    
+    def stream_data(self, chunksize=None, fill_values=None,
+                    output_path='data/cleaned_retail_data.csv', cache=False):
+        """
+        Run validation, cleaning and summarization in streaming mode.
+        
+        Each cleaned chunk is appended to output_path (if given) and folded
+        into a ChunkAggregator; the full dataset is never held in memory.
+        With cache=True the chunks are also appended to the Parquet cache,
+        so the analyses can read the cleaned frame back from it (without
+        pyarrow the chunks are collected and pickled at the end). Returns
+        a summary with the same layout as get_data_summary().
+        """
+        chunksize = chunksize or self.chunksize or 100000
+        aggregator = ChunkAggregator()
+        total_chunks = 0
+        writer = None
+        pickled_chunks = []
         
+        if output_path:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        if cache:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            data_file, meta_file = self._cache_paths()
+            # A partly written cache must never pass for a valid one
+            if os.path.exists(meta_file):
+                os.remove(meta_file)
+        
+        try:
+            for chunk in self.iter_clean_chunks(chunksize, fill_values):
+                aggregator.update(chunk)
+                if output_path:
+                    chunk.to_csv(output_path, mode='w' if total_chunks == 0 else 'a',
+                                 header=total_chunks == 0, index=False)
+                if cache and CACHE_FORMAT == 'parquet':
+                    # Every chunk is cast to the first chunk's schema
+                    table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None,
+                                                 preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(data_file, table.schema)
+                    writer.write_table(table)
+                elif cache:
+                    pickled_chunks.append(chunk)
+                total_chunks += 1
+        except Exception as e:
+            print(f"✗ Error streaming data: {str(e)}")
+            return None
+        finally:
+            if writer is not None:
+                writer.close()
+        
+        print(f"✓ Data streamed successfully: {total_chunks} chunks, {aggregator.total_records} records")
+        if output_path:
+            print(f"✓ Cleaned data exported to {output_path}")
+        if cache and total_chunks:
+            if pickled_chunks:
+                pd.concat(pickled_chunks, ignore_index=True).to_pickle(data_file)
+            self._write_cache_meta(aggregator.total_records, streamed=True)
+            print(f"✓ Cleaned data cached to {data_file}")
+        
+        return aggregator.summary()
+    
+    def config_hash(self):
+        """Hash of the cleaning configuration, dtype schema, cache layout version and stream chunk size."""
+        config = {'version': CACHE_VERSION, 'config': self.CLEANING_CONFIG, 'schema': self.DTYPE_SCHEMA}
+        if self.chunksize:
+            config['chunksize'] = self.chunksize
+        payload = json.dumps(config, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def analysis_window(self):
+        """Analysis window as a pair of ISO date strings (None for an open end)."""
+        return [date.strftime('%Y-%m-%d') if date is not None else None
+                for date in (self.start_date, self.end_date)]
+    
+    def source_fingerprint(self, with_hash=True):
+        """Size, mtime and (optionally) content hash of every selected source file."""
+        files = []
+        for path in self.partition_files():
+            stat = os.stat(path)
+            entry = {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            if with_hash:
+                entry['sha256'] = file_sha256(path)
+            files.append(entry)
+        
+        return {
+            'path': os.path.abspath(self.data_path),
+            'window': self.analysis_window(),
+            'files': files
+        }
+    
+    def _cache_paths(self):
+        """Return the (data, metadata) paths of the cleaned-data cache."""
+        stem = os.path.splitext(os.path.basename(os.path.normpath(self.data_path)))[0]
+        if self.is_partitioned or self.start_date is not None or self.end_date is not None:
+            # Different sources or windows must not share a cache file
+            source_key = json.dumps([os.path.abspath(self.data_path), self.analysis_window()])
+            stem = re.sub(r'[^\w.-]', '_', stem) + '.' + hashlib.sha256(source_key.encode('utf-8')).hexdigest()[:12]
+        extension = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+        return (os.path.join(self.cache_dir, f'{stem}.cleaned.{extension}'),
+                os.path.join(self.cache_dir, f'{stem}.cleaned.meta.json'))
+    
+    def _read_cache_meta(self):
+        """Load cache metadata if it is still valid for the current source and config."""
+        data_file, meta_file = self._cache_paths()
+        if not (os.path.exists(data_file) and os.path.exists(meta_file)):
+            return None
+        
+        try:
+            with open(meta_file, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if meta.get('config_hash') != self.config_hash() or meta.get('format') != CACHE_FORMAT:
+            return None
+        
+        # Size and mtime are checked first; a content hash is only recomputed
+        # for files where they differ (e.g. the file was touched or copied).
+        cached = meta.get('source', {})
+        try:
+            current = self.source_fingerprint(with_hash=False)
+        except OSError:
+            # A missing source is reported by load_data(), not by the cache check
+            return None
+        cached_files = cached.get('files', [])
+        if cached.get('window') != current['window'] or \
+                [entry['path'] for entry in cached_files] != [entry['path'] for entry in current['files']]:
+            return None
+        
+        touched = False
+        for cached_entry, entry in zip(cached_files, current['files']):
+            if cached_entry.get('size') != entry['size']:
+                return None
+            if cached_entry.get('mtime_ns') != entry['mtime_ns']:
+                try:
+                    if cached_entry.get('sha256') != file_sha256(entry['path']):
+                        return None
+                except OSError:
+                    return None
+                cached_entry['mtime_ns'] = entry['mtime_ns']
+                touched = True
+        
+        if touched:
+            with open(meta_file, 'w') as f:
+                json.dump(meta, f, indent=2)
+        
+        return meta
+    
+    @property
+    def cache_file(self):
+        """Path of the columnar cache file for this data source."""
+        return self._cache_paths()[0]
+    
+    @staticmethod
+    def read_cache_file(path):
+        """Read a cached cleaned frame, memory-mapping the file when it is Parquet."""
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path, memory_map=True)
+        return pd.read_pickle(path)
+    
+    def load_cached_data(self):
+        """
+        Load the cleaned dataset from the columnar cache.
+        
+        Returns None when there is no cache or it no longer matches the source
+        file or cleaning configuration. On a hit, cleaned_df and the stored
+        data quality report are restored and cleaning is skipped entirely.
+        """
+        meta = self._read_cache_meta()
+        if meta is None:
+            return None
+        
+        try:
+            self.cleaned_df = self.read_cache_file(self.cache_file)
+        except Exception as e:
+            print(f"✗ Error reading cache: {str(e)}")
+            return None
+        
+        if meta.get('streamed'):
+            # Chunks are written before narrowing, which needs the whole column's range
+            self.cleaned_df = self.apply_dtype_schema(self.cleaned_df)
+        
+        self.data_quality_report = meta.get('data_quality_report', {})
+        print(f"✓ Cleaned data loaded from cache: {len(self.cleaned_df)} records")
         return self.cleaned_df
     
+    def save_cache(self):
+        """Write cleaned_df to the columnar cache together with its fingerprint."""
+        if self.cleaned_df is None:
+            return False
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_file, meta_file = self._cache_paths()
+        
+        if CACHE_FORMAT == 'parquet':
+            self.cleaned_df.to_parquet(data_file, index=False)
+        else:
+            self.cleaned_df.to_pickle(data_file)
+        
+        self._write_cache_meta(len(self.cleaned_df))
+        
+        print(f"✓ Cleaned data cached to {data_file}")
+        return True
+    
+    def _write_cache_meta(self, records, streamed=False):
+        """Record the fingerprint that makes the cache file valid for the current source and config."""
+        meta = {
+            'format': CACHE_FORMAT,
+            'created': datetime.now().isoformat(),
+            'config_hash': self.config_hash(),
+            'source': self.source_fingerprint(),
+            'records': records,
+            'streamed': streamed,
+            'data_quality_report': self._serializable_quality_report()
+        }
+        with open(self._cache_paths()[1], 'w') as f:
+            json.dump(meta, f, indent=2)
+    
     def get_data_summary(self):
         """Generate comprehensive data summary."""
         if self.cleaned_df is None:
@@ -166,24 +653,114 @@ class DataLoader:
             return True
         return False
     
-    def save_data_quality_report(self, output_path='visuals/data_quality_report.json'):
-        """Save data quality report as JSON."""
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        # Convert numpy types to Python types for JSON serialization
+    def _serializable_quality_report(self):
+        """Convert numpy types in the data quality report to Python types for JSON serialization."""
         report = {}
         for key, value in self.data_quality_report.items():
             if isinstance(value, dict):
-                report[key] = {k: int(v) if isinstance(v, (np.integer, np.int64)) else str(v) 
+                report[key] = {k: int(v) if isinstance(v, (np.integer, np.int64))
+                              else v if isinstance(v, (int, float)) else str(v)
                               for k, v in value.items()}
             else:
                 report[key] = int(value) if isinstance(value, (np.integer, np.int64)) else value
+        return report
+    
+    def save_data_quality_report(self, output_path='visuals/data_quality_report.json'):
+        """Save data quality report as JSON."""
+        report = self._serializable_quality_report()
         
-        with open(output_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        ArtifactWriter().write(report, output_path)
         
         print(f"✓ Data quality report saved to {output_path}")
 
+class ChunkAggregator:
+    """
+    Accumulates mergeable partial aggregates over cleaned data chunks.
+    
+    Sums, counts and categorical value counts are kept per chunk and
+    combined, so the summary has the layout of DataLoader.get_data_summary()
+    without the full dataset ever being in memory. Customers are counted
+    with a DistinctCountSketch and the numeric columns are summarized by
+    moments and a QuantileSketch, so memory is bounded by the sketch sizes
+    rather than by the number of customers or distinct values. The
+    customer count is exact up to the sketch capacity (then within about
+    1%), and the medians up to 2048 values (then within the sketch's rank
+    error); means and standard deviations are always exact.
+    """
+    
+    SUMMARY_COLUMNS = {'age': 'Age', 'quantity': 'Quantity', 'total_amount': 'Total_Amount'}
+    
+    def __init__(self):
+        self.total_records = 0
+        self.customers = DistinctCountSketch()
+        self.date_min = None
+        self.date_max = None
+        self.total_revenue = 0.0
+        self.distributions = {
+            'gender': pd.Series(dtype='int64'),
+            'product_category': pd.Series(dtype='int64'),
+            'age_group': pd.Series(dtype='int64')
+        }
+        self.moments = {key: MomentsAccumulator() for key in self.SUMMARY_COLUMNS}
+        self.quantiles = {key: QuantileSketch() for key in self.SUMMARY_COLUMNS}
+    
+    def update(self, chunk):
+        """Fold one cleaned chunk into the running aggregates."""
+        if chunk.empty:
+            return self
+        
+        self.total_records += len(chunk)
+        self.customers.update(chunk['Customer_ID'])
+        
+        chunk_min, chunk_max = chunk['Date'].min(), chunk['Date'].max()
+        self.date_min = chunk_min if self.date_min is None else min(self.date_min, chunk_min)
+        self.date_max = chunk_max if self.date_max is None else max(self.date_max, chunk_max)
+        self.total_revenue += float(chunk['Total_Amount'].sum())
+        
+        for key, col in [('gender', 'Gender'), ('product_category', 'Product_Category'),
+                         ('age_group', 'Age_Group')]:
+            self.distributions[key] = self.distributions[key].add(
+                chunk[col].value_counts(), fill_value=0
+            ).astype('int64')
+        
+        for key, col in self.SUMMARY_COLUMNS.items():
+            values = chunk[col].to_numpy(dtype='float64')
+            self.moments[key].update(values)
+            self.quantiles[key].update(values)
+        
+        return self
+    
+    def summary(self):
+        """Build a summary with the same layout as DataLoader.get_data_summary()."""
+        if self.total_records == 0:
+            return None
+        
+        def sorted_counts(counts):
+            return counts.sort_values(ascending=False, kind='stable').to_dict()
+        
+        return {
+            'basic_info': {
+                'total_records': self.total_records,
+                'total_customers': self.customers.count(),
+                'date_range': {
+                    'start': self.date_min.strftime('%Y-%m-%d'),
+                    'end': self.date_max.strftime('%Y-%m-%d')
+                },
+                'product_categories': int((self.distributions['product_category'] > 0).sum()),
+                'total_revenue': self.total_revenue
+            },
+            'categorical_distributions': {
+                key: sorted_counts(counts) for key, counts in self.distributions.items()
+            },
+            'numerical_statistics': {
+                key: {
+                    'mean': float(self.moments[key].mean),
+                    'median': float(self.quantiles[key].quantile(0.5)),
+                    'std': float(self.moments[key].std())
+                } for key in self.SUMMARY_COLUMNS
+            }
+        }
+
 if __name__ == "__main__":
     # Example usage
     loader = DataLoader()
@@ -0,0 +1,240 @@
+"""
+Market Basket Module
+Frequent itemset and association rule mining over baskets with FP-Growth.
+"""
+
+from collections import Counter, defaultdict
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+class _FPNode:
+    """Node of an FP-tree; children are keyed by item rank."""
+
+    __slots__ = ('item', 'count', 'parent', 'children')
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+def _build_tree(patterns):
+    """Insert (items, count) patterns into an FP-tree and return its header table."""
+    root = _FPNode(None, None)
+    header = defaultdict(list)
+
+    for items, count in patterns:
+        node = root
+        for item in items:
+            child = node.children.get(item)
+            if child is None:
+                child = _FPNode(item, node)
+                node.children[item] = child
+                header[item].append(child)
+            child.count += count
+            node = child
+
+    return header
+
+def _mine(patterns, min_count, suffix, max_len, itemsets):
+    """Recursively mine frequent itemsets ending in suffix from a pattern base."""
+    counts = defaultdict(int)
+    for items, count in patterns:
+        for item in items:
+            counts[item] += count
+    frequent = {item for item, count in counts.items() if count >= min_count}
+    if not frequent:
+        return
+
+    header = _build_tree((tuple(item for item in items if item in frequent), count)
+                         for items, count in patterns)
+
+    # Least frequent items (highest rank) first, as in the FP-Growth paper
+    for item in sorted(frequent, reverse=True):
+        itemset = suffix + (item,)
+        itemsets[frozenset(itemset)] = counts[item]
+        if max_len and len(itemset) >= max_len:
+            continue
+
+        conditional = []
+        for node in header[item]:
+            path = []
+            parent = node.parent
+            while parent.item is not None:
+                path.append(parent.item)
+                parent = parent.parent
+            if path:
+                conditional.append((tuple(reversed(path)), node.count))
+
+        if conditional:
+            _mine(conditional, min_count, itemset, max_len, itemsets)
+
+class MarketBasketMiner:
+    """
+    FP-Growth frequent itemsets and association rules over baskets.
+
+    A basket is every row sharing a Transaction_ID (basket='transaction')
+    or a customer and calendar day (basket='customer_day', the default,
+    since each transaction in this dataset holds a single line). Items
+    come from item_col, e.g. a SKU column when one exists, and default to
+    Product_Category.
+
+    Memory stays bounded for very large inputs: (basket, item) pairs are
+    integer-coded with pandas, items below min_support are dropped before
+    any basket is materialized, and identical baskets are collapsed into
+    one weighted pattern, so the FP-tree grows with the number of distinct
+    baskets rather than the number of transactions.
+    """
+
+    BASKET_KEYS = {
+        'transaction': ['Transaction_ID'],
+        'customer_day': ['Customer_ID', 'Date']
+    }
+
+    def __init__(self, df, basket='customer_day', item_col='Product_Category',
+                 min_support=0.01, min_confidence=0.1, max_len=4):
+        if basket not in self.BASKET_KEYS:
+            raise ValueError(f"Unknown basket definition: {basket}")
+        self.df = df
+        self.basket = basket
+        self.item_col = item_col
+        self.min_support = min_support
+        self.min_confidence = min_confidence
+        self.max_len = max_len
+        self.items = None
+        self.n_baskets = 0
+        self.min_count = None
+        self.patterns = None
+        self.itemsets = None
+
+    def _basket_ids(self):
+        """Integer basket id for every row."""
+        keys = []
+        for col in self.BASKET_KEYS[self.basket]:
+            values = self.df[col]
+            if col == 'Date':
+                values = pd.to_datetime(values).dt.normalize()
+            keys.append(pd.factorize(values)[0])
+
+        if len(keys) == 1:
+            return keys[0]
+        combined = keys[0].astype('int64') * (int(keys[1].max()) + 1) + keys[1]
+        return pd.factorize(combined)[0]
+
+    def build_patterns(self):
+        """Collapse the transactions into distinct baskets of frequent items with counts."""
+        basket_ids = self._basket_ids()
+        item_codes, labels = pd.factorize(self.df[self.item_col])
+        valid = (basket_ids >= 0) & (item_codes >= 0)
+
+        # One (basket, item) entry per basket regardless of quantity or repeated lines.
+        # Sorting combined integer keys is much cheaper than deduplicating row pairs.
+        n_labels = max(len(labels), 1)
+        pairs = np.sort(basket_ids[valid].astype('int64') * n_labels + item_codes[valid])
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if pairs.size else pairs
+        basket_ids, item_codes = np.divmod(pairs, n_labels)
+        self.n_baskets = int(np.count_nonzero(np.diff(basket_ids))) + 1 if basket_ids.size else 0
+        self.min_count = max(1, int(np.ceil(self.min_support * self.n_baskets)))
+
+        # Rank frequent items by descending support; infrequent items never enter the tree
+        item_support = np.bincount(item_codes, minlength=len(labels))
+        order = np.lexsort((np.arange(len(labels)), -item_support))
+        order = order[item_support[order] >= self.min_count]
+        rank = np.full(len(labels), -1)
+        rank[order] = np.arange(len(order))
+        self.items = np.asarray(labels)[order]
+
+        ranks = rank[item_codes]
+        keep = ranks >= 0
+        n_ranks = max(len(order), 1)
+        keys = np.sort(basket_ids[keep] * n_ranks + ranks[keep])
+        basket_ids, ranks = np.divmod(keys, n_ranks)
+        ranks = ranks.tolist()
+        bounds = np.flatnonzero(np.diff(basket_ids)) + 1
+        starts = [0] + bounds.tolist()
+        ends = bounds.tolist() + [len(ranks)]
+
+        self.patterns = Counter(tuple(ranks[start:end]) for start, end in zip(starts, ends) if end > start)
+        return self.patterns
+
+    def frequent_itemsets(self):
+        """Mine all itemsets with support >= min_support (up to max_len items)."""
+        if self.patterns is None:
+            self.build_patterns()
+
+        self.itemsets = {}
+        _mine(self.patterns.items(), self.min_count, (), self.max_len, self.itemsets)
+        return self.itemsets
+
+    def _labels(self, itemset):
+        """Item labels of an itemset, in support rank order."""
+        return [str(self.items[rank]) for rank in sorted(itemset)]
+
+    def association_rules(self):
+        """Rules antecedent -> consequent with support, confidence and lift."""
+        if self.itemsets is None:
+            self.frequent_itemsets()
+
+        n = self.n_baskets
+        rules = []
+        for itemset, count in self.itemsets.items():
+            if len(itemset) < 2:
+                continue
+            for size in range(1, len(itemset)):
+                for antecedent in combinations(sorted(itemset), size):
+                    antecedent = frozenset(antecedent)
+                    consequent = itemset - antecedent
+                    confidence = count / self.itemsets[antecedent]
+                    if confidence < self.min_confidence:
+                        continue
+                    rules.append({
+                        'antecedent': self._labels(antecedent),
+                        'consequent': self._labels(consequent),
+                        'baskets': int(count),
+                        'support': count / n,
+                        'confidence': confidence,
+                        'lift': confidence / (self.itemsets[consequent] / n)
+                    })
+
+        rules.sort(key=lambda rule: (-rule['lift'], -rule['confidence'], -rule['support'],
+                                     rule['antecedent'], rule['consequent']))
+        return rules
+
+    def run(self, top_n=20):
+        """Mine the baskets and return a JSON-ready summary."""
+        self.build_patterns()
+        itemsets = self.frequent_itemsets()
+        rules = self.association_rules()
+
+        top_itemsets = sorted(
+            (itemset for itemset in itemsets if len(itemset) >= 2),
+            key=lambda itemset: (-itemsets[itemset], self._labels(itemset))
+        )[:top_n]
+        frequent_entries = sum(len(items) * count for items, count in self.patterns.items())
+
+        return {
+            'settings': {
+                'basket': self.basket,
+                'item_column': self.item_col,
+                'min_support': self.min_support,
+                'min_confidence': self.min_confidence,
+                'max_len': self.max_len
+            },
+            'statistics': {
+                'total_baskets': int(self.n_baskets),
+                'unique_baskets': len(self.patterns),
+                'frequent_items': len(self.items),
+                'avg_frequent_items_per_basket': frequent_entries / self.n_baskets if self.n_baskets else 0.0,
+                'frequent_itemsets': len(itemsets),
+                'multi_item_itemsets': sum(1 for itemset in itemsets if len(itemset) >= 2),
+                'association_rules': len(rules)
+            },
+            'frequent_itemsets': [
+                {'items': self._labels(itemset), 'baskets': int(itemsets[itemset]),
+                 'support': itemsets[itemset] / self.n_baskets}
+                for itemset in top_itemsets
+            ],
+            'association_rules': rules[:top_n]
+        }
@@ -0,0 +1,244 @@
+"""
+Outlier Detection Module
+Scores every transaction against its own segment (product category and day
+of week) with robust MAD, IQR-fence and tail-rank scores, and keeps the
+flagged Transaction_IDs in a compact index file.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from sketches import QuantileSketch
+
+# Bit per method in the index file's flags column
+METHOD_FLAGS = {'mad': 1, 'iqr': 2, 'rank': 4}
+
+# Scales the MAD to the standard deviation of a normal distribution (Iglewicz & Hoaglin)
+MAD_SCALE = 0.6745
+
+class OutlierEngine:
+    """
+    Per-segment outlier scores for one value column.
+
+    Fitting folds each chunk into one QuantileSketch per segment, so the
+    data can be streamed in chunks (e.g. DataLoader.iter_clean_chunks())
+    and never needs to be in memory at once: each sketch keeps at most
+    about capacity * log2(n / capacity) values, and stays exact until a
+    segment outgrows capacity. capacity=None opts into exact mode, where
+    the sketches keep every value and memory grows with the data; with a
+    finite capacity the quartiles, medians and ranks carry the sketch's
+    rank error (reported per segment).
+
+    Scoring then needs only the per-segment parameters, so it also runs
+    chunk by chunk, keeping only the flagged rows:
+    - mad: modified z-score, 0.6745 * (x - median) / MAD, flagged beyond
+      mad_threshold (undefined, so never flagged, when the MAD is 0)
+    - iqr: distance outside the quartiles in IQRs, flagged beyond
+      iqr_multiplier (the usual 1.5 * IQR fences)
+    - rank: two-sided tail probability of the value within its segment,
+      flagged below rank_threshold; ties share a rank, so a value only
+      looks isolated when few transactions in the segment are as extreme
+    """
+
+    def __init__(self, segment_columns=('Product_Category', 'Day_of_Week'), value_column='Total_Amount',
+                 id_column='Transaction_ID', mad_threshold=3.5, iqr_multiplier=1.5, rank_threshold=0.001,
+                 capacity=2048):
+        self.segment_columns = list(segment_columns)
+        self.value_column = value_column
+        self.id_column = id_column
+        self.mad_threshold = mad_threshold
+        self.iqr_multiplier = iqr_multiplier
+        self.rank_threshold = rank_threshold
+        self.capacity = capacity
+        self.sketches = {}
+        self.parameters = None
+        self.flagged = []
+        self.scored_rows = 0
+
+    def _segments(self, chunk):
+        """Row positions of each segment in a chunk, keyed by the segment's values."""
+        grouped = chunk.groupby(self.segment_columns, observed=True, sort=False)
+        for key, positions in grouped.indices.items():
+            yield (key if isinstance(key, tuple) else (key,)), positions
+
+    def fit(self, chunk):
+        """Fold a chunk's values into the per-segment sketches."""
+        values = chunk[self.value_column].to_numpy(dtype='float64')
+        for key, positions in self._segments(chunk):
+            if key not in self.sketches:
+                self.sketches[key] = QuantileSketch(capacity=self.capacity or float('inf'))
+            self.sketches[key].update(values[positions])
+        self.parameters = None
+        return self
+
+    def segment_parameters(self):
+        """Median, MAD, quartiles and IQR fences of every fitted segment."""
+        if self.parameters is None:
+            rows = []
+            for key, sketch in self.sketches.items():
+                median = sketch.quantile(0.5)
+                q1, q3 = sketch.quantile(0.25), sketch.quantile(0.75)
+                iqr = q3 - q1
+                rows.append({
+                    **dict(zip(self.segment_columns, key)),
+                    'count': int(sketch.n),
+                    'median': median,
+                    'mad': sketch.deviation_median(median),
+                    'q1': q1,
+                    'q3': q3,
+                    'lower_fence': q1 - self.iqr_multiplier * iqr,
+                    'upper_fence': q3 + self.iqr_multiplier * iqr,
+                    'rank_error': sketch.rank_error_bound()
+                })
+            self.parameters = pd.DataFrame(rows, columns=self.segment_columns + [
+                'count', 'median', 'mad', 'q1', 'q3', 'lower_fence', 'upper_fence', 'rank_error'
+            ]).sort_values(self.segment_columns, ignore_index=True)
+        return self.parameters
+
+    def score(self, chunk):
+        """
+        Scores of every row of a chunk, in chunk order.
+
+        Returns a frame with the id column, the segment number (row of
+        segment_parameters()), the three scores and a flags bitmask
+        (METHOD_FLAGS); rows in segments that were never fitted get NaN
+        scores and no flags.
+        """
+        parameters = self.segment_parameters()
+        segment_index = {tuple(key): position for position, key in
+                         enumerate(parameters[self.segment_columns].itertuples(index=False, name=None))}
+        values = chunk[self.value_column].to_numpy(dtype='float64')
+
+        segment = np.full(len(chunk), -1, dtype='int32')
+        rank_score = np.full(len(chunk), np.nan)
+        for key, positions in self._segments(chunk):
+            if key in segment_index:
+                segment[positions] = segment_index[key]
+                sketch = self.sketches[key]
+                segment_values = values[positions]
+                rank_score[positions] = np.minimum(2 * np.minimum(sketch.cdf(segment_values),
+                                                                  1 - sketch.cdf(segment_values, strict=True)), 1.0)
+
+        # Per-segment parameters broadcast to rows; the extra NaN row serves unfitted segments
+        def lookup(column):
+            return np.append(parameters[column].to_numpy(dtype='float64'), np.nan)[segment]
+
+        median, mad, q1, q3 = lookup('median'), lookup('mad'), lookup('q1'), lookup('q3')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mad_score = np.where(mad > 0, MAD_SCALE * (values - median) / mad, np.nan)
+            beyond = np.maximum(np.maximum(q1 - values, values - q3), 0.0)
+            iqr_score = np.where(beyond > 0, beyond / (q3 - q1), 0.0)
+        iqr_score[segment < 0] = np.nan
+
+        flags = ((np.abs(mad_score) > self.mad_threshold) * METHOD_FLAGS['mad']
+                 + (iqr_score > self.iqr_multiplier) * METHOD_FLAGS['iqr']
+                 + (rank_score < self.rank_threshold) * METHOD_FLAGS['rank']).astype('uint8')
+
+        return pd.DataFrame({
+            self.id_column: chunk[self.id_column].to_numpy(),
+            'segment': segment,
+            'mad_score': mad_score,
+            'iqr_score': iqr_score,
+            'rank_score': rank_score,
+            'flags': flags
+        })
+
+    def collect(self, chunk):
+        """Score a chunk and keep only its flagged rows."""
+        scores = self.score(chunk)
+        self.scored_rows += len(scores)
+        self.flagged.append(scores[scores['flags'] > 0])
+        return self
+
+    def run(self, df):
+        """Fit and score an in-memory frame."""
+        return self.fit(df).collect(df)
+
+    def run_chunks(self, make_chunks):
+        """
+        Fit and score chunked input in two streaming passes.
+
+        make_chunks is called once per pass and must return a fresh
+        iterator over the same chunks, e.g.
+        lambda: loader.iter_clean_chunks(chunksize=500_000).
+        """
+        for chunk in make_chunks():
+            self.fit(chunk)
+        for chunk in make_chunks():
+            self.collect(chunk)
+        return self
+
+    def flagged_rows(self):
+        """Every flagged row collected so far, ordered by id."""
+        if not self.flagged:
+            return pd.DataFrame({self.id_column: [], 'segment': np.empty(0, dtype='int32'),
+                                 'mad_score': [], 'iqr_score': [], 'rank_score': [],
+                                 'flags': np.empty(0, dtype='uint8')})
+        return pd.concat(self.flagged, ignore_index=True).sort_values(self.id_column, ignore_index=True)
+
+    def to_dict(self):
+        """Per-method and per-segment flag counts with each segment's parameters."""
+        flagged = self.flagged_rows()
+        parameters = self.segment_parameters()
+        method_counts = {method: int((flagged['flags'] & bit).astype(bool).sum())
+                         for method, bit in METHOD_FLAGS.items()}
+
+        per_segment = flagged.groupby('segment').agg(
+            **{method: ('flags', lambda flags, bit=bit: int((flags & bit).astype(bool).sum()))
+               for method, bit in METHOD_FLAGS.items()},
+            any_method=('flags', 'size')
+        ).reindex(parameters.index, fill_value=0)
+
+        segments = []
+        for position, row in parameters.iterrows():
+            entry = {col: (row[col].item() if hasattr(row[col], 'item') else row[col]) for col in self.segment_columns}
+            entry.update({col: (int(row[col]) if col == 'count' else float(row[col]))
+                          for col in parameters.columns if col not in self.segment_columns})
+            entry['flagged'] = {col: int(per_segment.loc[position, col]) for col in per_segment.columns}
+            segments.append(entry)
+
+        return {
+            'value_column': self.value_column,
+            'segment_columns': self.segment_columns,
+            'thresholds': {
+                'mad': self.mad_threshold,
+                'iqr_multiplier': self.iqr_multiplier,
+                'rank': self.rank_threshold
+            },
+            'exact': all(sketch.is_exact for sketch in self.sketches.values()),
+            'rows_scored': int(self.scored_rows),
+            'flagged_rows': int(len(flagged)),
+            'flagged_percentage': float(len(flagged) / self.scored_rows * 100) if self.scored_rows else 0.0,
+            'flagged_by_method': method_counts,
+            'segments': segments
+        }
+
+    def save_index(self, output_path='visuals/outlier_index.npz'):
+        """
+        Write the flagged rows as a compressed NumPy archive.
+
+        Arrays: the id column (sorted, so ids can be looked up with
+        searchsorted), flags, segment, float32 scores, and the segment
+        keys as one string array per segment column.
+        """
+        flagged = self.flagged_rows()
+        parameters = self.segment_parameters()
+        ids = flagged[self.id_column].to_numpy()
+        if ids.dtype == object:
+            ids = ids.astype(str)
+
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        np.savez_compressed(
+            output_path,
+            **{self.id_column: ids},
+            flags=flagged['flags'].to_numpy(dtype='uint8'),
+            segment=flagged['segment'].to_numpy(dtype='int32'),
+            mad_score=flagged['mad_score'].to_numpy(dtype='float32'),
+            iqr_score=flagged['iqr_score'].to_numpy(dtype='float32'),
+            rank_score=flagged['rank_score'].to_numpy(dtype='float32'),
+            **{f'segment_{col}': parameters[col].to_numpy(dtype=str) for col in self.segment_columns}
+        )
+        print(f"✓ Outlier index saved to {output_path} ({len(flagged)} flagged transactions)")
+        return output_path
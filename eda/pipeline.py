@@ -0,0 +1,194 @@
+"""
+Pipeline Graph Module
+Declares pipeline stages as a dependency graph with content-hashed inputs
+and outputs, so reruns only recompute stages whose inputs changed.
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+def file_digest(path, recorded=None):
+    """
+    SHA-256 of a file, reusing a recorded digest when size and mtime still match.
+
+    recorded is a previous {'size', 'mtime_ns', 'sha256'} entry for the same
+    path; returns a new entry of the same shape, or None if the file is missing.
+    """
+    if not os.path.exists(path):
+        return None
+
+    stat = os.stat(path)
+    if (recorded and recorded.get('size') == stat.st_size
+            and recorded.get('mtime_ns') == stat.st_mtime_ns):
+        return recorded
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+class Stage:
+    """
+    A single pipeline step.
+
+    func receives the values of its dependencies as keyword arguments and
+    returns the stage value. outputs are the files the stage writes, sources
+    are code files whose content is part of the stage key, and params holds
+    any JSON-serializable configuration. load rebuilds the value from the
+    outputs when the stage is skipped. after lists stages that must run
+    first and whose outputs are part of the key, like deps, but whose
+    values func does not take, so a skipped one is never loaded for it.
+    """
+
+    def __init__(self, name, func, deps=(), outputs=(), sources=(), params=None, load=None, after=()):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.after = list(after)
+        self.outputs = list(outputs)
+        self.sources = list(sources)
+        self.params = params or {}
+        self.load = load
+
+class StageGraph:
+    """
+    Runs stages in dependency order and skips those that are up to date.
+
+    A stage key hashes its params, the contents of its source files and the
+    output digests of its dependencies. A stage is skipped when its key
+    matches the manifest and all of its outputs still have the recorded
+    content hashes. Because dependents key on output contents, a stage that
+    reruns but produces identical files does not invalidate them.
+    """
+
+    def __init__(self, manifest_path='visuals/.pipeline_manifest.json'):
+        self.manifest_path = manifest_path
+        self.stages = {}
+        self.manifest = self._load_manifest()
+        self.values = {}
+        self.status = {}
+        self.timings = {}
+
+    def add(self, stage):
+        """Register a stage; dependencies must be added before their dependents run."""
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        self.stages[stage.name] = stage
+        return stage
+
+    def order(self):
+        """Return stage names in topological order."""
+        ordered = []
+        visiting = set()
+
+        def visit(name):
+            if name in ordered:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle at stage: {name}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps + self.stages[name].after:
+                visit(dep)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return ordered
+
+    def _load_manifest(self):
+        """Load the manifest of previous stage runs."""
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        """Persist the manifest after each stage so partial runs are reused."""
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        with open(self.manifest_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+
+    def stage_key(self, stage):
+        """Content hash of everything a stage's result depends on."""
+        previous = self.manifest.get(stage.name, {}).get('sources', {})
+        sources = {path: file_digest(path, previous.get(path)) for path in stage.sources}
+
+        payload = {
+            'params': stage.params,
+            'sources': {path: entry['sha256'] if entry else None for path, entry in sources.items()},
+            'deps': {dep: self.manifest.get(dep, {}).get('output_digest') for dep in stage.deps + stage.after}
+        }
+        key = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return key, sources
+
+    def _output_state(self, stage):
+        """Current digests of a stage's outputs, or None if any output is missing."""
+        previous = self.manifest.get(stage.name, {}).get('outputs', {})
+        outputs = {path: file_digest(path, previous.get(path)) for path in stage.outputs}
+        if any(entry is None for entry in outputs.values()):
+            return None
+        return outputs
+
+    @staticmethod
+    def _combined_digest(outputs):
+        """Single digest over all output file hashes."""
+        payload = json.dumps({path: entry['sha256'] for path, entry in outputs.items()}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_up_to_date(self, stage, key):
+        """True when the stage key and all output contents match the manifest."""
+        entry = self.manifest.get(stage.name)
+        if not entry or entry.get('key') != key or stage.load is None:
+            return False
+
+        outputs = self._output_state(stage)
+        return outputs is not None and self._combined_digest(outputs) == entry.get('output_digest')
+
+    def run(self, force=False):
+        """
+        Run the graph and return a dict of stage values.
+
+        Values of skipped stages are loaded from their outputs only when a
+        stage that reruns needs them; use value() to fetch any of them later.
+        """
+        for name in self.order():
+            stage = self.stages[name]
+            key, sources = self.stage_key(stage)
+
+            if not force and self.is_up_to_date(stage, key):
+                self.status[name] = 'skipped'
+                self.timings[name] = 0.0
+                print(f"↺ {name}: up to date, skipped")
+                continue
+
+            stage_start = time.perf_counter()
+            self.values[name] = stage.func(**{dep: self.value(dep) for dep in stage.deps})
+            self.timings[name] = time.perf_counter() - stage_start
+            self.status[name] = 'ran'
+
+            outputs = self._output_state(stage) or {}
+            self.manifest[name] = {
+                'key': key,
+                'sources': sources,
+                'outputs': outputs,
+                'output_digest': self._combined_digest(outputs),
+                'completed': datetime.now().isoformat()
+            }
+            self._save_manifest()
+
+        return self.values
+
+    def value(self, name):
+        """Return a stage value, loading it from the stage outputs if it was skipped."""
+        if name not in self.values:
+            self.values[name] = self.stages[name].load()
+        return self.values[name]
@@ -0,0 +1,191 @@
+"""
+Profiling Module
+Per-phase and per-method instrumentation: wall time, CPU time, peak RSS and
+rows processed, with optional cProfile/pyinstrument dumps for each phase.
+"""
+
+import cProfile
+import functools
+import inspect
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is reported as None
+    resource = None
+
+try:
+    import pyinstrument
+except ImportError:  # pyinstrument is optional; cProfile dumps work without it
+    pyinstrument = None
+
+from artifacts import ArtifactWriter
+
+SAMPLERS = ('cprofile', 'pyinstrument')
+
+def peak_rss_mb():
+    """High-water mark of this process's resident set size in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _row_count(obj):
+    """Rows in the object's input frame, if it has one."""
+    df = getattr(obj, 'df', None)
+    return len(df) if df is not None else None
+
+class Profiler:
+    """
+    Collects timing and memory measurements grouped by pipeline phase.
+
+    instrument() wraps the public methods of an analyzer instance so every
+    call made during run_complete_analysis is measured, including nested
+    calls (recorded with their parent). phase() measures a whole phase and,
+    when sampler is 'cprofile' or 'pyinstrument', also writes a profiler
+    dump for it to dump_dir.
+    """
+
+    EXCLUDED_METHODS = ('run_complete_analysis',)
+
+    def __init__(self, sampler=None, dump_dir='visuals/profiles'):
+        if sampler is not None and sampler not in SAMPLERS:
+            raise ValueError(f"Unknown profiler: {sampler}")
+        if sampler == 'pyinstrument' and pyinstrument is None:
+            raise RuntimeError("pyinstrument is not installed; use the cprofile dump instead")
+        self.sampler = sampler
+        self.dump_dir = dump_dir
+        self.phases = {}
+        self._stack = []
+
+    def _phase_entry(self, phase):
+        return self.phases.setdefault(phase, {'methods': []})
+
+    @contextmanager
+    def measure(self, phase, name, rows=None):
+        """Measure a block of code and record it as a method call within phase."""
+        parent = self._stack[-1] if self._stack else None
+        self._stack.append(name)
+        rss_before = peak_rss_mb()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self._stack.pop()
+
+            rss_after = peak_rss_mb()
+            row_count = rows() if callable(rows) else rows
+            self._phase_entry(phase)['methods'].append({
+                'method': name,
+                'parent': parent,
+                'wall_seconds': round(wall, 6),
+                'cpu_seconds': round(cpu, 6),
+                'peak_rss_mb': round(rss_after, 2) if rss_after is not None else None,
+                'peak_rss_growth_mb': round(rss_after - rss_before, 2) if rss_after is not None else None,
+                'rows': row_count,
+                'rows_per_second': round(row_count / wall, 1) if row_count and wall > 0 else None
+            })
+
+    def instrument(self, obj, phase):
+        """Wrap every public method of obj so each call is measured under phase."""
+        for name, attribute in inspect.getmembers(type(obj)):
+            if (name.startswith('_') or name in self.EXCLUDED_METHODS
+                    or not inspect.isfunction(attribute)
+                    or isinstance(inspect.getattr_static(type(obj), name), (staticmethod, classmethod))):
+                continue
+            setattr(obj, name, self._wrap(getattr(obj, name), obj, phase, name))
+        return obj
+
+    def _wrap(self, method, obj, phase, name):
+        @functools.wraps(method)
+        def measured(*args, **kwargs):
+            with self.measure(phase, name, rows=lambda: _row_count(obj)):
+                return method(*args, **kwargs)
+        return measured
+
+    @contextmanager
+    def phase(self, phase, rows=None):
+        """Measure a whole phase, optionally under cProfile or pyinstrument."""
+        sampler = None
+        if self.sampler == 'cprofile':
+            sampler = cProfile.Profile()
+            sampler.enable()
+        elif self.sampler == 'pyinstrument':
+            sampler = pyinstrument.Profiler()
+            sampler.start()
+
+        rss_before = peak_rss_mb()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield self
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            rss_after = peak_rss_mb()
+
+            entry = self._phase_entry(phase)
+            if rows is None:
+                # Default to the largest input seen by the phase's methods
+                rows = max((call['rows'] for call in entry['methods'] if call['rows'] is not None), default=None)
+            entry.update({
+                'wall_seconds': round(wall, 6),
+                'cpu_seconds': round(cpu, 6),
+                'peak_rss_mb': round(rss_after, 2) if rss_after is not None else None,
+                'peak_rss_growth_mb': round(rss_after - rss_before, 2) if rss_after is not None else None,
+                'rows': rows() if callable(rows) else rows,
+                'pid': os.getpid()
+            })
+            if sampler is not None:
+                entry['dump'] = self._dump(phase, sampler)
+
+    def _dump(self, phase, sampler):
+        """Write the sampler output for a phase and return its path."""
+        os.makedirs(self.dump_dir, exist_ok=True)
+        if self.sampler == 'cprofile':
+            sampler.disable()
+            path = os.path.join(self.dump_dir, f'{phase}.prof')
+            sampler.dump_stats(path)
+        else:
+            sampler.stop()
+            path = os.path.join(self.dump_dir, f'{phase}.html')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(sampler.output_html())
+        return path
+
+    def hot_methods(self, n=5):
+        """The n top-level method calls with the longest wall time, across all phases."""
+        calls = [(phase, call) for phase, entry in self.phases.items()
+                 for call in entry['methods'] if call['parent'] is None]
+        return sorted(calls, key=lambda item: item[1]['wall_seconds'], reverse=True)[:n]
+
+    def merge(self, phases):
+        """Add phase measurements collected in another process."""
+        self.phases.update(phases)
+        return self
+
+    def to_dict(self):
+        """Structured profile in the layout written to profile.json."""
+        return {
+            'generated': datetime.now().isoformat(),
+            'sampler': self.sampler,
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count()
+            },
+            'phases': self.phases
+        }
+
+    def save(self, output_path='visuals/profile.json'):
+        """Write the structured profile."""
+        ArtifactWriter().write(self.to_dict(), output_path)
+        print(f"✓ Profile saved to {output_path}")
+        return output_path
@@ -8,6 +8,8 @@ import os
 from datetime import datetime
 import numpy as np
 
+from artifacts import ArtifactWriter
+
 class RecommendationEngine:
     """
     Generates actionable business recommendations from EDA results.
@@ -111,6 +113,23 @@ class RecommendationEngine:
                         'priority': 85
                     })
         
+        # Lapsing valuable customers (RFM segments)
+        rfm_segments = cp_data.get('rfm', {}).get('segments', {})
+        if 'At Risk' in rfm_segments:
+            at_risk = rfm_segments['At Risk']
+            if at_risk['revenue_share'] > 10:
+                recommendations.append({
+                    'category': 'marketing',
+                    'title': 'At-Risk Customer Win-Back',
+                    'description': (f"{at_risk['percentage']:.1f}% of customers are high-value but lapsing "
+                                    f"({at_risk['revenue_share']:.1f}% of revenue, "
+                                    f"{at_risk['avg_recency_days']:.0f} days since last purchase on average)"),
+                    'recommendation': 'Target the At Risk segment of the RFM scores file with personalized win-back offers before they churn',
+                    'impact': 'High',
+                    'timeline': '1-2 months',
+                    'priority': 80
+                })
+        
         # Cross-selling opportunities
         if 'customer_product_matrix' in cp_data:
             cross_sell = cp_data['customer_product_matrix']['cross_selling_opportunities']
@@ -170,6 +189,25 @@ class RecommendationEngine:
                             'priority': 60
                         })
         
+        # Product bundles from market-basket association rules
+        if 'market_basket' in cp_data:
+            rules = [rule for rule in cp_data['market_basket'].get('association_rules', []) if rule['lift'] > 1]
+            if rules:
+                best_rule = rules[0]
+                antecedent = ' + '.join(best_rule['antecedent'])
+                consequent = ' + '.join(best_rule['consequent'])
+                
+                recommendations.append({
+                    'category': 'marketing',
+                    'title': 'Product Bundle Promotion',
+                    'description': f'Baskets with {antecedent} also contain {consequent} '
+                                   f'{best_rule["confidence"] * 100:.1f}% of the time ({best_rule["lift"]:.2f}x lift)',
+                    'recommendation': 'Bundle these products, place them together and offer add-ons at checkout',
+                    'impact': 'Medium',
+                    'timeline': '1-2 months',
+                    'priority': 68
+                })
+        
         return recommendations
     
     def analyze_operational_opportunities(self, ts_data):
@@ -366,10 +404,7 @@ class RecommendationEngine:
     
     def save_recommendations(self, results, output_path='recommendations/recommendations.json'):
         """Save recommendations to JSON file."""
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        with open(output_path, 'w') as f:
-            json.dump(results, f, indent=2)
+        ArtifactWriter().write(results, output_path)
         
         print(f"✓ Recommendations saved to {output_path}")
     
@@ -0,0 +1,287 @@
+"""
+Resampling Module
+Bootstrap confidence intervals and permutation p-values for the hypothesis
+tests, drawn in batches as NumPy matrix operations with a seeded RNG.
+"""
+
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+BLOCK_SIZE = 250             # resamples per RNG block (and per worker task)
+MAX_TABLE_CELLS = 20_000     # groups x distinct values kept as a count table
+COMPRESSION_RATIO = 4        # rows per table cell below which the rows are resampled directly
+MAX_BATCH_ELEMENTS = 1 << 22  # cap on the index matrices of row-level resampling
+
+class GroupedSample:
+    """
+    A numeric sample split into groups, reduced to what resampling needs.
+
+    When groups x distinct values is much smaller than the number of rows
+    (prices and quantities take few values, so Total_Amount does too) the
+    sample is stored as a count table and every resample is drawn as
+    counts: a bootstrap resample of a group is a multinomial draw over its
+    distinct values, and a label permutation is a multivariate
+    hypergeometric split of the pooled values. Either way the cost depends
+    on the table size, not on the number of rows. Other samples keep their
+    rows, sorted by group, and are resampled through index matrices.
+
+    labels fixes the group order (rows in other groups are dropped);
+    otherwise the sorted observed groups are used.
+    """
+
+    def __init__(self, groups, values, labels=None):
+        groups = pd.Series(groups).reset_index(drop=True)
+        values = np.asarray(values, dtype='float64')
+        if labels is None:
+            codes, labels = pd.factorize(groups, sort=True)
+        else:
+            codes = pd.Categorical(groups, categories=labels).codes
+        keep = codes >= 0
+        codes, values = codes[keep].astype('int64'), values[keep]
+
+        self.labels = np.asarray(labels)
+        self.sizes = np.bincount(codes, minlength=len(self.labels))
+        self.levels, value_codes = np.unique(values, return_inverse=True)
+        cells = len(self.labels) * len(self.levels)
+        self.compressed = cells <= MAX_TABLE_CELLS and cells * COMPRESSION_RATIO <= len(codes)
+
+        if self.compressed:
+            self.counts = np.bincount(codes * len(self.levels) + value_codes.ravel(),
+                                      minlength=cells).reshape(len(self.labels), -1)
+            self.codes = self.values = None
+        else:
+            self.counts = None
+            order = np.argsort(codes, kind='stable')
+            self.codes, self.values = codes[order], values[order]
+
+    def sufficient_statistics(self):
+        """Per-group (n, sum, sum of squares) of the observed sample, each shaped (1, groups)."""
+        if self.compressed:
+            sums, squares = self.counts @ self.levels, self.counts @ self.levels ** 2
+        else:
+            sums = np.bincount(self.codes, weights=self.values, minlength=len(self.labels))
+            squares = np.bincount(self.codes, weights=self.values ** 2, minlength=len(self.labels))
+        return self.sizes[None, :].astype('float64'), sums[None, :], squares[None, :]
+
+def _table_statistics(table, levels):
+    """(n, sum, sum of squares) per resample and group from (resamples, groups, values) counts."""
+    return table.sum(axis=2).astype('float64'), table @ levels, table @ levels ** 2
+
+def _halving_totals(counts):
+    """
+    Totals of counts over the nodes of a binary split of its last axis.
+
+    The axis is zero-padded to a power of two; entry d has 2 ** d nodes,
+    from the grand total (d = 0) down to the padded counts themselves.
+    """
+    width = 1 << max(counts.shape[-1] - 1, 0).bit_length()
+    padded = np.zeros(counts.shape[:-1] + (width,), dtype='int64')
+    padded[..., :counts.shape[-1]] = counts
+    totals = [padded]
+    while totals[-1].shape[-1] > 1:
+        totals.append(totals[-1].reshape(counts.shape[:-1] + (-1, 2)).sum(axis=-1))
+    return totals[::-1]
+
+def _draw_without_replacement(remaining, draws, rng):
+    """
+    One multivariate hypergeometric draw of `draws` items per row of `remaining` counts.
+
+    The values are split in halves recursively: how many of a node's draws
+    fall in its left half is a univariate hypergeometric draw, so each
+    depth of the split is one vectorized call over all rows and nodes, and
+    a draw over L values takes log2(L) calls rather than one per value.
+    Nodes with an empty half (including the zero padding) need no draw.
+    """
+    rows, values = remaining.shape
+    drawn = np.broadcast_to(np.asarray(draws, dtype='int64'), (rows,))[:, None]
+    for level in _halving_totals(remaining)[1:]:
+        good, bad = level[:, 0::2], level[:, 1::2]
+        left = np.where(bad == 0, drawn, 0)
+        mixed = (good > 0) & (bad > 0) & (drawn > 0)
+        left[mixed] = rng.hypergeometric(good[mixed], bad[mixed], drawn[mixed])
+        drawn = np.stack([left, drawn - left], axis=2).reshape(rows, -1)
+    return drawn[:, :values]
+
+def _permuted_table(counts, sizes, size, rng):
+    """
+    `size` random (groups, values) tables with the row sums and column sums of counts.
+
+    A label permutation deals the pooled values out to the groups, so the
+    groups are split in halves the same way _draw_without_replacement
+    splits values: the left half of a node takes its share of the node's
+    values as one multivariate hypergeometric draw, for all resamples and
+    nodes of a depth at once.
+    """
+    groups, values = counts.shape
+    tables = np.tile(counts.sum(axis=0), (size, 1, 1))
+    for level in _halving_totals(sizes)[1:]:
+        halves = level.reshape(-1, 2)
+        left = _draw_without_replacement(tables.reshape(-1, values), np.tile(halves[:, 0], size), rng)
+        left = left.reshape(size, -1, values)
+        tables = np.stack([left, tables - left], axis=2).reshape(size, -1, values)
+    return tables[:, :groups]
+
+def _compressed_block(sample, kind, size, rng):
+    counts = sample.counts
+    if kind == 'permutation':
+        table = _permuted_table(counts, sample.sizes, size, rng)
+    elif kind == 'bootstrap':
+        table = np.zeros((size,) + counts.shape, dtype='int64')
+        for group, group_size in enumerate(sample.sizes):
+            if group_size:
+                table[:, group] = rng.multinomial(group_size, counts[group] / group_size, size=size)
+    else:
+        total = counts.sum()
+        table = rng.multinomial(total, counts.ravel() / total, size=size).reshape((size,) + counts.shape)
+    return _table_statistics(table, sample.levels)
+
+def _grouped_sums(codes, values, groups):
+    """(n, sum, sum of squares) per resample and group from (resamples, rows) group codes and values."""
+    size = len(codes)
+    cells = (codes + (np.arange(size) * groups)[:, None]).ravel()
+    values = np.broadcast_to(values, codes.shape).ravel()
+    return tuple(np.bincount(cells, weights=weights, minlength=size * groups).reshape(size, groups)
+                 for weights in (None, values, values ** 2))
+
+def _row_block(sample, kind, size, rng):
+    groups = len(sample.labels)
+    rows = len(sample.values)
+    batch = max(1, MAX_BATCH_ELEMENTS // max(rows, 1))
+    # Rows are sorted by group, so a group's rows are the span starting at its offset
+    starts = np.concatenate([[0], np.cumsum(sample.sizes)[:-1]])[sample.codes]
+    spans = sample.sizes[sample.codes]
+
+    parts = []
+    for start in range(0, size, batch):
+        count = min(batch, size - start)
+        if kind == 'bootstrap':
+            index = starts + rng.integers(0, spans, (count, rows))
+            codes, values = np.broadcast_to(sample.codes, (count, rows)), sample.values[index]
+        elif kind == 'permutation':
+            codes = rng.permuted(np.tile(sample.codes, (count, 1)), axis=1)
+            values = sample.values
+        else:
+            index = rng.integers(0, rows, (count, rows))
+            codes, values = sample.codes[index], sample.values[index]
+        parts.append(_grouped_sums(codes, values, groups))
+
+    n, sums, squares = (np.concatenate(part) for part in zip(*parts))
+    return n.astype('float64'), sums, squares
+
+def _resample_block(sample, kind, size, seed):
+    """Sufficient statistics of one block of resamples; a top-level function so workers can run it."""
+    rng = np.random.default_rng(seed)
+    if sample.compressed:
+        return _compressed_block(sample, kind, size, rng)
+    return _row_block(sample, kind, size, rng)
+
+def mean_difference(n, sums, squares):
+    """Mean of the first group minus mean of the second."""
+    means = sums / n
+    return means[:, 0] - means[:, 1]
+
+def eta_squared(n, sums, squares):
+    """Share of the variance explained by the groups (monotone in the ANOVA F statistic)."""
+    total_n, total_sum = n.sum(axis=1), sums.sum(axis=1)
+    between = (sums ** 2 / n).sum(axis=1) - total_sum ** 2 / total_n
+    total = squares.sum(axis=1) - total_sum ** 2 / total_n
+    return between / total
+
+def correlation(x, n, sums, squares):
+    """Pearson r between the (numeric) group labels x and the values."""
+    total_n = n.sum(axis=1)
+    sum_x, sum_xx = n @ x, n @ x ** 2
+    sum_y, sum_yy = sums.sum(axis=1), squares.sum(axis=1)
+    sum_xy = sums @ x
+    covariance = total_n * sum_xy - sum_x * sum_y
+    return covariance / np.sqrt((total_n * sum_xx - sum_x ** 2) * (total_n * sum_yy - sum_y ** 2))
+
+class ResamplingEngine:
+    """
+    Batched bootstrap and permutation resampling of GroupedSamples.
+
+    Resamples are drawn in fixed blocks of block_size, each from its own
+    seed derived from (seed, test name, resampling kind, block), so results
+    are reproducible and identical whether the blocks run serially or in a
+    process pool of `workers`. Statistics are functions of per-group
+    (n, sum, sum of squares) arrays shaped (resamples, groups).
+    """
+
+    KINDS = ('bootstrap', 'pairs', 'permutation')
+
+    def __init__(self, n_resamples=2000, confidence=0.95, seed=42, workers=None, block_size=BLOCK_SIZE):
+        self.n_resamples = n_resamples
+        self.confidence = confidence
+        self.seed = seed
+        self.workers = workers
+        self.block_size = block_size
+
+    def _seeds(self, name, kind):
+        stream = zlib.crc32(f'{name}:{kind}'.encode())
+        blocks = -(-self.n_resamples // self.block_size)
+        sizes = [min(self.block_size, self.n_resamples - block * self.block_size) for block in range(blocks)]
+        seeds = [np.random.SeedSequence(self.seed, spawn_key=(stream, block)) for block in range(blocks)]
+        return sizes, seeds
+
+    def resample(self, sample, kind, name):
+        """
+        Sufficient statistics of n_resamples resamples of the sample.
+
+        kind is 'bootstrap' (each group resampled with replacement at its
+        own size), 'pairs' (all rows resampled together, so group sizes
+        vary) or 'permutation' (group labels shuffled across the rows).
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown resampling kind: {kind}")
+        sizes, seeds = self._seeds(name, kind)
+
+        if self.workers and self.workers > 1 and len(sizes) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                blocks = list(executor.map(_resample_block, repeat(sample), repeat(kind), sizes, seeds))
+        else:
+            blocks = [_resample_block(sample, kind, size, seed) for size, seed in zip(sizes, seeds)]
+
+        return tuple(np.concatenate(parts) for parts in zip(*blocks))
+
+    def test(self, sample, statistic, name, pairs=False, alternative='two-sided'):
+        """
+        Bootstrap percentile CI and permutation p-value of a statistic.
+
+        alternative is 'two-sided' (compares |statistic|) or 'greater'.
+        The p-value counts the observed arrangement as one of the
+        permutations, so it is never exactly zero. Returns None when
+        n_resamples is 0, which turns resampling off.
+        """
+        if not self.n_resamples:
+            return None
+        with np.errstate(divide='ignore', invalid='ignore'):
+            observed = float(statistic(*sample.sufficient_statistics())[0])
+            bootstrap = statistic(*self.resample(sample, 'pairs' if pairs else 'bootstrap', name))
+            permuted = statistic(*self.resample(sample, 'permutation', name))
+
+        tail = (1 - self.confidence) / 2
+        lower, upper = np.nanquantile(bootstrap, [tail, 1 - tail])
+
+        if alternative == 'two-sided':
+            observed_extremity, permuted = abs(observed), np.abs(permuted)
+        else:
+            observed_extremity = observed
+        # Tolerance so permutations tying the observed statistic are not lost to rounding
+        extreme = np.count_nonzero(permuted >= observed_extremity - 1e-9 * abs(observed_extremity))
+        p_value = (extreme + 1) / (len(permuted) + 1)
+
+        return {
+            'estimate': observed,
+            'ci_lower': float(lower),
+            'ci_upper': float(upper),
+            'confidence': self.confidence,
+            'bootstrap': 'pairs' if pairs else 'stratified',
+            'permutation_p_value': float(p_value),
+            'significant': bool(p_value < 0.05),
+            'resamples': self.n_resamples,
+            'seed': self.seed
+        }
@@ -0,0 +1,206 @@
+"""
+RFM Scoring Module
+Scores every customer on recency, frequency and monetary value from the
+customer fact table, with bin edges taken from quantile sketches, and
+keeps the scores in a columnar file for the recommendations and dashboard.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - enables the Parquet scores file
+    SCORES_FORMAT = 'parquet'
+except ImportError:
+    SCORES_FORMAT = 'pickle'
+
+from sketches import QuantileSketch
+
+# Score name -> customer fact column it ranks; a later last purchase scores higher on recency
+METRICS = {
+    'R': 'last_purchase',
+    'F': 'transaction_count',
+    'M': 'total_spent'
+}
+
+# Checked in order on recency and on the mean of the frequency and monetary
+# scores, both rescaled to 0..1; the first match names the segment
+SEGMENTS = [
+    ('Champions', 0.75, 0.75),
+    ('Loyal Customers', 0.5, 0.5),
+    ('Recent Customers', 0.75, 0.0),
+    ('At Risk', 0.0, 0.5),
+    ('Needs Attention', 0.5, 0.0),
+    ('Hibernating', 0.0, 0.0)
+]
+
+NANOSECONDS_PER_DAY = 86_400 * 10 ** 9
+
+def scores_path(output_dir='visuals'):
+    """Path of the RFM scores file in output_dir, in the available columnar format."""
+    extension = 'parquet' if SCORES_FORMAT == 'parquet' else 'pkl'
+    return os.path.join(output_dir, f'rfm_scores.{extension}')
+
+def read_scores(path):
+    """Load a scores file written by RFMEngine.save_scores()."""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+class RFMEngine:
+    """
+    Recency, frequency and monetary scores of 1..bins per customer.
+
+    fit() folds customer facts into one QuantileSketch per metric, so the
+    facts can arrive in chunks (e.g. one per partition of customers) and
+    the sketches stay bounded by capacity however many customers there
+    are. The bin edges are the sketches' 1/bins, ..., (bins-1)/bins
+    quantiles, and score() then places every customer with one
+    searchsorted per metric. Edges follow pd.qcut: bins are closed on the
+    right and tied edges are dropped, so a metric with few distinct values
+    (e.g. one transaction per customer) gets fewer score levels; a metric
+    with a single level carries no information and is left out of the
+    segment rules. Until a sketch compacts (fewer than capacity customers)
+    its edges are exact.
+    """
+
+    def __init__(self, bins=5, capacity=2048, reference_date=None, id_column='Customer_ID'):
+        if not 2 <= bins <= 9:
+            raise ValueError("bins must be between 2 and 9 so each RFM cell is three digits")
+        self.bins = bins
+        self.capacity = capacity
+        self.reference_date = None if reference_date is None else pd.Timestamp(reference_date)
+        self.id_column = id_column
+        self.sketches = {score: QuantileSketch(capacity=capacity) for score in METRICS}
+        self.latest_purchase = None
+        self.scores = None
+        self._edges = None
+
+    @staticmethod
+    def _metric_values(facts, score):
+        column = facts[METRICS[score]]
+        if score == 'R':
+            # Dates are ranked as float days since the epoch
+            return column.to_numpy(dtype='datetime64[ns]').astype('int64') / NANOSECONDS_PER_DAY
+        return column.to_numpy(dtype='float64')
+
+    def fit(self, facts):
+        """Fold a chunk of customer facts into the per-metric sketches."""
+        for score in METRICS:
+            self.sketches[score].update(self._metric_values(facts, score))
+        latest = facts[METRICS['R']].max()
+        if pd.notna(latest):
+            self.latest_purchase = latest if self.latest_purchase is None else max(self.latest_purchase, latest)
+        self._edges = None
+        return self
+
+    def edges(self):
+        """Distinct interior bin edges of each metric, from the fitted sketches."""
+        if self._edges is None:
+            quantiles = np.arange(1, self.bins) / self.bins
+            self._edges = {score: np.unique([sketch.quantile(q) for q in quantiles])
+                           for score, sketch in self.sketches.items()}
+        return self._edges
+
+    def levels(self):
+        """Number of score levels each metric actually has after tied edges are dropped."""
+        return {score: len(edges) + 1 for score, edges in self.edges().items()}
+
+    def _reference(self):
+        """Date recency is measured from: the given date, or the day after the latest purchase."""
+        if self.reference_date is not None:
+            return self.reference_date
+        return self.latest_purchase.normalize() + pd.Timedelta(days=1)
+
+    def score(self, facts):
+        """
+        Scores of every customer in facts, in facts order.
+
+        Returns a frame with the id column, the raw recency (days since the
+        last purchase), frequency and monetary values, the R, F and M
+        scores, the RFM cell (R * 100 + F * 10 + M) and the segment.
+        """
+        edges, levels = self.edges(), self.levels()
+        scores = {score: (np.searchsorted(edges[score], self._metric_values(facts, score), side='left') + 1)
+                  .astype('int8') for score in METRICS}
+
+        # Frequency and monetary on 0..1, skipping a metric with a single level
+        scaled = [(scores[score] - 1) / (levels[score] - 1) for score in ('F', 'M') if levels[score] > 1]
+        value = np.mean(scaled, axis=0) if scaled else np.zeros(len(facts))
+        recency = (scores['R'] - 1) / (levels['R'] - 1) if levels['R'] > 1 else np.zeros(len(facts))
+
+        names = [name for name, _, _ in SEGMENTS]
+        segment = np.select([(recency >= min_recency) & (value >= min_value)
+                             for _, min_recency, min_value in SEGMENTS],
+                            np.arange(len(SEGMENTS)), default=len(SEGMENTS) - 1)
+
+        return pd.DataFrame({
+            self.id_column: facts.index.to_numpy() if facts.index.name == self.id_column
+            else facts[self.id_column].to_numpy(),
+            'recency_days': (self._reference() - facts[METRICS['R']]).dt.days.to_numpy(dtype='int32'),
+            'frequency': facts[METRICS['F']].to_numpy(dtype='int32'),
+            'monetary': facts[METRICS['M']].to_numpy(dtype='float64'),
+            **scores,
+            # Widened before multiplying: int8 scores would wrap around at R * 100
+            'rfm_cell': (scores['R'].astype('int16') * 100 + scores['F'].astype('int16') * 10
+                         + scores['M'].astype('int16')),
+            'segment': pd.Categorical.from_codes(segment, categories=names)
+        })
+
+    def run(self, facts):
+        """Fit on and score an in-memory fact table."""
+        self.scores = self.fit(facts).score(facts)
+        return self.scores
+
+    def to_dict(self, scores=None):
+        """Bin edges, score distributions and per-segment summaries of scores (default: from run())."""
+        scores = self.scores if scores is None else scores
+        total_customers = len(scores)
+        total_revenue = float(scores['monetary'].sum())
+        epoch = pd.Timestamp(0)
+
+        edges = {
+            'recency': [(epoch + pd.Timedelta(days=float(edge))).strftime('%Y-%m-%d') for edge in self.edges()['R']],
+            'frequency': [float(edge) for edge in self.edges()['F']],
+            'monetary': [float(edge) for edge in self.edges()['M']]
+        }
+
+        segments = {}
+        grouped = scores.groupby('segment', observed=True)
+        for name, segment_data in grouped:
+            segments[str(name)] = {
+                'customer_count': int(len(segment_data)),
+                'percentage': float(len(segment_data) / total_customers * 100),
+                'avg_recency_days': float(segment_data['recency_days'].mean()),
+                'avg_frequency': float(segment_data['frequency'].mean()),
+                'avg_monetary': float(segment_data['monetary'].mean()),
+                'total_revenue': float(segment_data['monetary'].sum()),
+                'revenue_share': float(segment_data['monetary'].sum() / total_revenue * 100) if total_revenue else 0.0
+            }
+
+        return {
+            'customers': int(total_customers),
+            'bins': self.bins,
+            'score_levels': self.levels(),
+            'reference_date': self._reference().strftime('%Y-%m-%d'),
+            'exact': all(sketch.is_exact for sketch in self.sketches.values()),
+            'rank_error': max(sketch.rank_error_bound() for sketch in self.sketches.values()),
+            'edges': edges,
+            'score_distribution': {score: {str(level): int(count) for level, count
+                                           in scores[score].value_counts().sort_index().items()}
+                                   for score in METRICS},
+            'segments': segments
+        }
+
+    def save_scores(self, output_path=None):
+        """Write the scores to a columnar file (Parquet, or pickle without pyarrow)."""
+        output_path = output_path or scores_path()
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        if output_path.endswith('.parquet'):
+            self.scores.to_parquet(output_path, index=False)
+        else:
+            self.scores.to_pickle(output_path)
+        print(f"✓ RFM scores saved to {output_path} ({len(self.scores)} customers)")
+        return output_path
@@ -5,7 +5,11 @@ Orchestrates the complete exploratory data analysis pipeline.
 
 import os
 import sys
-import json
+import time
+import argparse
+import functools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 # Add current directory to path for imports
@@ -15,18 +19,142 @@ from load_clean import DataLoader
 from stats import StatisticalAnalyzer
 from time_series import TimeSeriesAnalyzer
 from customer_product import CustomerProductAnalyzer
+from customer_facts import CustomerFactTable
+from sql_backend import SQLBackend, BACKENDS
+from resampling import ResamplingEngine
+from rfm import scores_path
 from visuals import VisualizationGenerator
+from downsample import Downsampler
 from recommend import RecommendationEngine
+from sections import SectionPayloadBuilder
+from pipeline import Stage, StageGraph
+from artifacts import ArtifactWriter, ARTIFACT_MODE_ENV
+from profiling import Profiler, SAMPLERS
+
+EDA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Analysis phases that only read the cleaned data and can run independently
+ANALYSIS_PHASES = {
+    'statistical_analysis': ('Statistical Analysis', StatisticalAnalyzer),
+    'time_series_analysis': ('Time Series Analysis', TimeSeriesAnalyzer),
+    'customer_product_analysis': ('Customer & Product Analysis', CustomerProductAnalyzer)
+}
+
+# Files holding each entry of EDARunner.results, referenced by complete_eda_results.json
+RESULT_ARTIFACTS = {
+    'data_summary': 'visuals/data_summary.json',
+    'statistical_analysis': 'visuals/statistical_analysis.json',
+    'time_series_analysis': 'visuals/time_series_analysis.json',
+    'customer_product_analysis': 'visuals/customer_product_analysis.json',
+    'visualization_config': 'visuals/dashboard_config.json',
+    'recommendations': 'recommendations/recommendations.json',
+    'dashboard_sections': 'visuals/sections/manifest.json'
+}
+
+# Phases whose aggregates the SQL backend supplies entirely, so they never need the cleaned frame
+BACKEND_ONLY_PHASES = {'time_series_analysis'}
+
+# Files an analysis phase writes besides visuals/<phase>.json
+PHASE_EXTRA_OUTPUTS = {
+    'statistical_analysis': ['visuals/outlier_index.npz'],
+    'customer_product_analysis': [scores_path('visuals')]
+}
+
+def create_analyzer(phase, df, customer_facts=None, backend=None, resampler=None):
+    """Analyzer for a phase, fed from the SQL backend's aggregates when one is given."""
+    _, analyzer_class = ANALYSIS_PHASES[phase]
+    if analyzer_class is TimeSeriesAnalyzer:
+        if backend is not None:
+            return analyzer_class(aggregates=backend.time_series_aggregates())
+        return analyzer_class(df)
+    if analyzer_class is CustomerProductAnalyzer:
+        return analyzer_class(df, customer_facts=customer_facts, backend=backend)
+    return analyzer_class(df, customer_facts=customer_facts, resampler=resampler)
+
+def run_analysis_phase(phase, data_file, customer_facts=None, profile=False, profile_sampler=None,
+                       backend='pandas', resampler=None):
+    """
+    Run one analysis phase in a worker process.
+    
+    The cleaned frame is read from the shared columnar cache file (memory-mapped
+    when it is Parquet) instead of being pickled across the process boundary.
+    Returns the phase name, its results, the wall-clock seconds it took and,
+    when profile is set, the worker's phase measurements. With the duckdb
+    backend the worker opens (and closes) its own connection over the same
+    file, and BACKEND_ONLY_PHASES never read the frame.
+    """
+    phase_start = time.perf_counter()
+    profiler = Profiler(profile_sampler) if profile else None
+    
+    with profiler.phase(phase) if profiler else contextlib.nullcontext():
+        sql_backend = SQLBackend(data_file) if backend == 'duckdb' else None
+        with sql_backend or contextlib.nullcontext():
+            df = None if sql_backend is not None and phase in BACKEND_ONLY_PHASES else \
+                DataLoader.read_cache_file(data_file)
+            
+            analyzer = create_analyzer(phase, df, customer_facts, sql_backend, resampler)
+            if profiler:
+                profiler.instrument(analyzer, phase)
+            
+            results = analyzer.run_complete_analysis()
+            analyzer.save_results()
+    
+    return phase, results, time.perf_counter() - phase_start, profiler.phases if profiler else None
+
+def profiled_phase(phase):
+    """Run an EDARunner phase method under the runner's profiler, when profiling is enabled."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.profiler is None:
+                return method(self, *args, **kwargs)
+            with self.profiler.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 class EDARunner:
     """
     Main class to run complete EDA pipeline.
     """
     
-    def __init__(self):
+    def __init__(self, use_cache=True, parallel=False, max_workers=None, incremental=False, force=False,
+                 data_path='data/retail_sales_dataset.csv', start_date=None, end_date=None, read_workers=None,
+                 profile=False, profile_sampler=None, chart_points=500, downsample_method='lttb',
+                 backend='pandas', resamples=2000, resample_workers=None, stream_chunksize=None):
         self.start_time = datetime.now()
         self.results = {}
+        self.data_path = data_path
+        self.start_date = start_date
+        self.end_date = end_date
+        self.read_workers = read_workers
+        self.stream_chunksize = stream_chunksize
+        self.use_cache = use_cache
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.incremental = incremental
+        self.force = force
+        self.stage_status = {}
+        self.customer_facts = None
+        self.data_file = None
+        self.phase_timings = {}
+        self.profile_sampler = profile_sampler
+        self.chart_points = chart_points
+        self.downsample_method = downsample_method
+        self.backend = backend
+        self.sql_backend = None
+        self.resampler = ResamplingEngine(resamples, workers=resample_workers)
+        self.profiler = Profiler(profile_sampler) if profile or profile_sampler else None
         
+    def create_loader(self):
+        """DataLoader for the configured source, analysis window and read parallelism."""
+        return DataLoader(self.data_path, start_date=self.start_date, end_date=self.end_date,
+                          max_workers=self.read_workers, chunksize=self.stream_chunksize)
+    
+    def instrument(self, obj, phase):
+        """Measure every public method call of obj when profiling is enabled."""
+        return self.profiler.instrument(obj, phase) if self.profiler else obj
+    
     def print_header(self):
         """Print analysis header."""
         print("="*60)
@@ -39,85 +167,165 @@ class EDARunner:
         """Print section header."""
         print(f"\n{'='*20} {title.upper()} {'='*20}")
     
+    @profiled_phase('data_loading')
     def run_data_loading_and_cleaning(self):
         """Run data loading and cleaning phase."""
         self.print_section("Data Loading & Cleaning")
         
-        loader = DataLoader()
+        loader = self.instrument(self.create_loader(), 'data_loading')
         
-        # Load data
-        raw_data = loader.load_data()
-        if raw_data is None:
-            print("❌ Failed to load data. Exiting.")
-            return None
+        # Reuse the columnar cache when the source file and cleaning config are unchanged
+        cleaned_data = loader.load_cached_data() if self.use_cache else None
+        summary = None
         
-        # Validate data
-        loader.validate_data()
-        
-        # Clean data
-        cleaned_data = loader.clean_data()
-        if cleaned_data is None:
-            print("❌ Failed to clean data. Exiting.")
-            return None
+        if cleaned_data is None and self.stream_chunksize:
+            # Validate, clean and summarize chunk by chunk into the cache, then read the frame back
+            summary = loader.stream_data(self.stream_chunksize, cache=True)
+            cleaned_data = loader.load_cached_data() if summary is not None else None
+            if cleaned_data is None:
+                print("❌ Failed to stream data. Exiting.")
+                return None
+        elif cleaned_data is None:
+            # Load data
+            raw_data = loader.load_data()
+            if raw_data is None:
+                print("❌ Failed to load data. Exiting.")
+                return None
+            
+            # Validate data
+            loader.validate_data()
+            
+            # Clean data
+            cleaned_data = loader.clean_data()
+            if cleaned_data is None:
+                print("❌ Failed to clean data. Exiting.")
+                return None
+            
+            # Parallel workers and the SQL backend read the cleaned frame from the cache file
+            if self.use_cache or self.parallel or self.backend != 'pandas':
+                loader.save_cache()
+            
+            # Export results
+            loader.export_cleaned_data()
         
-        # Generate summary
-        summary = loader.get_data_summary()
+        # Generate summary (a streamed load already built it from sketches)
+        summary = summary or loader.get_data_summary()
+        ArtifactWriter().write(summary, RESULT_ARTIFACTS['data_summary'])
         
-        # Export results
-        loader.export_cleaned_data()
         loader.save_data_quality_report()
         
+        self.data_file = loader.cache_file
+        if self.backend == 'duckdb':
+            self.sql_backend = SQLBackend(self.data_file)
+        
+        # Per-customer aggregates shared by the statistical and customer analyzers
+        self.customer_facts = self.build_customer_facts(cleaned_data)
+        
         self.results['data_summary'] = summary
         return cleaned_data
     
+    def close_backend(self):
+        """Close the SQL backend's DuckDB connection, if one was opened."""
+        if self.sql_backend is not None:
+            self.sql_backend.close()
+            self.sql_backend = None
+    
+    def build_customer_facts(self, df):
+        """Per-customer fact table, grouped by the SQL backend when one is configured."""
+        if self.sql_backend is not None:
+            return self.sql_backend.customer_facts()
+        return CustomerFactTable(df).build()
+    
+    @profiled_phase('statistical_analysis')
     def run_statistical_analysis(self, df):
         """Run statistical analysis phase."""
         self.print_section("Statistical Analysis")
         
-        analyzer = StatisticalAnalyzer(df)
+        analyzer = self.instrument(create_analyzer('statistical_analysis', df, self.customer_facts,
+                                                   resampler=self.resampler), 'statistical_analysis')
         stats_results = analyzer.run_complete_analysis()
         analyzer.save_results()
         
         self.results['statistical_analysis'] = stats_results
         return stats_results
     
+    @profiled_phase('time_series_analysis')
     def run_time_series_analysis(self, df):
         """Run time series analysis phase."""
         self.print_section("Time Series Analysis")
         
-        analyzer = TimeSeriesAnalyzer(df)
+        analyzer = self.instrument(create_analyzer('time_series_analysis', df, backend=self.sql_backend),
+                                   'time_series_analysis')
         ts_results = analyzer.run_complete_analysis()
         analyzer.save_results()
         
         self.results['time_series_analysis'] = ts_results
         return ts_results
     
+    @profiled_phase('customer_product_analysis')
     def run_customer_product_analysis(self, df):
         """Run customer and product analysis phase."""
         self.print_section("Customer & Product Analysis")
         
-        analyzer = CustomerProductAnalyzer(df)
+        analyzer = self.instrument(create_analyzer('customer_product_analysis', df, self.customer_facts,
+                                                   self.sql_backend),
+                                   'customer_product_analysis')
         cp_results = analyzer.run_complete_analysis()
         analyzer.save_results()
         
         self.results['customer_product_analysis'] = cp_results
         return cp_results
     
+    def run_analysis_phases_parallel(self):
+        """Run the independent analysis phases in a process pool and join their results."""
+        self.print_section("Parallel Analysis")
+        
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(run_analysis_phase, phase, self.data_file,
+                                None if phase == 'time_series_analysis' else self.customer_facts,
+                                self.profiler is not None, self.profile_sampler, self.backend, self.resampler)
+                for phase in ANALYSIS_PHASES
+            ]
+            for future in futures:
+                phase, results, elapsed, profile = future.result()
+                self.results[phase] = results
+                if profile:
+                    self.profiler.merge(profile)
+                self.phase_timings[phase] = elapsed
+                print(f"✓ {ANALYSIS_PHASES[phase][0]} finished in {elapsed:.2f}s")
+        
+        return self.results
+    
+    def timed_phase(self, name, func, *args):
+        """Run a pipeline phase and record its wall-clock duration."""
+        phase_start = time.perf_counter()
+        result = func(*args)
+        self.phase_timings[name] = time.perf_counter() - phase_start
+        return result
+    
+    @profiled_phase('visualization')
     def run_visualization_generation(self):
         """Run visualization generation phase."""
         self.print_section("Visualization Generation")
         
-        generator = VisualizationGenerator()
-        viz_config = generator.generate_complete_visualization_suite()
+        downsampler = Downsampler(self.chart_points, method=self.downsample_method)
+        generator = self.instrument(VisualizationGenerator(downsampler), 'visualization')
+        viz_config = generator.generate_complete_visualization_suite(
+            self.results.get('statistical_analysis'),
+            self.results.get('time_series_analysis'),
+            self.results.get('customer_product_analysis')
+        )
         
         self.results['visualization_config'] = viz_config
         return viz_config
     
+    @profiled_phase('recommendations')
     def run_recommendation_generation(self):
         """Run recommendation generation phase."""
         self.print_section("Business Recommendations")
         
-        engine = RecommendationEngine()
+        engine = self.instrument(RecommendationEngine(), 'recommendations')
         
         # Get analysis results
         stats_data = self.results.get('statistical_analysis')
@@ -134,6 +342,158 @@ class EDARunner:
         self.results['recommendations'] = recommendations
         return recommendations
     
+    @profiled_phase('dashboard_sections')
+    def run_section_payloads(self):
+        """Write the per-section dashboard payloads."""
+        self.print_section("Dashboard Sections")
+        
+        builder = self.instrument(SectionPayloadBuilder(), 'dashboard_sections')
+        viz_config = self.results.get('visualization_config')
+        payloads = builder.build(
+            viz_config,
+            self.results.get('statistical_analysis'),
+            self.results.get('customer_product_analysis'),
+            self.results.get('recommendations')
+        )
+        manifest = builder.write(payloads, builder.resolution_levels(viz_config))
+        
+        self.results['dashboard_sections'] = manifest
+        return manifest
+    
+    def build_stage_graph(self):
+        """Declare the pipeline stages and their inputs/outputs as a dependency graph."""
+        graph = StageGraph()
+        loader = self.create_loader()
+        analysis_deps = list(ANALYSIS_PHASES)
+        # Output formatting is part of every stage key so switching modes rewrites the files;
+        # every stage writes through ArtifactWriter, so its module is a source of each one too
+        artifact_params = {'artifact_mode': ArtifactWriter().mode}
+        artifact_source = os.path.join(EDA_DIR, 'artifacts.py')
+        
+        def load_json(path):
+            return lambda: VisualizationGenerator().load_json_file(path)
+        
+        def load_cleaned():
+            cleaned_data = DataLoader.read_cache_file(loader.cache_file)
+            # A streamed cache holds the chunks as written, before dtype narrowing
+            return loader.apply_dtype_schema(cleaned_data) if self.stream_chunksize else cleaned_data
+        
+        def load_clean():
+            cleaned_data = self.run_data_loading_and_cleaning()
+            if cleaned_data is None:
+                raise RuntimeError("Data loading and cleaning failed")
+            return cleaned_data
+        
+        def analysis_stage(method):
+            def run(load_clean=None):
+                # load_clean may have been skipped, leaving the SQL backend unopened
+                if self.backend == 'duckdb' and self.sql_backend is None:
+                    self.sql_backend = SQLBackend(loader.cache_file)
+                return method(load_clean)
+            return run
+        
+        def visualization(statistical_analysis, time_series_analysis, customer_product_analysis):
+            self.results.update({
+                'statistical_analysis': statistical_analysis,
+                'time_series_analysis': time_series_analysis,
+                'customer_product_analysis': customer_product_analysis
+            })
+            return self.run_visualization_generation()
+        
+        def recommendations(statistical_analysis, time_series_analysis, customer_product_analysis):
+            self.results.update({
+                'statistical_analysis': statistical_analysis,
+                'time_series_analysis': time_series_analysis,
+                'customer_product_analysis': customer_product_analysis
+            })
+            return self.run_recommendation_generation()
+        
+        def dashboard_sections(statistical_analysis, customer_product_analysis, visualization, recommendations):
+            self.results.update({
+                'statistical_analysis': statistical_analysis,
+                'customer_product_analysis': customer_product_analysis,
+                'visualization_config': visualization,
+                'recommendations': recommendations
+            })
+            return self.run_section_payloads()
+        
+        graph.add(Stage(
+            'load_clean', load_clean,
+            outputs=[loader.cache_file, 'data/cleaned_retail_data.csv',
+                     'visuals/data_quality_report.json', RESULT_ARTIFACTS['data_summary']],
+            sources=loader.partition_files() + [os.path.join(EDA_DIR, source) for source in
+                                                ['load_clean.py', 'sketches.py', 'artifacts.py']],
+            params={'cleaning_config': loader.config_hash(), 'window': loader.analysis_window(), **artifact_params},
+            load=load_cleaned
+        ))
+        
+        phase_methods = {
+            'statistical_analysis': (self.run_statistical_analysis,
+                                     ['stats.py', 'customer_facts.py', 'resampling.py', 'grouped_tests.py',
+                                      'outliers.py', 'correlation.py', 'sketches.py']),
+            'time_series_analysis': (self.run_time_series_analysis, ['time_series.py', 'chart_data.py']),
+            'customer_product_analysis': (self.run_customer_product_analysis,
+                                          ['customer_product.py', 'customer_facts.py', 'chart_data.py',
+                                           'cooccurrence.py', 'market_basket.py', 'rfm.py', 'sketches.py'])
+        }
+        for phase, (method, sources) in phase_methods.items():
+            # With the SQL backend these phases run after load_clean without loading its frame
+            frameless = self.backend == 'duckdb' and phase in BACKEND_ONLY_PHASES
+            graph.add(Stage(
+                phase, analysis_stage(method),
+                deps=[] if frameless else ['load_clean'], after=['load_clean'] if frameless else [],
+                outputs=[f'visuals/{phase}.json'] + PHASE_EXTRA_OUTPUTS.get(phase, []),
+                sources=[os.path.join(EDA_DIR, source) for source in sources + ['sql_backend.py', 'artifacts.py']],
+                params={'backend': self.backend, **artifact_params,
+                        **({'resamples': self.resampler.n_resamples} if phase == 'statistical_analysis' else {})},
+                load=load_json(f'visuals/{phase}.json')
+            ))
+        
+        graph.add(Stage(
+            'visualization', visualization, deps=analysis_deps,
+            outputs=['visuals/dashboard_config.json'],
+            sources=[os.path.join(EDA_DIR, 'visuals.py'), os.path.join(EDA_DIR, 'downsample.py'), artifact_source],
+            params={'chart_points': self.chart_points, 'downsample_method': self.downsample_method,
+                    **artifact_params},
+            load=load_json('visuals/dashboard_config.json')
+        ))
+        graph.add(Stage(
+            'recommendations', recommendations, deps=analysis_deps,
+            outputs=['recommendations/recommendations.json', 'recommendations/recommendations.md'],
+            sources=[os.path.join(EDA_DIR, 'recommend.py'), artifact_source],
+            params=artifact_params,
+            load=load_json('recommendations/recommendations.json')
+        ))
+        graph.add(Stage(
+            'dashboard_sections', dashboard_sections,
+            deps=['statistical_analysis', 'customer_product_analysis', 'visualization', 'recommendations'],
+            outputs=SectionPayloadBuilder().output_paths(),
+            sources=[os.path.join(EDA_DIR, 'sections.py'), artifact_source],
+            load=load_json(RESULT_ARTIFACTS['dashboard_sections'])
+        ))
+        
+        return graph
+    
+    def run_incremental_pipeline(self):
+        """Run the stage graph, recomputing only stages whose inputs changed."""
+        self.print_section("Incremental Pipeline")
+        
+        os.makedirs('visuals', exist_ok=True)
+        graph = self.build_stage_graph()
+        graph.run(force=self.force)
+        
+        if 'data_summary' not in self.results:
+            self.results['data_summary'] = VisualizationGenerator().load_json_file(RESULT_ARTIFACTS['data_summary'])
+        for phase in ANALYSIS_PHASES:
+            self.results[phase] = graph.value(phase)
+        self.results['visualization_config'] = graph.value('visualization')
+        self.results['recommendations'] = graph.value('recommendations')
+        self.results['dashboard_sections'] = graph.value('dashboard_sections')
+        
+        self.phase_timings.update(graph.timings)
+        self.stage_status = graph.status
+        return self.results
+    
     def generate_summary_report(self):
         """Generate final summary report."""
         self.print_section("Analysis Summary")
@@ -171,52 +531,79 @@ class EDARunner:
         print(f"💡 Recommendations generated: {summary_data.get('total_recommendations', 0)}")
         print(f"🔥 High-impact opportunities: {summary_data.get('high_impact_recommendations', 0)}")
         
-        # Save complete results
+        # Save run metadata; per-phase results are referenced by path rather than re-embedded
+        writer = ArtifactWriter()
         complete_results = {
             'analysis_metadata': {
                 'start_time': self.start_time.isoformat(),
                 'end_time': end_time.isoformat(),
                 'duration_seconds': duration.total_seconds(),
+                'execution_mode': 'incremental' if self.incremental else 'parallel' if self.parallel else 'serial',
+                'phase_timings': {phase: round(seconds, 4) for phase, seconds in self.phase_timings.items()},
+                'stage_status': self.stage_status,
+                'artifact_mode': writer.mode,
                 'version': '1.0.0'
             },
             'summary_metrics': summary_data,
-            'results': self.results
+            'artifacts': {name: path for name, path in RESULT_ARTIFACTS.items() if name in self.results}
         }
         
-        os.makedirs('visuals', exist_ok=True)
-        with open('visuals/complete_eda_results.json', 'w') as f:
-            json.dump(complete_results, f, indent=2)
+        if self.profiler:
+            complete_results['artifacts']['profile'] = self.profiler.save()
+            print("🔥 Slowest methods:")
+            for phase, call in self.profiler.hot_methods():
+                print(f"   - {phase}.{call['method']}: {call['wall_seconds']:.3f}s wall, "
+                      f"{call['cpu_seconds']:.3f}s CPU")
+        
+        writer.write(complete_results, 'visuals/complete_eda_results.json')
         
         print(f"💾 Complete results saved to visuals/complete_eda_results.json")
         
         return complete_results
     
-    def run_complete_pipeline(self):
-        """Run the complete EDA pipeline."""
-        try:
-            self.print_header()
-            
-            # 1. Data Loading and Cleaning
-            cleaned_data = self.run_data_loading_and_cleaning()
-            if cleaned_data is None:
-                return False
-            
+    def run_pipeline_stages(self):
+        """Run stages 1-7 in a fixed sequence (analysis phases optionally in parallel)."""
+        # 1. Data Loading and Cleaning
+        cleaned_data = self.timed_phase('data_loading', self.run_data_loading_and_cleaning)
+        if cleaned_data is None:
+            return False
+        
+        if self.parallel:
+            # 2-4. Statistical, Time Series and Customer & Product Analysis
+            self.run_analysis_phases_parallel()
+        else:
             # 2. Statistical Analysis
-            stats_results = self.run_statistical_analysis(cleaned_data)
+            self.timed_phase('statistical_analysis', self.run_statistical_analysis, cleaned_data)
             
             # 3. Time Series Analysis
-            ts_results = self.run_time_series_analysis(cleaned_data)
+            self.timed_phase('time_series_analysis', self.run_time_series_analysis, cleaned_data)
             
             # 4. Customer & Product Analysis
-            cp_results = self.run_customer_product_analysis(cleaned_data)
-            
-            # 5. Visualization Generation
-            viz_config = self.run_visualization_generation()
+            self.timed_phase('customer_product_analysis', self.run_customer_product_analysis, cleaned_data)
+        
+        # 5. Visualization Generation
+        self.timed_phase('visualization', self.run_visualization_generation)
+        
+        # 6. Business Recommendations
+        self.timed_phase('recommendations', self.run_recommendation_generation)
+        
+        # 7. Dashboard Section Payloads
+        self.timed_phase('dashboard_sections', self.run_section_payloads)
+        
+        return True
+    
+    def run_complete_pipeline(self):
+        """Run the complete EDA pipeline."""
+        try:
+            self.print_header()
             
-            # 6. Business Recommendations
-            recommendations = self.run_recommendation_generation()
+            if self.incremental:
+                # 1-7. Stage graph, skipping stages whose inputs are unchanged
+                self.run_incremental_pipeline()
+            elif not self.run_pipeline_stages():
+                return False
             
-            # 7. Summary Report
+            # 8. Summary Report
             summary_report = self.generate_summary_report()
             
             print("\n" + "="*60)
@@ -225,10 +612,14 @@ class EDARunner:
             print("\n📁 Output Files Generated:")
             print("   - data/cleaned_retail_data.csv")
             print("   - visuals/data_quality_report.json")
+            print("   - visuals/data_summary.json")
             print("   - visuals/statistical_analysis.json")
+            print("   - visuals/outlier_index.npz (flagged Transaction_IDs)")
             print("   - visuals/time_series_analysis.json")
             print("   - visuals/customer_product_analysis.json")
+            print(f"   - {scores_path('visuals')} (per-customer RFM scores)")
             print("   - visuals/dashboard_config.json")
+            print("   - visuals/sections/*.json.gz (per-section dashboard payloads)")
             print("   - visuals/complete_eda_results.json")
             print("   - recommendations/recommendations.json")
             print("   - recommendations/recommendations.md")
@@ -255,9 +646,63 @@ class EDARunner:
             import traceback
             traceback.print_exc()
             return False
+        
+        finally:
+            self.close_backend()
 
 if __name__ == "__main__":
-    runner = EDARunner()
+    parser = argparse.ArgumentParser(description="Run the retail sales EDA pipeline.")
+    parser.add_argument('--parallel', action='store_true',
+                        help='run the statistical, time series and customer/product phases in a process pool')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='maximum number of worker processes in parallel mode')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='ignore the cleaned-data cache and re-clean the raw file')
+    parser.add_argument('--incremental', action='store_true',
+                        help='run the stage graph and skip stages whose inputs are unchanged')
+    parser.add_argument('--force', action='store_true',
+                        help='with --incremental, recompute every stage')
+    parser.add_argument('--data', default='data/retail_sales_dataset.csv',
+                        help='CSV/Parquet file, directory of partitions or glob pattern to analyze')
+    parser.add_argument('--start-date', default=None,
+                        help='first day of the analysis window (partitions outside it are not read)')
+    parser.add_argument('--end-date', default=None,
+                        help='last day of the analysis window (inclusive)')
+    parser.add_argument('--stream', type=int, nargs='?', const=100_000, default=None, metavar='ROWS',
+                        help='validate, clean and summarize the data in chunks of ROWS rows (default 100000) '
+                             'into the cache instead of in memory')
+    parser.add_argument('--read-workers', type=int, default=None,
+                        help='number of threads used to read partition files')
+    parser.add_argument('--profile', action='store_true',
+                        help='record wall time, CPU time, peak RSS and rows for every analyzer method in visuals/profile.json')
+    parser.add_argument('--profile-dump', choices=SAMPLERS, default=None,
+                        help='also write a cProfile or pyinstrument dump per phase to visuals/profiles/ (implies --profile)')
+    parser.add_argument('--chart-points', type=int, default=500,
+                        help='points in the coarsest level of downsampled time-series charts')
+    parser.add_argument('--downsample', choices=Downsampler.METHODS, default='lttb',
+                        help='downsampling method for long time-series charts')
+    parser.add_argument('--backend', choices=BACKENDS, default='pandas',
+                        help='engine for customer facts, time series and demographic aggregations '
+                             '(duckdb scans the Parquet cache out-of-core)')
+    parser.add_argument('--resamples', type=int, default=2000,
+                        help='bootstrap and permutation resamples per hypothesis test')
+    parser.add_argument('--resample-workers', type=int, default=None,
+                        help='worker processes for resampling (results do not depend on it)')
+    parser.add_argument('--compact', action='store_true',
+                        help='write compact (non-indented) JSON artifacts with the fastest available encoder')
+    args = parser.parse_args()
+    
+    if args.compact:
+        # Set in the environment so parallel worker processes write the same format
+        os.environ[ARTIFACT_MODE_ENV] = 'compact'
+    
+    runner = EDARunner(use_cache=not args.no_cache, parallel=args.parallel, max_workers=args.workers,
+                       incremental=args.incremental, force=args.force, data_path=args.data,
+                       start_date=args.start_date, end_date=args.end_date, read_workers=args.read_workers,
+                       profile=args.profile, profile_sampler=args.profile_dump,
+                       chart_points=args.chart_points, downsample_method=args.downsample,
+                       backend=args.backend, resamples=args.resamples,
+                       resample_workers=args.resample_workers, stream_chunksize=args.stream)
     success = runner.run_complete_pipeline()
     
     if success:
@@ -0,0 +1,190 @@
+"""
+Dashboard Sections Module
+Splits the dashboard data into small per-section payloads, written as
+compact JSON with gzip (and brotli, when available) compressed copies.
+"""
+
+import gzip
+import hashlib
+import os
+from datetime import datetime
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip payloads are always written
+    brotli = None
+
+from artifacts import ArtifactWriter
+
+# Dashboard section -> charts from dashboard_config.json it renders
+SECTION_CHARTS = {
+    'overview': ['daily_revenue', 'customer_segments', 'category_performance', 'weekly_patterns'],
+    'revenue': ['monthly_revenue', 'seasonal_analysis'],
+    'customers': ['customer_segments', 'gender_analysis'],
+    'products': ['category_performance', 'market_share'],
+    'insights': []
+}
+
+DEFAULT_SECTION = 'overview'
+
+# Charts whose finer resolution levels are left out of the section payloads
+# and written to files of their own, fetched when a narrower range needs them
+LAZY_RESOLUTION_CHARTS = ['daily_revenue']
+
+def _pick(data, *path):
+    """Value at a nested key path, or None when any level is missing."""
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+def _nest(value, *path):
+    """{path[0]: {path[1]: ... value}}, or an empty dict when value is None."""
+    if value is None:
+        return {}
+    for key in reversed(path):
+        value = {key: value}
+    return value
+
+def _coarsest_only(chart):
+    """
+    The chart without the series of its resolution levels.
+
+    The chart data already is the coarsest level, so every level keeps
+    only its point count; the dashboard fetches the finer ones on demand.
+    """
+    return {**chart, 'resolutions': [{'points': level['points']} for level in chart['resolutions']]}
+
+class SectionPayloadBuilder:
+    """
+    Pre-aggregated payloads for each dashboard section.
+
+    Each payload keeps the key layout the dashboard renderers already read
+    (charts, kpis, statistical_analysis.descriptive..., customer_product_analysis...)
+    but holds only the values that section draws, so the dashboard can
+    fetch the overview for first paint and every other section when it is
+    opened, instead of downloading every analysis file up front. The finer
+    resolution levels of long series (LAZY_RESOLUTION_CHARTS) get one file
+    per level, so first paint only carries the coarsest one.
+    """
+
+    def __init__(self, output_dir='visuals/sections', compresslevel=9):
+        self.output_dir = output_dir
+        self.compresslevel = compresslevel
+        self.writer = ArtifactWriter(mode='compact')
+
+    def build(self, viz_config=None, stats_data=None, cp_data=None, recommendations=None):
+        """Build the payload of every section from the analysis results."""
+        viz_config = viz_config or {}
+        charts = viz_config.get('charts', {})
+        payloads = {}
+
+        for section, chart_names in SECTION_CHARTS.items():
+            payloads[section] = {
+                'timestamp': viz_config.get('timestamp'),
+                'charts': {name: _coarsest_only(charts[name])
+                           if name in LAZY_RESOLUTION_CHARTS and 'resolutions' in charts[name] else charts[name]
+                           for name in chart_names if name in charts}
+            }
+
+        payloads['overview']['kpis'] = viz_config.get('kpis', [])
+
+        quartiles = _pick(stats_data, 'descriptive', 'Total_Amount')
+        if quartiles:
+            quartiles = {key: quartiles.get(key) for key in ('min', 'q1', 'median', 'q3', 'max')}
+        payloads['revenue'].update(_nest(quartiles, 'statistical_analysis', 'descriptive', 'Total_Amount'))
+
+        behavior = _pick(cp_data, 'customer_behavior') or {}
+        payloads['customers']['customer_product_analysis'] = {
+            'purchase_patterns': {
+                'quantity_distribution': _pick(cp_data, 'purchase_patterns', 'quantity_distribution')
+            },
+            'customer_behavior': {
+                'clv_segments': behavior.get('clv_segments'),
+                'top_customers': behavior.get('top_customers')
+            },
+            'rfm': {
+                'segments': _pick(cp_data, 'rfm', 'segments')
+            }
+        }
+
+        payloads['products']['customer_product_analysis'] = {
+            'purchase_patterns': {
+                'price_preferences': _pick(cp_data, 'purchase_patterns', 'price_preferences')
+            },
+            'customer_product_matrix': {
+                'cross_selling_opportunities': _pick(cp_data, 'customer_product_matrix',
+                                                     'cross_selling_opportunities')
+            }
+        }
+
+        payloads['insights']['insights'] = viz_config.get('insights', [])
+        payloads['insights'].update(_nest(_pick(recommendations, 'action_plan'), 'recommendations', 'action_plan'))
+
+        return payloads
+
+    def resolution_levels(self, viz_config=None):
+        """Finer resolution levels of each lazily loaded chart, as {chart: [level, ...]}."""
+        charts = (viz_config or {}).get('charts', {})
+        return {name: charts[name]['resolutions'][1:] for name in LAZY_RESOLUTION_CHARTS
+                if 'resolutions' in charts.get(name, {})}
+
+    def output_paths(self):
+        """
+        Every section file write() produces, for declaring pipeline stage outputs.
+
+        The number of resolution level files depends on the series length,
+        so they are left out; the manifest records a version of each.
+        """
+        suffixes = ['.json', '.json.gz'] + (['.json.br'] if brotli is not None else [])
+        paths = [os.path.join(self.output_dir, section + suffix)
+                 for section in SECTION_CHARTS for suffix in suffixes]
+        return paths + [os.path.join(self.output_dir, 'manifest.json')]
+
+    def _write_bytes(self, data, filename):
+        with open(os.path.join(self.output_dir, filename), 'wb') as f:
+            f.write(data)
+        return filename
+
+    def _write_payload(self, payload, name):
+        """Write one payload plain and compressed and return its manifest entry."""
+        body = b''.join(self.writer.iter_chunks(payload))
+        # mtime=0 keeps the gzip bytes identical for identical payloads
+        compressed = gzip.compress(body, compresslevel=self.compresslevel, mtime=0)
+        entry = {
+            'json': self._write_bytes(body, f'{name}.json'),
+            'gzip': self._write_bytes(compressed, f'{name}.json.gz'),
+            'brotli': None,
+            'bytes': len(body),
+            'gzip_bytes': len(compressed),
+            'version': hashlib.sha256(body).hexdigest()[:16]
+        }
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            entry['brotli'] = self._write_bytes(compressed, f'{name}.json.br')
+            entry['brotli_bytes'] = len(compressed)
+        return entry
+
+    def write(self, payloads, resolutions=None):
+        """
+        Write each payload plain and compressed, plus a manifest, and return the manifest.
+
+        resolutions (from resolution_levels()) are written one file per
+        level, as <chart>.r<level>.json, and listed per chart in the
+        manifest, finest last.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest = {
+            'generated': datetime.now().isoformat(),
+            'default_section': DEFAULT_SECTION,
+            'sections': {section: self._write_payload(payload, section) for section, payload in payloads.items()},
+            'resolutions': {chart: [self._write_payload(level, f'{chart}.r{index}')
+                                    for index, level in enumerate(levels, start=1)]
+                            for chart, levels in (resolutions or {}).items()}
+        }
+
+        self.writer.write(manifest, os.path.join(self.output_dir, 'manifest.json'))
+        sizes = ', '.join(f"{name} {entry['gzip_bytes']:,} B" for name, entry in manifest['sections'].items())
+        print(f"✓ Dashboard section payloads saved to {self.output_dir}/ ({sizes} gzipped)")
+        return manifest
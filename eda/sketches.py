@@ -0,0 +1,486 @@
+"""
+Streaming Sketches Module
+Mergeable single-pass summaries for computing statistics over chunks or
+partitions of data and combining them afterwards.
+"""
+
+import numpy as np
+import pandas as pd
+
+class MomentsAccumulator:
+    """
+    Count, mean, central moments (up to 4th), min and max.
+
+    Each update folds a batch in with the pairwise merge formulas of Chan et
+    al. / Pébay, so accumulators built on separate chunks can be merged and
+    give the same result (up to floating point rounding) as one pass over
+    the concatenated data.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Fold a batch of values (NaNs ignored) into the accumulator."""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+
+        batch = MomentsAccumulator()
+        batch.n = values.size
+        batch.mean = float(values.mean())
+        deviations = values - batch.mean
+        squared = deviations * deviations
+        batch.m2 = float(squared.sum())
+        batch.m3 = float((squared * deviations).sum())
+        batch.m4 = float((squared * squared).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+
+        return self.merge(batch)
+
+    def merge(self, other):
+        """Combine another accumulator into this one."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        na, nb = self.n, other.n
+        n = na + nb
+        delta = other.mean - self.mean
+        delta_n = delta / n
+
+        m2 = self.m2 + other.m2 + delta * delta_n * na * nb
+        m3 = (self.m3 + other.m3
+              + delta * delta_n * delta_n * na * nb * (na - nb)
+              + 3 * delta_n * (na * other.m2 - nb * self.m2))
+        m4 = (self.m4 + other.m4
+              + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+              + 6 * delta_n * delta_n * (na * na * other.m2 + nb * nb * self.m2)
+              + 4 * delta_n * (na * other.m3 - nb * self.m3))
+
+        self.mean += delta_n * nb
+        self.n, self.m2, self.m3, self.m4 = n, m2, m3, m4
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self):
+        """Sample variance (ddof=1)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else float('nan')
+
+    def std(self):
+        """Sample standard deviation (ddof=1)."""
+        return float(np.sqrt(self.variance()))
+
+    def skewness(self):
+        """Adjusted Fisher-Pearson skewness, as returned by Series.skew()."""
+        n = self.n
+        if n < 3:
+            return float('nan')
+        if self.m2 == 0:
+            return 0.0
+        g1 = (self.m3 / n) / (self.m2 / n) ** 1.5
+        return float(np.sqrt(n * (n - 1)) / (n - 2) * g1)
+
+    def kurtosis(self):
+        """Bias-corrected excess kurtosis, as returned by Series.kurtosis()."""
+        n = self.n
+        if n < 4:
+            return float('nan')
+        if self.m2 == 0:
+            return 0.0
+        ratio = (self.m4 / n) / (self.m2 / n) ** 2
+        return float(((n + 1) * (n - 1) * ratio - 3 * (n - 1) ** 2) / ((n - 2) * (n - 3)))
+
+class CoMomentAccumulator:
+    """
+    Count, column means and co-moment matrix of a set of columns.
+
+    The multivariate form of MomentsAccumulator's merge: co-moments of
+    separate batches combine through the difference of their means, so the
+    covariance and Pearson correlation matrices of chunked data match a
+    single pass (up to floating point rounding). Rows are expected to be
+    complete (no NaNs).
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.n = 0
+        self.mean = np.zeros(len(self.columns))
+        self.comoment = np.zeros((len(self.columns), len(self.columns)))
+
+    def update(self, matrix):
+        """Fold a (rows, columns) batch into the accumulator."""
+        matrix = np.asarray(matrix, dtype='float64')
+        if matrix.shape[0] == 0:
+            return self
+
+        batch = CoMomentAccumulator(self.columns)
+        batch.n = matrix.shape[0]
+        batch.mean = matrix.mean(axis=0)
+        deviations = matrix - batch.mean
+        batch.comoment = deviations.T @ deviations
+
+        return self.merge(batch)
+
+    def merge(self, other):
+        """Combine another accumulator over the same columns into this one."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.comoment = other.n, other.mean.copy(), other.comoment.copy()
+            return self
+
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * self.n * other.n / n
+        self.mean = self.mean + delta * other.n / n
+        self.n = n
+        return self
+
+    def covariance(self):
+        """Sample covariance matrix (ddof=1)."""
+        return self.comoment / (self.n - 1) if self.n > 1 else np.full_like(self.comoment, np.nan)
+
+    def correlation(self):
+        """Pearson correlation matrix; NaN for constant columns."""
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = self.comoment / np.outer(scale, scale)
+        return np.clip(correlation, -1.0, 1.0)
+
+class QuantileSketch:
+    """
+    KLL-style quantile sketch with equal-capacity compactors.
+
+    Items live in levels; an item at level h stands for 2**h original
+    values. When a level holds at least `capacity` items it is sorted and
+    every other item (random offset) is promoted to the next level.
+
+    Error bound: each compaction at level h moves the rank of any query by
+    at most 2**h, and a level is compacted at most n / (capacity * 2**h)
+    times, so the worst-case rank error is H * n / capacity, where H is the
+    number of levels that were compacted (about log2(n / capacity)). With
+    random offsets the errors cancel and the expected error is far lower,
+    around sqrt(H) * n / capacity. Until the first compaction the sketch
+    holds every value and quantiles are exact, using linear interpolation
+    like Series.quantile().
+    """
+
+    def __init__(self, capacity=2048, seed=0):
+        self.capacity = capacity
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.rng = np.random.default_rng(seed)
+        # Sorted retained items and cumulative weights, kept until the next update or merge
+        self._sorted = None
+
+    def update(self, values):
+        """Add a batch of values (NaNs ignored)."""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += values.size
+            self._compress()
+            self._sorted = None
+        return self
+
+    def merge(self, other):
+        """Combine another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for height, items in enumerate(other.levels):
+            self.levels[height] = np.concatenate([self.levels[height], items])
+        self.n += other.n
+        self._compress()
+        self._sorted = None
+        return self
+
+    def _compress(self):
+        """Compact every level that has reached capacity."""
+        height = 0
+        while height < len(self.levels):
+            items = self.levels[height]
+            if items.size >= self.capacity:
+                items = np.sort(items)
+                # An odd item out stays at this level uncompacted
+                keep = items[-1:] if items.size % 2 else items[:0]
+                paired = items[:items.size - keep.size]
+                promoted = paired[self.rng.integers(2)::2]
+
+                self.levels[height] = keep
+                if height + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[height + 1] = np.concatenate([self.levels[height + 1], promoted])
+            height += 1
+
+    @property
+    def is_exact(self):
+        """True while no compaction has happened and all values are retained."""
+        return len(self.levels) == 1
+
+    def rank_error_bound(self):
+        """Worst-case rank error as a fraction of n (0 while exact)."""
+        compacted_levels = len(self.levels) - 1
+        return compacted_levels / self.capacity
+
+    def quantile(self, q):
+        """Estimate the q-quantile (0 <= q <= 1)."""
+        if self.n == 0:
+            return float('nan')
+        if self.is_exact:
+            return float(np.quantile(self.levels[0], q))
+
+        items, cumulative = self._weighted_items()
+        index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(items[min(index, items.size - 1)])
+
+    def _weighted_items(self, transform=None):
+        """
+        Retained items (optionally transformed) in sorted order with their cumulative weights.
+
+        The untransformed result is cached, so repeated quantile() and cdf()
+        calls between updates sort the items only once.
+        """
+        if transform is None and self._sorted is not None:
+            return self._sorted
+        items = np.concatenate(self.levels)
+        if transform is not None:
+            items = transform(items)
+        weights = np.concatenate([np.full(level.size, 2 ** height, dtype='float64')
+                                  for height, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        result = items[order], np.cumsum(weights[order])
+        if transform is None:
+            self._sorted = result
+        return result
+
+    def deviation_median(self, center):
+        """Estimate the median absolute deviation from center (the MAD when center is the median)."""
+        if self.n == 0:
+            return float('nan')
+        if self.is_exact:
+            return float(np.median(np.abs(self.levels[0] - center)))
+
+        deviations, cumulative = self._weighted_items(lambda items: np.abs(items - center))
+        index = np.searchsorted(cumulative, 0.5 * cumulative[-1], side='left')
+        return float(deviations[min(index, deviations.size - 1)])
+
+    def cdf(self, values, strict=False):
+        """
+        Estimated fraction of values <= each of `values` (< when strict).
+
+        Exact while the sketch is exact; afterwards within the same rank
+        error as quantile().
+        """
+        values = np.asarray(values, dtype='float64')
+        if self.n == 0:
+            return np.full(values.shape, np.nan)
+        items, cumulative = self._weighted_items()
+        position = np.searchsorted(items, values, side='left' if strict else 'right')
+        below = np.where(position > 0, cumulative[np.maximum(position - 1, 0)], 0.0)
+        return below / cumulative[-1]
+
+class FrequencySketch:
+    """
+    Misra-Gries heavy-hitter counter used to find the mode.
+
+    Counts are exact while the number of distinct values stays within
+    `capacity`; beyond that, any value occurring more than n / capacity
+    times is guaranteed to be kept, with its count underestimated by at
+    most n / capacity.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.reduced = False
+
+    def update(self, values):
+        """Count a batch of values (NaNs ignored)."""
+        counts = pd.Series(values).dropna().value_counts()
+        return self._combine(counts)
+
+    def merge(self, other):
+        """Combine another frequency sketch into this one."""
+        self.reduced = self.reduced or other.reduced
+        return self._combine(other.counts)
+
+    def _combine(self, counts):
+        self.counts = self.counts.add(counts, fill_value=0).astype('int64')
+        if len(self.counts) > self.capacity:
+            threshold = self.counts.nlargest(self.capacity + 1).iloc[-1]
+            self.counts = self.counts[self.counts > threshold] - threshold
+            self.reduced = True
+        return self
+
+    def mode(self):
+        """Most frequent value; ties resolve to the smallest value, like Series.mode()."""
+        if self.counts.empty:
+            return None
+        top = self.counts[self.counts == self.counts.max()]
+        return top.index.min()
+
+class DistinctCountSketch:
+    """
+    HyperLogLog distinct-value counter.
+
+    Values are hashed to 64 bits; the first `precision` bits pick one of
+    2 ** precision registers, and each register keeps the largest rank
+    (position of the first set bit) seen in the remaining bits. Until
+    `capacity` distinct hashes have been seen they are kept as they are
+    and the count is exact; after that only the registers are kept (2 **
+    precision bytes) and the relative standard error is
+    1.04 / sqrt(2 ** precision), 0.8% at the default precision. Sketches
+    with the same precision merge by taking the register-wise maximum.
+    """
+
+    def __init__(self, precision=14, capacity=4096):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.capacity = capacity
+        self.hashes = np.empty(0, dtype='uint64')
+        self.registers = None
+
+    @property
+    def is_exact(self):
+        """True while every distinct hash is still kept."""
+        return self.registers is None
+
+    def update(self, values):
+        """Count a batch of values (NaNs ignored)."""
+        values = pd.Series(values).dropna()
+        return self._add(np.unique(pd.util.hash_pandas_object(values, index=False).to_numpy()))
+
+    def merge(self, other):
+        """Combine another distinct counter into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Only sketches with the same precision can be merged")
+        if other.registers is None:
+            return self._add(other.hashes)
+        if self.registers is None:
+            hashes, self.hashes = self.hashes, np.empty(0, dtype='uint64')
+            self.registers = other.registers.copy()
+            return self._add(hashes)
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def _add(self, hashes):
+        if self.registers is None:
+            self.hashes = np.union1d(self.hashes, hashes)
+            if len(self.hashes) <= self.capacity:
+                return self
+            hashes, self.hashes = self.hashes, np.empty(0, dtype='uint64')
+            self.registers = np.zeros(1 << self.precision, dtype='uint8')
+
+        index = (hashes >> np.uint64(64 - self.precision)).astype('int64')
+        rest = hashes << np.uint64(self.precision)
+        # Bit length of rest; the float conversion can round up to the next power of two
+        bits = np.minimum(np.frexp(rest.astype('float64'))[1], 64).astype('int64')
+        bits -= ((rest >> np.maximum(bits - 1, 0).astype('uint64')) == 0) & (rest > 0)
+        ranks = np.minimum(65 - bits, 65 - self.precision).astype('uint8')
+        np.maximum.at(self.registers, index, ranks)
+        return self
+
+    def count(self):
+        """Number of distinct values, estimated once the sketch is past capacity."""
+        if self.registers is None:
+            return len(self.hashes)
+
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.ldexp(1.0, -self.registers.astype('int64')).sum()
+        # Linear counting is more accurate while many registers are still empty
+        empty = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and empty:
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+    def relative_error(self):
+        """Relative standard error of count(): 0 while exact."""
+        return 0.0 if self.registers is None else 1.04 / np.sqrt(len(self.registers))
+
+def _column_statistics(moments, median, q1, q3, mode, rank_error):
+    """Descriptive statistics in the layout used by statistical_analysis.json."""
+    return {
+        'count': int(moments.n),
+        'mean': float(moments.mean),
+        'median': float(median),
+        'mode': float(mode) if mode is not None else None,
+        'std': float(moments.std()),
+        'variance': float(moments.variance()),
+        'min': float(moments.min),
+        'max': float(moments.max),
+        'q1': float(q1),
+        'q3': float(q3),
+        'iqr': float(q3 - q1),
+        'skewness': float(moments.skewness()),
+        'kurtosis': float(moments.kurtosis()),
+        'quantile_rank_error': float(rank_error)
+    }
+
+class ColumnSummary:
+    """
+    Mergeable descriptive statistics for one numeric column.
+
+    Produces the same fields as StatisticalAnalyzer.descriptive_statistics;
+    median and quartiles come from the QuantileSketch and carry its error
+    bound once the column is larger than the sketch capacity. A column
+    that is already in memory is better served by describe(), which is
+    exact.
+    """
+
+    def __init__(self, capacity=2048, seed=0):
+        self.moments = MomentsAccumulator()
+        self.quantiles = QuantileSketch(capacity=capacity, seed=seed)
+        self.frequencies = FrequencySketch()
+
+    def update(self, values):
+        """Fold a chunk of the column into the summary."""
+        values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64')
+        self.moments.update(values)
+        self.quantiles.update(values)
+        self.frequencies.update(values)
+        return self
+
+    def merge(self, other):
+        """Combine a summary built on another chunk or partition."""
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.frequencies.merge(other.frequencies)
+        return self
+
+    def to_dict(self):
+        """Descriptive statistics in the layout used by statistical_analysis.json."""
+        return _column_statistics(self.moments, self.quantiles.quantile(0.5), self.quantiles.quantile(0.25),
+                                  self.quantiles.quantile(0.75), self.frequencies.mode(),
+                                  self.quantiles.rank_error_bound())
+
+    @staticmethod
+    def describe(values):
+        """
+        Exact statistics of a whole column, in the layout of to_dict().
+
+        Quartiles are linearly interpolated like Series.quantile() and
+        ties for the mode resolve to the smallest value, like Series.mode().
+        """
+        values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64')
+        values = values[~np.isnan(values)]
+        moments = MomentsAccumulator().update(values)
+        if values.size == 0:
+            return _column_statistics(moments, np.nan, np.nan, np.nan, None, 0.0)
+
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        distinct, counts = np.unique(values, return_counts=True)
+        return _column_statistics(moments, median, q1, q3, distinct[np.argmax(counts)], 0.0)
@@ -0,0 +1,200 @@
+"""
+SQL Backend Module
+Pushes the analyzers' heaviest aggregations down to DuckDB, which scans the
+Parquet cache of the cleaned data out-of-core with multi-threaded scans.
+"""
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # duckdb is optional; the pandas backend is the default
+    duckdb = None
+
+from load_clean import DataLoader
+from time_series import TimeSeriesAggregates, MONTH_SEASONS
+
+BACKENDS = ('pandas', 'duckdb')
+
+# Same mapping as MONTH_SEASONS, as a SQL expression over the month number
+SEASON_SQL = 'CASE ' + ' '.join(
+    f"WHEN month(Date) = {month} THEN '{season}'" for month, season in enumerate(MONTH_SEASONS) if season
+) + ' END'
+
+def _sql_string(value):
+    """A SQL string literal, for statements that cannot take prepared parameters."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+class SQLBackend:
+    """
+    Aggregations over the cleaned Parquet data, computed by DuckDB.
+
+    The Parquet file (or list/glob of files) is exposed as a
+    `transactions` view and never loaded into pandas; only the grouped
+    results are, so their size depends on the number of customers, days
+    and categories rather than on the number of transactions. memory_limit
+    caps DuckDB's memory (larger intermediates spill to temp_directory)
+    and threads sets the scan parallelism (default: all cores).
+
+    Each method returns the same table the matching pandas code builds, so
+    the analyzers format their results identically with either backend.
+    """
+
+    def __init__(self, source, threads=None, memory_limit=None, temp_directory=None):
+        if duckdb is None:
+            raise ImportError("duckdb is required for the SQL backend: pip install duckdb")
+        sources = source if isinstance(source, (list, tuple)) else [source]
+        if not all(str(path).endswith('.parquet') for path in sources):
+            raise ValueError("The SQL backend reads Parquet files; install pyarrow so the cleaned-data cache is Parquet")
+
+        self.source = source
+        self.connection = duckdb.connect()
+        if threads:
+            self.connection.execute(f"SET threads = {int(threads)}")
+        if memory_limit:
+            self.connection.execute(f"SET memory_limit = {_sql_string(memory_limit)}")
+        if temp_directory:
+            self.connection.execute(f"SET temp_directory = {_sql_string(temp_directory)}")
+        files = ', '.join(_sql_string(path) for path in sources)
+        self.connection.execute(f"CREATE VIEW transactions AS SELECT * FROM read_parquet([{files}])")
+
+    def query(self, sql, params=None):
+        """Run a query against the transactions view and return a DataFrame."""
+        return self.connection.execute(sql, params or []).df()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def row_count(self):
+        return int(self.connection.execute("SELECT count(*) FROM transactions").fetchone()[0])
+
+    def customer_facts(self):
+        """The CustomerFactTable table: per-customer spend, volume, dates and category breadth."""
+        facts = self.query("""
+            SELECT CAST(Customer_ID AS VARCHAR) AS Customer_ID,
+                   sum(Total_Amount) AS total_spent,
+                   avg(Total_Amount) AS avg_transaction,
+                   count(Total_Amount) AS transaction_count,
+                   sum(Quantity) AS total_quantity,
+                   min(Date) AS first_purchase,
+                   max(Date) AS last_purchase,
+                   count(DISTINCT Product_Category) AS categories_purchased
+            FROM transactions
+            WHERE Customer_ID IS NOT NULL
+            GROUP BY 1
+            ORDER BY 1
+        """).set_index('Customer_ID')
+
+        for col in ['first_purchase', 'last_purchase']:
+            facts[col] = facts[col].astype('datetime64[ns]')
+        for col in ['transaction_count', 'total_quantity', 'categories_purchased']:
+            facts[col] = facts[col].astype('int64')
+
+        facts = facts.round({'total_spent': 2, 'avg_transaction': 2})
+        print(f"✓ Customer fact table built in DuckDB: {len(facts)} customers")
+        return facts
+
+    def _cent_sums(self, key_sql, key_name, quantity=True):
+        """Revenue in cents, transaction count and (optionally) quantity per key."""
+        quantity_sql = ', sum(Quantity) AS total_quantity' if quantity else ''
+        return self.query(f"""
+            SELECT {key_sql} AS {key_name},
+                   sum(CAST(round(Total_Amount * 100) AS BIGINT)) AS revenue_cents,
+                   count(*) AS transaction_count{quantity_sql}
+            FROM transactions
+            GROUP BY 1
+            ORDER BY 1
+        """).set_index(key_name)
+
+    def time_series_aggregates(self):
+        """TimeSeriesAggregates for the whole history, grouped in DuckDB."""
+        daily = self.query("""
+            SELECT Date,
+                   sum(CAST(round(Total_Amount * 100) AS BIGINT)) AS revenue_cents,
+                   count(*) AS transaction_count,
+                   sum(Quantity) AS total_quantity,
+                   count(DISTINCT Customer_ID) AS unique_customers
+            FROM transactions
+            GROUP BY Date
+            ORDER BY Date
+        """).set_index('Date')
+
+        monthly_customers = {}
+        pairs = self.query("""
+            SELECT DISTINCT year(Date) * 100 + month(Date) AS period, CAST(Customer_ID AS VARCHAR) AS customer
+            FROM transactions
+        """)
+        for period, customers in pairs.groupby('period')['customer']:
+            monthly_customers[int(period)] = set(customers)
+
+        aggregates = TimeSeriesAggregates.from_tables(
+            daily,
+            self._cent_sums('isodow(Date) - 1', 'day_of_week'),
+            self._cent_sums('weekofyear(Date)', 'week_number', quantity=False),
+            self._cent_sums('year(Date) * 100 + month(Date)', 'period'),
+            self._cent_sums(SEASON_SQL, 'season'),
+            monthly_customers
+        )
+        print(f"✓ Time series aggregates built in DuckDB: {len(aggregates.daily)} days")
+        return aggregates
+
+    def demographic_tables(self):
+        """
+        Gender and age group summaries and gender x category revenue.
+
+        Matches CustomerProductAnalyzer's pandas tables: age groups come in
+        their configured order, and the top category per gender breaks
+        count ties in category order.
+        """
+        gender = self.query("""
+            WITH by_gender AS (
+                SELECT CAST(Gender AS VARCHAR) AS Gender,
+                       sum(Total_Amount) AS total_spent,
+                       avg(Total_Amount) AS avg_transaction,
+                       count(Total_Amount) AS transaction_count,
+                       count(DISTINCT Customer_ID) AS unique_customers
+                FROM transactions
+                WHERE Gender IS NOT NULL
+                GROUP BY 1
+            ), ranked AS (
+                SELECT CAST(Gender AS VARCHAR) AS Gender, CAST(Product_Category AS VARCHAR) AS top_category,
+                       row_number() OVER (PARTITION BY Gender ORDER BY count(*) DESC, CAST(Product_Category AS VARCHAR)) AS position
+                FROM transactions
+                WHERE Gender IS NOT NULL AND Product_Category IS NOT NULL
+                GROUP BY Gender, Product_Category
+            )
+            SELECT by_gender.*, ranked.top_category
+            FROM by_gender JOIN ranked ON by_gender.Gender = ranked.Gender AND ranked.position = 1
+            ORDER BY Gender
+        """).set_index('Gender').round(2)
+
+        age = self.query("""
+            SELECT CAST(Age_Group AS VARCHAR) AS Age_Group,
+                   sum(Total_Amount) AS total_spent,
+                   avg(Total_Amount) AS avg_transaction,
+                   count(Total_Amount) AS transaction_count,
+                   count(DISTINCT Customer_ID) AS unique_customers
+            FROM transactions
+            WHERE Age_Group IS NOT NULL
+            GROUP BY 1
+        """).set_index('Age_Group').round(2)
+        # Observed groups in the configured label order, as the categorical groupby returns them
+        labels = [label for label in DataLoader.CLEANING_CONFIG['age_labels'] if label in age.index]
+        age = age.reindex(pd.Index(labels, name='Age_Group'))
+
+        gender_category = self.query("""
+            SELECT CAST(Gender AS VARCHAR) AS Gender, CAST(Product_Category AS VARCHAR) AS Product_Category,
+                   sum(Total_Amount) AS Total_Amount
+            FROM transactions
+            WHERE Gender IS NOT NULL AND Product_Category IS NOT NULL
+            GROUP BY 1, 2
+            ORDER BY 1, 2
+        """).set_index(['Gender', 'Product_Category'])[['Total_Amount']].unstack(fill_value=0)
+
+        return gender, age, gender_category
@@ -6,67 +6,96 @@ Provides comprehensive statistical analysis of retail sales data.
 import pandas as pd
 import numpy as np
 from scipy import stats
-import json
+import functools
 import os
 
+from customer_facts import CustomerFactTable
+from correlation import CorrelationEngine
+from sketches import ColumnSummary
+from artifacts import ArtifactWriter
+from grouped_tests import GroupedTestRunner
+from outliers import OutlierEngine
+from resampling import GroupedSample, ResamplingEngine, mean_difference, eta_squared, correlation
+
 class StatisticalAnalyzer:
     """
     Performs statistical analysis on retail sales data.
     """
     
-    def __init__(self, df):
+    def __init__(self, df, customer_facts=None, resampler=None):
         self.df = df
+        self.customer_facts = customer_facts
+        self.resampler = resampler or ResamplingEngine()
+        self.outlier_engine = None
         self.stats_results = {}
     
-    def descriptive_statistics(self):
-        """Generate comprehensive descriptive statistics."""
-        numeric_cols = ['Age', 'Quantity', 'Price_per_Unit', 'Total_Amount']
-        
-        stats_summary = {}
+    def descriptive_statistics(self, numeric_cols=('Age', 'Quantity', 'Price_per_Unit', 'Total_Amount')):
+        """
+        Generate comprehensive descriptive statistics.
         
-        for col in numeric_cols:
-            if col in self.df.columns:
-                stats_summary[col] = {
-                    'count': int(self.df[col].count()),
-                    'mean': float(self.df[col].mean()),
-                    'median': float(self.df[col].median()),
-                    'mode': float(self.df[col].mode().iloc[0]) if not self.df[col].mode().empty else None,
-                    'std': float(self.df[col].std()),
-                    'variance': float(self.df[col].var()),
-                    'min': float(self.df[col].min()),
-                    'max': float(self.df[col].max()),
-                    'q1': float(self.df[col].quantile(0.25)),
-                    'q3': float(self.df[col].quantile(0.75)),
-                    'iqr': float(self.df[col].quantile(0.75) - self.df[col].quantile(0.25)),
-                    'skewness': float(self.df[col].skew()),
-                    'kurtosis': float(self.df[col].kurtosis())
-                }
+        The frame is in memory, so quantiles and modes are exact; the
+        sketches of summarize_chunks() are only needed for chunked input.
+        """
+        stats_summary = {col: ColumnSummary.describe(self.df[col]) for col in numeric_cols if col in self.df.columns}
         
         self.stats_results['descriptive'] = stats_summary
         return stats_summary
     
+    @staticmethod
+    def summarize_chunks(chunks, numeric_cols=('Age', 'Quantity', 'Price_per_Unit', 'Total_Amount')):
+        """
+        Descriptive statistics over an iterable of data chunks in a single pass.
+        
+        Each column is folded into a mergeable ColumnSummary (moments, quantile
+        sketch and mode counter), so chunks from DataLoader.iter_clean_chunks()
+        or separate partitions never need to be in memory together. Quantiles
+        are exact until a column exceeds the sketch capacity; after that
+        'quantile_rank_error' reports the worst-case rank error.
+        """
+        summaries = {}
+        
+        for chunk in chunks:
+            for col in numeric_cols:
+                if col in chunk.columns:
+                    summaries.setdefault(col, ColumnSummary()).update(chunk[col])
+        
+        return {col: summary.to_dict() for col, summary in summaries.items()}
+    
     def correlation_analysis(self):
-        """Perform correlation analysis between numerical variables."""
+        """
+        Perform correlation analysis between numerical variables.
+        
+        Pearson, Spearman and Kendall matrices with p-values over the numeric,
+        date-derived and one-hot categorical columns come from one
+        CorrelationEngine pass; 'correlation' keeps the Pearson coefficients
+        of the numeric columns in their original layout.
+        """
         numeric_cols = ['Age', 'Quantity', 'Price_per_Unit', 'Total_Amount']
         available_cols = [col for col in numeric_cols if col in self.df.columns]
         
         if len(available_cols) > 1:
-            correlation_matrix = self.df[available_cols].corr()
+            engine = CorrelationEngine().run(self.df)
+            pearson, _ = engine.matrices()['pearson']
+            positions = [engine.pearson.columns.index(col) for col in available_cols]
             
-            # Convert to serializable format
-            corr_dict = {}
-            for i, col1 in enumerate(available_cols):
-                corr_dict[col1] = {}
-                for j, col2 in enumerate(available_cols):
-                    corr_dict[col1][col2] = float(correlation_matrix.iloc[i, j])
+            corr_dict = {col1: {col2: float(pearson[i, j]) for col2, j in zip(available_cols, positions)}
+                         for col1, i in zip(available_cols, positions)}
             
             self.stats_results['correlation'] = corr_dict
+            self.stats_results['correlation_matrices'] = engine.to_dict()
             return corr_dict
         
         return {}
     
     def hypothesis_testing(self):
-        """Perform various hypothesis tests."""
+        """
+        Perform various hypothesis tests.
+        
+        Each parametric test also gets a 'resampling' entry with a bootstrap
+        confidence interval of its effect (mean difference, correlation,
+        eta squared) and a permutation p-value, which do not assume
+        normality.
+        """
         tests_results = {}
         
         # Test 1: Gender difference in spending
@@ -84,19 +113,29 @@ class StatisticalAnalyzer:
                 'p_value': float(p_value),
                 'significant': bool(p_value < 0.05),
                 'male_mean': float(male_spending.mean()),
-                'female_mean': float(female_spending.mean())
+                'female_mean': float(female_spending.mean()),
+                'resampling': self.resampler.test(
+                    GroupedSample(self.df['Gender'], self.df['Total_Amount'], labels=['Male', 'Female']),
+                    mean_difference, 'gender_spending_difference'
+                )
             }
         
         # Test 2: Age and spending correlation
         if 'Age' in self.df.columns and 'Total_Amount' in self.df.columns:
-            correlation, p_value = stats.pearsonr(self.df['Age'], self.df['Total_Amount'])
+            correlation_coefficient, p_value = stats.pearsonr(self.df['Age'], self.df['Total_Amount'])
+            # Ages are the groups, so the pairs are resampled as an age x amount count table
+            age_sample = GroupedSample(self.df['Age'], self.df['Total_Amount'])
             
             tests_results['age_spending_correlation'] = {
                 'test': 'Pearson correlation',
                 'null_hypothesis': 'No correlation between age and spending',
-                'correlation_coefficient': float(correlation),
+                'correlation_coefficient': float(correlation_coefficient),
                 'p_value': float(p_value),
-                'significant': bool(p_value < 0.05)
+                'significant': bool(p_value < 0.05),
+                'resampling': self.resampler.test(
+                    age_sample, functools.partial(correlation, age_sample.labels.astype('float64')),
+                    'age_spending_correlation', pairs=True
+                )
             }
         
         # Test 3: Product category spending differences (ANOVA)
@@ -113,12 +152,27 @@ class StatisticalAnalyzer:
                 'f_statistic': float(f_stat),
                 'p_value': float(p_value),
                 'significant': bool(p_value < 0.05),
-                'categories_tested': list(categories)
+                'categories_tested': list(categories),
+                'resampling': self.resampler.test(
+                    GroupedSample(self.df['Product_Category'], self.df['Total_Amount']),
+                    eta_squared, 'category_spending_anova', alternative='greater'
+                )
             }
         
         self.stats_results['hypothesis_tests'] = tests_results
         return tests_results
     
+    def grouped_hypothesis_testing(self):
+        """
+        Repeat the gender, category and age group tests within every month
+        (and region, when the data has one), with Bonferroni and
+        Benjamini-Hochberg adjusted p-values across the segments.
+        """
+        grouped_results = GroupedTestRunner().update(self.df).to_dict()
+        
+        self.stats_results['grouped_tests'] = grouped_results
+        return grouped_results
+    
     def outlier_detection(self):
         """Detect outliers using various methods."""
         numeric_cols = ['Age', 'Quantity', 'Price_per_Unit', 'Total_Amount']
@@ -157,6 +211,22 @@ class StatisticalAnalyzer:
         self.stats_results['outliers'] = outliers_summary
         return outliers_summary
     
+    def segment_outlier_detection(self):
+        """
+        Score each transaction against its product category and day of week
+        with MAD, IQR and tail-rank scores; the flagged Transaction_IDs are
+        written to an index file by save_results().
+        """
+        if not all(col in self.df.columns for col in ['Product_Category', 'Day_of_Week', 'Total_Amount',
+                                                     'Transaction_ID']):
+            return {}
+        
+        self.outlier_engine = OutlierEngine().run(self.df)
+        segment_outliers = self.outlier_engine.to_dict()
+        
+        self.stats_results['segment_outliers'] = segment_outliers
+        return segment_outliers
+    
     def categorical_Analysis(self):
         """Analyze categorical variables."""
         categorical_cols = ['Gender', 'Product_Category', 'Age_Group']
@@ -181,14 +251,11 @@ class StatisticalAnalyzer:
     def customer_segments_analysis(self):
         """Analyze customer segments based on spending behavior."""
         if 'Customer_ID' in self.df.columns and 'Total_Amount' in self.df.columns:
-            customer_stats = self.df.groupby('Customer_ID').agg({
-                'Total_Amount': ['sum', 'mean', 'count'],
-                'Quantity': 'sum',
-                'Date': ['min', 'max']
-            }).round(2)
+            if self.customer_facts is None:
+                self.customer_facts = CustomerFactTable(self.df).build()
             
-            customer_stats.columns = ['total_spent', 'avg_transaction', 'transaction_count', 
-                                    'total_quantity', 'first_purchase', 'last_purchase']
+            customer_stats = self.customer_facts[['total_spent', 'avg_transaction', 'transaction_count', 
+                                                  'total_quantity', 'first_purchase', 'last_purchase']].copy()
             
             # Customer lifetime value segments
             customer_stats['customer_segment'] = pd.cut(
@@ -289,9 +356,15 @@ class StatisticalAnalyzer:
         self.hypothesis_testing()
         print("✓ Hypothesis testing completed")
         
+        self.grouped_hypothesis_testing()
+        print("✓ Grouped hypothesis tests completed")
+        
         self.outlier_detection()
         print("✓ Outlier detection completed")
         
+        self.segment_outlier_detection()
+        print("✓ Segment outlier scoring completed")
+        
         self.categorical_Analysis()
         print("✓ Categorical analysis completed")
         
@@ -305,10 +378,9 @@ class StatisticalAnalyzer:
     
     def save_results(self, output_path='visuals/statistical_analysis.json'):
         """Save all statistical analysis results."""
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        with open(output_path, 'w') as f:
-            json.dump(self.stats_results, f, indent=2)
+        ArtifactWriter().write(self.stats_results, output_path)
+        if self.outlier_engine is not None:
+            self.outlier_engine.save_index(os.path.join(os.path.dirname(output_path), 'outlier_index.npz'))
         
         print(f"✓ Statistical analysis results saved to {output_path}")
 
@@ -7,31 +7,263 @@ import pandas as pd
 import numpy as np
 import json
 import os
+import argparse
 from datetime import datetime, timedelta
+from fractions import Fraction
+
+from chart_data import records, floats, ints, strings, dates
+from artifacts import ArtifactWriter
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+SEASON_ORDER = ['Spring', 'Summer', 'Fall', 'Winter']
+# Season for each month (index 0 is unused)
+MONTH_SEASONS = [None, 'Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer',
+                 'Summer', 'Summer', 'Fall', 'Fall', 'Fall', 'Winter']
+
+class TimeSeriesAggregates:
+    """
+    Mergeable running aggregates behind every time series result.
+    
+    Revenue is held in integer cents and the trend regression as exact
+    integer sums (n, Σx, Σx², Σy, Σxy, Σy²), so folding partitions in one
+    at a time gives exactly the same numbers as aggregating the full
+    history at once. Partitions must be append-only: every new day has to
+    be later than the last day already folded in.
+    """
+    
+    STATE_VERSION = 1
+    REGRESSION_KEYS = ['n', 'sx', 'sxx', 'sy', 'sxy', 'syy']
+    
+    def __init__(self):
+        empty = lambda index, columns: pd.DataFrame(
+            {col: pd.Series(dtype='int64') for col in columns}, index=pd.Index([], name=index)
+        )
+        self.daily = empty('Date', ['revenue_cents', 'transaction_count', 'total_quantity', 'unique_customers'])
+        self.daily.index = pd.DatetimeIndex([], name='Date')
+        self.day_of_week = empty('day_of_week', ['revenue_cents', 'transaction_count', 'total_quantity'])
+        self.weekly = empty('week_number', ['revenue_cents', 'transaction_count'])
+        self.monthly = empty('period', ['revenue_cents', 'transaction_count', 'total_quantity'])
+        self.seasonal = empty('season', ['revenue_cents', 'transaction_count', 'total_quantity'])
+        self.monthly_customers = {}
+        self.regression = {key: 0 for key in self.REGRESSION_KEYS}
+    
+    @classmethod
+    def from_frame(cls, df):
+        """Aggregate a cleaned transaction frame (full history or one new partition)."""
+        aggregates = cls()
+        aggregates.fold(df)
+        return aggregates
+    
+    def fold(self, df):
+        """Fold a partition of cleaned transactions into the running aggregates."""
+        if df.empty:
+            return self
+        
+        dates = pd.to_datetime(df['Date'])
+        if len(self.daily) and dates.min() <= self.daily.index.max():
+            raise ValueError(
+                f"Partition starts on {dates.min():%Y-%m-%d} but aggregates already cover "
+                f"{self.daily.index.max():%Y-%m-%d}; incremental updates must be append-only"
+            )
+        
+        frame = pd.DataFrame({
+            'Date': dates,
+            'revenue_cents': np.rint(df['Total_Amount'].to_numpy(dtype='float64') * 100).astype('int64'),
+            'Quantity': df['Quantity'].to_numpy(dtype='int64'),
+            'Customer_ID': df['Customer_ID'].astype(str).to_numpy(),
+            'day_of_week': dates.dt.dayofweek.to_numpy(),
+            'week_number': dates.dt.isocalendar().week.to_numpy(dtype='int64'),
+            'period': (dates.dt.year * 100 + dates.dt.month).to_numpy(),
+            'season': np.array(MONTH_SEASONS, dtype=object)[dates.dt.month.to_numpy()]
+        })
+        
+        sums = {'revenue_cents': ('revenue_cents', 'sum'),
+                'transaction_count': ('revenue_cents', 'count'),
+                'total_quantity': ('Quantity', 'sum')}
+        
+        daily = frame.groupby('Date').agg(unique_customers=('Customer_ID', 'nunique'), **sums)
+        self.daily = pd.concat([self.daily, daily[self.daily.columns]]).astype('int64')
+        
+        self.day_of_week = self._add(self.day_of_week, frame.groupby('day_of_week').agg(**sums))
+        self.weekly = self._add(self.weekly, frame.groupby('week_number').agg(
+            revenue_cents=sums['revenue_cents'], transaction_count=sums['transaction_count']))
+        self.monthly = self._add(self.monthly, frame.groupby('period').agg(**sums))
+        self.seasonal = self._add(self.seasonal, frame.groupby('season').agg(**sums))
+        
+        for period, customers in frame.groupby('period')['Customer_ID']:
+            self.monthly_customers.setdefault(int(period), set()).update(customers)
+        
+        return self._fold_regression(daily['revenue_cents'])
+    
+    def _fold_regression(self, daily_revenue_cents):
+        """Add the next days' revenue to the exact trend regression sums."""
+        # New days take the next positions on the trend's x axis
+        start = self.regression['n']
+        y = daily_revenue_cents.to_numpy().astype(object)
+        x = np.arange(start, start + len(y)).astype(object)
+        self.regression['n'] += len(y)
+        self.regression['sx'] += int(x.sum())
+        self.regression['sxx'] += int((x * x).sum())
+        self.regression['sy'] += int(y.sum())
+        self.regression['sxy'] += int((x * y).sum())
+        self.regression['syy'] += int((y * y).sum())
+        
+        return self
+    
+    @classmethod
+    def from_tables(cls, daily, day_of_week, weekly, monthly, seasonal, monthly_customers):
+        """
+        Aggregates from tables already grouped elsewhere, e.g. by a SQL backend.
+        
+        Tables use the index names and cent/count columns of the running
+        aggregates; monthly_customers maps each yyyymm period to its set of
+        customer IDs. The trend regression is derived from the daily table.
+        """
+        aggregates = cls()
+        aggregates.daily = daily[aggregates.daily.columns].astype('int64').sort_index()
+        aggregates.daily.index = pd.to_datetime(aggregates.daily.index).rename('Date')
+        aggregates.day_of_week = day_of_week[aggregates.day_of_week.columns].astype('int64').sort_index()
+        aggregates.weekly = weekly[aggregates.weekly.columns].astype('int64').sort_index()
+        aggregates.monthly = monthly[aggregates.monthly.columns].astype('int64').sort_index()
+        aggregates.seasonal = seasonal[aggregates.seasonal.columns].astype('int64').sort_index()
+        aggregates.monthly_customers = monthly_customers
+        return aggregates._fold_regression(aggregates.daily['revenue_cents'])
+    
+    @staticmethod
+    def _add(current, partial):
+        """Add partial sums into a running table, aligning on the index."""
+        return current.add(partial[current.columns], fill_value=0).astype('int64').sort_index()
+    
+    def trend_coefficients(self):
+        """Exact least-squares slope, intercept (in dollars) and R² of daily revenue."""
+        r = self.regression
+        sxx_c = r['n'] * r['sxx'] - r['sx'] ** 2
+        sxy_c = r['n'] * r['sxy'] - r['sx'] * r['sy']
+        syy_c = r['n'] * r['syy'] - r['sy'] ** 2
+        
+        if r['n'] == 0 or sxx_c == 0:
+            return 0.0, float(Fraction(r['sy'], max(r['n'], 1)) / 100), 0.0
+        
+        slope = Fraction(sxy_c, sxx_c)
+        intercept = (r['sy'] - slope * r['sx']) / r['n']
+        r_squared = Fraction(sxy_c ** 2, sxx_c * syy_c) if syy_c else Fraction(0)
+        
+        return float(slope / 100), float(intercept / 100), float(r_squared)
+    
+    def to_dict(self):
+        """Serializable state for persisting between runs."""
+        def table(frame, index_name):
+            data = {index_name: frame.index.tolist()}
+            data.update({col: frame[col].tolist() for col in frame.columns})
+            return data
+        
+        daily = table(self.daily, 'Date')
+        daily['Date'] = [date.strftime('%Y-%m-%d') for date in self.daily.index]
+        
+        return {
+            'version': self.STATE_VERSION,
+            'daily': daily,
+            'day_of_week': table(self.day_of_week, 'day_of_week'),
+            'weekly': table(self.weekly, 'week_number'),
+            'monthly': table(self.monthly, 'period'),
+            'seasonal': table(self.seasonal, 'season'),
+            'monthly_customers': {str(period): sorted(customers)
+                                  for period, customers in self.monthly_customers.items()},
+            'regression': {key: str(value) for key, value in self.regression.items()}
+        }
+    
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild aggregates from a persisted state dict."""
+        if state.get('version') != cls.STATE_VERSION:
+            raise ValueError(f"Unsupported time series state version: {state.get('version')}")
+        
+        aggregates = cls()
+        
+        def table(data, index_name):
+            data = dict(data)
+            index = pd.Index(data.pop(index_name), name=index_name)
+            return pd.DataFrame(data, index=index).astype('int64')
+        
+        aggregates.daily = table(state['daily'], 'Date')
+        aggregates.daily.index = pd.to_datetime(aggregates.daily.index).rename('Date')
+        aggregates.day_of_week = table(state['day_of_week'], 'day_of_week')
+        aggregates.weekly = table(state['weekly'], 'week_number')
+        aggregates.monthly = table(state['monthly'], 'period')
+        aggregates.seasonal = table(state['seasonal'], 'season')
+        aggregates.monthly_customers = {int(period): set(customers)
+                                        for period, customers in state['monthly_customers'].items()}
+        # Regression sums are stored as strings because they can exceed 64 bits
+        aggregates.regression = {key: int(value) for key, value in state['regression'].items()}
+        return aggregates
+    
+    def save(self, path):
+        """Persist the running aggregates as JSON."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+    
+    @classmethod
+    def load(cls, path):
+        """Load persisted aggregates, or return empty aggregates if none exist yet."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
 
 class TimeSeriesAnalyzer:
     """
     Performs time series analysis on retail sales data.
+    
+    Results are rendered from TimeSeriesAggregates, built from df or passed
+    in directly when running incrementally.
     """
     
-    def __init__(self, df):
+    def __init__(self, df=None, aggregates=None):
         self.df = df
+        self.aggregates = aggregates
         self.ts_results = {}
         
         # Ensure Date column is datetime
-        if 'Date' in self.df.columns:
+        if self.df is not None and 'Date' in self.df.columns:
             self.df['Date'] = pd.to_datetime(self.df['Date'])
     
+    @classmethod
+    def update_incremental(cls, new_df, state_path='data/.cache/time_series_state.json'):
+        """
+        Fold a new partition into the persisted aggregates and return an analyzer over them.
+        
+        Produces the same results as a full recompute over all partitions,
+        while only the new partition is grouped.
+        """
+        aggregates = TimeSeriesAggregates.load(state_path)
+        aggregates.fold(new_df)
+        aggregates.save(state_path)
+        print(f"✓ Folded {len(new_df)} records into {state_path} "
+              f"({len(aggregates.daily)} days total)")
+        return cls(aggregates=aggregates)
+    
+    def get_aggregates(self):
+        """Return the running aggregates, building them from df on first use."""
+        if self.aggregates is None:
+            self.aggregates = TimeSeriesAggregates.from_frame(self.df)
+        return self.aggregates
+    
+    @staticmethod
+    def _revenue_columns(table):
+        """Derive dollar totals and average transaction values from cent sums."""
+        derived = pd.DataFrame(index=table.index)
+        derived['total_revenue'] = table['revenue_cents'] / 100
+        derived['avg_transaction'] = (table['revenue_cents'] / table['transaction_count'] / 100).round(2)
+        derived['transaction_count'] = table['transaction_count']
+        for col in ['total_quantity', 'unique_customers']:
+            if col in table.columns:
+                derived[col] = table[col]
+        return derived
+    
     def daily_sales_analysis(self):
         """Analyze daily sales patterns."""
-        daily_sales = self.df.groupby('Date').agg({
-            'Total_Amount': ['sum', 'mean', 'count'],
-            'Quantity': 'sum',
-            'Customer_ID': 'nunique'
-        }).round(2)
-        
-        daily_sales.columns = ['total_revenue', 'avg_transaction', 'transaction_count', 
-                              'total_quantity', 'unique_customers']
+        daily_sales = self._revenue_columns(self.get_aggregates().daily)
         
         # Calculate daily statistics
         daily_stats = {
@@ -61,14 +293,12 @@ class TimeSeriesAnalyzer:
         }
         
         # Convert daily sales for visualization
-        daily_chart_data = []
-        for date, row in daily_sales.iterrows():
-            daily_chart_data.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'revenue': float(row['total_revenue']),
-                'transactions': int(row['transaction_count']),
-                'customers': int(row['unique_customers'])
-            })
+        daily_chart_data = records(
+            date=dates(daily_sales.index),
+            revenue=floats(daily_sales['total_revenue']),
+            transactions=ints(daily_sales['transaction_count']),
+            customers=ints(daily_sales['unique_customers'])
+        )
         
         self.ts_results['daily_analysis'] = {
             'statistics': daily_stats,
@@ -79,49 +309,31 @@ class TimeSeriesAnalyzer:
     
     def weekly_patterns(self):
         """Analyze weekly patterns and day-of-week effects."""
-        # Add day names
-        self.df['day_name'] = self.df['Date'].dt.day_name()
-        self.df['week_number'] = self.df['Date'].dt.isocalendar().week
+        aggregates = self.get_aggregates()
         
         # Day of week analysis
-        dow_analysis = self.df.groupby('day_name').agg({
-            'Total_Amount': ['sum', 'mean', 'count'],
-            'Quantity': 'sum',
-            'Customer_ID': 'nunique'
-        }).round(2)
-        
-        dow_analysis.columns = ['total_revenue', 'avg_transaction', 'transaction_count', 
-                               'total_quantity', 'unique_customers']
+        dow_analysis = self._revenue_columns(aggregates.day_of_week)
         
         # Reorder by day of week
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        dow_analysis = dow_analysis.reindex([day for day in day_order if day in dow_analysis.index])
+        dow_analysis = dow_analysis.sort_index()
+        dow_analysis.index = [DAY_NAMES[day] for day in dow_analysis.index]
         
         # Convert to chart data
-        dow_chart_data = []
-        for day, row in dow_analysis.iterrows():
-            dow_chart_data.append({
-                'day': day,
-                'revenue': float(row['total_revenue']),
-                'transactions': int(row['transaction_count']),
-                'avg_transaction': float(row['avg_transaction'])
-            })
+        dow_chart_data = records(
+            day=strings(dow_analysis.index),
+            revenue=floats(dow_analysis['total_revenue']),
+            transactions=ints(dow_analysis['transaction_count']),
+            avg_transaction=floats(dow_analysis['avg_transaction'])
+        )
         
         # Weekly analysis
-        weekly_analysis = self.df.groupby('week_number').agg({
-            'Total_Amount': ['sum', 'mean'],
-            'Transaction_ID': 'count'
-        }).round(2)
+        weekly_analysis = self._revenue_columns(aggregates.weekly)
         
-        weekly_analysis.columns = ['total_revenue', 'avg_transaction', 'transaction_count']
-        
-        weekly_chart_data = []
-        for week, row in weekly_analysis.iterrows():
-            weekly_chart_data.append({
-                'week': int(week),
-                'revenue': float(row['total_revenue']),
-                'transactions': int(row['transaction_count'])
-            })
+        weekly_chart_data = records(
+            week=ints(weekly_analysis.index),
+            revenue=floats(weekly_analysis['total_revenue']),
+            transactions=ints(weekly_analysis['transaction_count'])
+        )
         
         # Calculate weekly statistics
         weekly_stats = {
@@ -145,28 +357,25 @@ class TimeSeriesAnalyzer:
     
     def monthly_trends(self):
         """Analyze monthly trends and seasonality."""
-        # Monthly analysis
-        monthly_analysis = self.df.groupby(['Year', 'Month']).agg({
-            'Total_Amount': ['sum', 'mean', 'count'],
-            'Quantity': 'sum',
-            'Customer_ID': 'nunique'
-        }).round(2)
+        aggregates = self.get_aggregates()
         
-        monthly_analysis.columns = ['total_revenue', 'avg_transaction', 'transaction_count', 
-                                   'total_quantity', 'unique_customers']
+        # Monthly analysis
+        monthly_analysis = self._revenue_columns(aggregates.monthly)
+        monthly_analysis['unique_customers'] = [
+            len(aggregates.monthly_customers.get(period, ())) for period in monthly_analysis.index
+        ]
         
         # Convert to chart data
-        monthly_chart_data = []
-        for (year, month), row in monthly_analysis.iterrows():
-            month_name = pd.to_datetime(f'{year}-{month}-01').strftime('%B %Y')
-            monthly_chart_data.append({
-                'year': int(year),
-                'month': int(month),
-                'month_name': month_name,
-                'revenue': float(row['total_revenue']),
-                'transactions': int(row['transaction_count']),
-                'customers': int(row['unique_customers'])
-            })
+        years, months = np.divmod(monthly_analysis.index.to_numpy(dtype='int64'), 100)
+        month_starts = pd.to_datetime({'year': years, 'month': months, 'day': 1})
+        monthly_chart_data = records(
+            year=ints(years),
+            month=ints(months),
+            month_name=dates(month_starts, '%B %Y'),
+            revenue=floats(monthly_analysis['total_revenue']),
+            transactions=ints(monthly_analysis['transaction_count']),
+            customers=ints(monthly_analysis['unique_customers'])
+        )
         
         # Calculate growth rates
         monthly_revenues = [data['revenue'] for data in monthly_chart_data]
@@ -194,33 +403,12 @@ class TimeSeriesAnalyzer:
     
     def seasonal_analysis(self):
         """Analyze seasonal patterns in sales."""
-        # Define seasons
-        def get_season(month):
-            if month in [12, 1, 2]:
-                return 'Winter'
-            elif month in [3, 4, 5]:
-                return 'Spring'
-            elif month in [6, 7, 8]:
-                return 'Summer'
-            else:
-                return 'Fall'
-        
-        self.df['Season'] = self.df['Month'].apply(get_season)
-        
         # Seasonal analysis
-        seasonal_analysis = self.df.groupby('Season').agg({
-            'Total_Amount': ['sum', 'mean', 'count'],
-            'Quantity': 'sum',
-            'Customer_ID': 'nunique'
-        }).round(2)
-        
-        seasonal_analysis.columns = ['total_revenue', 'avg_transaction', 'transaction_count', 
-                                    'total_quantity', 'unique_customers']
+        seasonal_analysis = self._revenue_columns(self.get_aggregates().seasonal)
         
         # Convert to chart data
         seasonal_chart_data = []
-        season_order = ['Spring', 'Summer', 'Fall', 'Winter']
-        for season in season_order:
+        for season in SEASON_ORDER:
             if season in seasonal_analysis.index:
                 row = seasonal_analysis.loc[season]
                 seasonal_chart_data.append({
@@ -246,39 +434,37 @@ class TimeSeriesAnalyzer:
     
     def trend_analysis(self):
         """Analyze overall trends and forecast."""
+        aggregates = self.get_aggregates()
+        
         # Create time series
-        daily_sales = self.df.groupby('Date')['Total_Amount'].sum().reset_index()
-        daily_sales = daily_sales.sort_values('Date')
+        daily_sales = pd.DataFrame({
+            'Date': aggregates.daily.index,
+            'Total_Amount': aggregates.daily['revenue_cents'].to_numpy() / 100
+        })
         
         # Calculate moving averages
         daily_sales['MA_7'] = daily_sales['Total_Amount'].rolling(window=7, min_periods=1).mean()
         daily_sales['MA_30'] = daily_sales['Total_Amount'].rolling(window=30, min_periods=1).mean()
         
-        # Simple linear trend
-        x = np.arange(len(daily_sales))
-        y = daily_sales['Total_Amount'].values
-        
-        # Linear regression
-        z = np.polyfit(x, y, 1)
-        trend_line = np.poly1d(z)
+        # Linear regression from the exact sufficient statistics
+        slope, intercept, r_squared = aggregates.trend_coefficients()
+        trend_line = np.poly1d([slope, intercept])
         
         # Convert to chart data
-        trend_chart_data = []
-        for idx, row in daily_sales.iterrows():
-            trend_chart_data.append({
-                'date': row['Date'].strftime('%Y-%m-%d'),
-                'actual': float(row['Total_Amount']),
-                'ma_7': float(row['MA_7']),
-                'ma_30': float(row['MA_30']),
-                'trend': float(trend_line(idx))
-            })
+        trend_chart_data = records(
+            date=dates(daily_sales['Date']),
+            actual=floats(daily_sales['Total_Amount']),
+            ma_7=floats(daily_sales['MA_7']),
+            ma_30=floats(daily_sales['MA_30']),
+            trend=floats(trend_line(np.arange(len(daily_sales))))
+        )
         
         # Trend statistics
         trend_stats = {
-            'trend_slope': float(z[0]),
-            'trend_direction': 'Increasing' if z[0] > 0 else 'Decreasing',
-            'trend_strength': float(abs(z[0])),
-            'r_squared': float(np.corrcoef(y, trend_line(x))[0, 1] ** 2)
+            'trend_slope': float(slope),
+            'trend_direction': 'Increasing' if slope > 0 else 'Decreasing',
+            'trend_strength': float(abs(slope)),
+            'r_squared': float(r_squared)
         }
         
         self.ts_results['trend_analysis'] = {
@@ -371,10 +557,7 @@ class TimeSeriesAnalyzer:
     
     def save_results(self, output_path='visuals/time_series_analysis.json'):
         """Save all time series analysis results."""
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        with open(output_path, 'w') as f:
-            json.dump(self.ts_results, f, indent=2)
+        ArtifactWriter().write(self.ts_results, output_path)
         
         print(f"✓ Time series analysis results saved to {output_path}")
 
@@ -382,12 +565,22 @@ if __name__ == "__main__":
     # Example usage
     from load_clean import DataLoader
     
-    loader = DataLoader()
+    parser = argparse.ArgumentParser(description="Run the time series analysis.")
+    parser.add_argument('--append', metavar='CSV',
+                        help='fold one new partition into the persisted aggregates instead of a full recompute')
+    parser.add_argument('--state', default='data/.cache/time_series_state.json',
+                        help='path of the persisted running aggregates')
+    args = parser.parse_args()
+    
+    loader = DataLoader(args.append) if args.append else DataLoader()
     data = loader.load_data()
     cleaned_data = loader.clean_data()
     
     if cleaned_data is not None:
-        analyzer = TimeSeriesAnalyzer(cleaned_data)
+        if args.append:
+            analyzer = TimeSeriesAnalyzer.update_incremental(cleaned_data, args.state)
+        else:
+            analyzer = TimeSeriesAnalyzer(cleaned_data)
         results = analyzer.run_complete_analysis()
         analyzer.save_results()
         
@@ -7,29 +7,37 @@ import json
 import os
 from datetime import datetime
 
+from artifacts import ArtifactWriter
+from downsample import Downsampler
+
 class VisualizationGenerator:
     """
     Generates visualization configurations for the web dashboard.
     """
     
-    def __init__(self):
+    def __init__(self, downsampler=None):
         self.viz_configs = {}
+        self.downsampler = downsampler or Downsampler()
     
     def create_revenue_charts(self, data):
         """Create revenue-focused chart configurations."""
         charts = {}
         
-        # Daily revenue trend
+        # Daily revenue trend, drawn from the coarsest resolution level
         if 'daily_analysis' in data:
             daily_data = data['daily_analysis']['chart_data']
+            resolutions = self.downsampler.resolutions(
+                [item['date'] for item in daily_data],
+                [item['revenue'] for item in daily_data]
+            )
             charts['daily_revenue'] = {
                 'type': 'line',
                 'title': 'Daily Revenue Trend',
                 'data': {
-                    'labels': [item['date'] for item in daily_data],
+                    'labels': resolutions[0]['labels'],
                     'datasets': [{
                         'label': 'Daily Revenue',
-                        'data': [item['revenue'] for item in daily_data],
+                        'data': resolutions[0]['data'],
                         'borderColor': '#2563eb',
                         'backgroundColor': 'rgba(37, 99, 235, 0.1)',
                         'tension': 0.4,
@@ -46,7 +54,13 @@ class VisualizationGenerator:
                             }
                         }
                     }
-                }
+                },
+                'downsampling': {
+                    'method': self.downsampler.method,
+                    'target_points': self.downsampler.target_points,
+                    'total_points': len(daily_data)
+                },
+                'resolutions': resolutions
             }
         
         # Monthly revenue with growth
@@ -375,19 +389,19 @@ class VisualizationGenerator:
     
     def save_dashboard_config(self, config, output_path='visuals/dashboard_config.json'):
         """Save dashboard configuration to file."""
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        with open(output_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        ArtifactWriter().write(config, output_path)
         
         print(f"✓ Dashboard configuration saved to {output_path}")
     
-    def generate_complete_visualization_suite(self):
+    def generate_complete_visualization_suite(self, stats_data=None, ts_data=None, cp_data=None):
         """Generate complete visualization suite from analysis results."""
-        # Load analysis results
-        stats_data = self.load_json_file('visuals/statistical_analysis.json')
-        ts_data = self.load_json_file('visuals/time_series_analysis.json')
-        cp_data = self.load_json_file('visuals/customer_product_analysis.json')
+        # Load analysis results not passed in memory
+        if stats_data is None:
+            stats_data = self.load_json_file('visuals/statistical_analysis.json')
+        if ts_data is None:
+            ts_data = self.load_json_file('visuals/time_series_analysis.json')
+        if cp_data is None:
+            cp_data = self.load_json_file('visuals/customer_product_analysis.json')
         
         # Generate dashboard configuration
         config = self.generate_dashboard_config(stats_data, ts_data, cp_data)
@@ -40,11 +40,12 @@ echo "1. Python HTTP Server (recommended)"
 if [ "$NODE_AVAILABLE" = true ]; then
     echo "2. Node.js serve (if you have Node.js)"
 fi
-echo "3. Run EDA Analysis First"
-echo "4. Exit"
+echo "3. Analytics API server (dashboard filters query the cleaned data live)"
+echo "4. Run EDA Analysis First"
+echo "5. Exit"
 echo ""
 
-read -p "Choose an option (1-4): " choice
+read -p "Choose an option (1-5): " choice
 
 case $choice in
     1)
@@ -69,6 +70,15 @@ case $choice in
         fi
         ;;
     3)
+        echo ""
+        echo "📡 Starting Analytics API server..."
+        echo "Dashboard will be available at: http://localhost:8000/dashboard/"
+        echo "API health check: http://localhost:8000/api/health"
+        echo "Press Ctrl+C to stop the server"
+        echo ""
+        $PYTHON_CMD eda/api_server.py --port 8000
+        ;;
+    4)
         echo ""
         echo "🔍 Running EDA Analysis..."
         echo "This may take a few minutes depending on your data size..."
@@ -83,7 +93,7 @@ case $choice in
                 echo "✅ EDA Analysis completed successfully!"
                 echo ""
                 echo "Now you can start the server:"
-                echo "1. Run this script again and choose option 1 or 2"
+                echo "1. Run this script again and choose option 1, 2 or 3"
                 echo "2. Or manually run: $PYTHON_CMD -m http.server 8000"
                 echo "3. Then open: http://localhost:8000/dashboard/"
             else
@@ -95,12 +105,12 @@ case $choice in
             exit 1
         fi
         ;;
-    4)
+    5)
         echo "👋 Goodbye!"
         exit 0
         ;;
-    *
-        echo "❌ Invalid option. Please choose 1-4."
+    *)
+        echo "❌ Invalid option. Please choose 1-5."
         exit 1
         ;;
 esac
\ No newline at end of file
@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from load_clean import DataLoader
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'retail_sales_dataset.csv')
+
+def test_streamed_load_matches_the_in_memory_load(tmp_path):
+    loader = DataLoader(DATA, cache_dir=str(tmp_path / 'memory'))
+    loader.load_data()
+    loader.validate_data()
+    cleaned = loader.clean_data()
+    expected = loader.get_data_summary()
+
+    streaming = DataLoader(DATA, cache_dir=str(tmp_path / 'stream'), chunksize=30)
+    summary = streaming.stream_data(output_path=str(tmp_path / 'cleaned.csv'), cache=True)
+
+    assert summary['basic_info']['total_customers'] == expected['basic_info']['total_customers']
+    assert summary['categorical_distributions'] == expected['categorical_distributions']
+    for key, stats in expected['numerical_statistics'].items():
+        assert summary['numerical_statistics'][key] == pytest.approx(stats)
+
+    # The streamed cache reads back as the same frame, dtypes included
+    streamed = streaming.load_cached_data()
+    assert streamed.dtypes.equals(cleaned.dtypes)
+    assert streamed.equals(cleaned)
@@ -0,0 +1,66 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+import resampling
+from resampling import GroupedSample, ResamplingEngine, correlation, mean_difference, _permuted_table
+
+def _amounts(rows, seed=0):
+    """Ages and amounts like the retail data: many distinct amounts across ~50 ages."""
+    rng = np.random.default_rng(seed)
+    ages = pd.Series(rng.integers(18, 65, rows))
+    amounts = rng.integers(5, 100, rows) * 5.0 * rng.integers(1, 5, rows)
+    return ages, amounts
+
+def _age_test(sample, engine):
+    x = sample.labels.astype('float64')
+    return engine.test(sample, lambda n, sums, squares: correlation(x, n, sums, squares), 'age', pairs=True)
+
+def test_permuted_tables_keep_both_margins():
+    rng = np.random.default_rng(3)
+    counts = rng.integers(0, 6, (7, 13))
+    sizes = counts.sum(axis=1)
+    tables = _permuted_table(counts, sizes, 200, rng)
+
+    assert tables.shape == (200,) + counts.shape
+    assert (tables >= 0).all()
+    np.testing.assert_array_equal(tables.sum(axis=2), np.tile(sizes, (200, 1)))
+    np.testing.assert_array_equal(tables.sum(axis=1), np.tile(counts.sum(axis=0), (200, 1)))
+    # Each cell is hypergeometric: its mean is the group's share of the value's count
+    expected = np.outer(sizes, counts.sum(axis=0)) / counts.sum()
+    assert np.abs(tables.mean(axis=0) - expected).max() < 0.5
+
+def test_small_sample_with_many_values_is_resampled_by_row():
+    ages, amounts = _amounts(2000)
+    sample = GroupedSample(ages, amounts)
+    assert len(sample.labels) * len(sample.levels) * resampling.COMPRESSION_RATIO > 2000
+    assert not sample.compressed
+
+    ages, amounts = _amounts(200_000)
+    assert GroupedSample(ages, amounts).compressed
+
+def test_count_table_and_rows_give_the_same_results(monkeypatch):
+    rng = np.random.default_rng(5)
+    groups = pd.Series(rng.choice(['Male', 'Female'], 5000))
+    values = rng.choice([25.0, 30.0, 50.0, 300.0, 500.0], 5000) + (groups == 'Female') * 25.0
+    engine = ResamplingEngine(n_resamples=1000)
+
+    table = engine.test(GroupedSample(groups, values, labels=['Male', 'Female']), mean_difference, 'gender')
+    monkeypatch.setattr(resampling, 'MAX_TABLE_CELLS', 0)
+    sample = GroupedSample(groups, values, labels=['Male', 'Female'])
+    assert not sample.compressed
+    rows = engine.test(sample, mean_difference, 'gender')
+
+    assert table['estimate'] == rows['estimate']
+    assert abs(table['ci_lower'] - rows['ci_lower']) < 3
+    assert abs(table['ci_upper'] - rows['ci_upper']) < 3
+    assert table['significant'] and rows['significant']
+
+def test_age_test_on_a_small_sample_stays_fast():
+    # The per-value hypergeometric loop took several seconds here
+    ages, amounts = _amounts(2000)
+    start = time.perf_counter()
+    result = _age_test(GroupedSample(ages, amounts), ResamplingEngine())
+    assert time.perf_counter() - start < 2.0
+    assert 0 < result['permutation_p_value'] <= 1
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from rfm import RFMEngine
+
+def _facts(customers=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'total_spent': rng.gamma(2.0, 300.0, customers).round(2),
+        'transaction_count': rng.poisson(4, customers) + 1,
+        'last_purchase': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365, customers), unit='D')
+    }, index=pd.Index([f'CUST{i:05d}' for i in range(customers)], name='Customer_ID'))
+
+def test_rfm_cell_matches_scores_for_top_recency():
+    scores = RFMEngine().run(_facts())
+    top = scores[scores['R'] == 5]
+    assert len(top) > 0
+
+    expected = 100 * top['R'].astype('int64') + 10 * top['F'].astype('int64') + top['M'].astype('int64')
+    np.testing.assert_array_equal(top['rfm_cell'].to_numpy(), expected.to_numpy())
+    assert top['rfm_cell'].min() >= 511
+
+def test_rfm_cell_matches_scores_for_every_customer():
+    scores = RFMEngine().run(_facts(customers=5000, seed=1))
+    expected = 100 * scores['R'].astype('int64') + 10 * scores['F'].astype('int64') + scores['M'].astype('int64')
+    np.testing.assert_array_equal(scores['rfm_cell'].to_numpy(), expected.to_numpy())
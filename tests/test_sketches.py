@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from sketches import DistinctCountSketch
+
+def test_distinct_count_is_exact_below_capacity():
+    ids = pd.Series([f'CUST{i:05d}' for i in range(3000)])
+    sketch = DistinctCountSketch().update(ids).update(ids.iloc[:1000])
+    assert sketch.is_exact
+    assert sketch.count() == 3000
+    assert sketch.relative_error() == 0.0
+
+def test_distinct_count_estimate_and_merge():
+    rng = np.random.default_rng(4)
+    values = rng.integers(0, 1 << 40, 200_000)
+    first, second = DistinctCountSketch(), DistinctCountSketch()
+    for chunk in np.array_split(values[:120_000], 6):
+        first.update(chunk)
+    second.update(values[80_000:])
+
+    distinct = len(np.unique(values))
+    merged = first.merge(second)
+    assert not merged.is_exact
+    assert abs(merged.count() / distinct - 1) < 4 * merged.relative_error()
+    assert merged.registers.nbytes == 1 << merged.precision
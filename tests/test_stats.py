@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats import StatisticalAnalyzer
+
+def test_descriptive_statistics_are_exact_beyond_the_sketch_capacity():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'Total_Amount': rng.gamma(2.0, 300.0, 50_000).round(2),
+                       'Age': rng.integers(18, 65, 50_000)})
+    descriptive = StatisticalAnalyzer(df).descriptive_statistics()
+
+    for col in df.columns:
+        column = df[col]
+        assert descriptive[col]['median'] == pytest.approx(column.median())
+        assert descriptive[col]['q1'] == pytest.approx(column.quantile(0.25))
+        assert descriptive[col]['q3'] == pytest.approx(column.quantile(0.75))
+        assert descriptive[col]['mode'] == column.mode().iloc[0]
+        assert descriptive[col]['skewness'] == pytest.approx(column.skew())
+        assert descriptive[col]['kurtosis'] == pytest.approx(column.kurtosis())
+        assert descriptive[col]['quantile_rank_error'] == 0.0
+
+    # Chunked input still goes through the sketches, with the same fields
+    chunked = StatisticalAnalyzer.summarize_chunks(df.iloc[start:start + 10_000] for start in range(0, len(df), 10_000))
+    assert set(chunked['Total_Amount']) == set(descriptive['Total_Amount'])
+    assert chunked['Total_Amount']['quantile_rank_error'] > 0